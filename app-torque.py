@@ -1,455 +1,36 @@
-from scipy.interpolate import CubicSpline
 import streamlit as st
-import streamlit.components.v1 as components
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-import math
-import base64
-import tempfile
 import os
+import sys
 from datetime import datetime
-from fpdf import FPDF
-from io import BytesIO
-import requests
-from PIL import Image
 import traceback
+import html
+from collections import OrderedDict
 
-# ========================
-# CONSTANTS & UNIT CONVERSION
-# ========================
-BAR_TO_PSI = 14.5038
-MM_TO_INCH = 0.0393701
-N_TO_LBF = 0.224809
-NM_TO_LBIN = 8.85075
-KW_TO_HP = 1.34102
-
-# Valve types
-VALVE_TYPES = {
-    "Ball": {"torque_type": "Rotary", "thrust_type": "None"},
-    "Butterfly": {"torque_type": "Rotary", "thrust_type": "None"},
-    "Globe": {"torque_type": "None", "thrust_type": "Linear"},
-    "Gate": {"torque_type": "None", "thrust_type": "Linear"},
-    "Plug": {"torque_type": "Rotary", "thrust_type": "None"},
-    "Diaphragm": {"torque_type": "None", "thrust_type": "Linear"}
-}
-
-# Safety factors
-SAFETY_FACTORS = {
-    "Standard": 1.25,
-    "High": 1.5,
-    "Critical": 2.0
-}
-
-# Seal friction coefficients
-SEAL_FRICTION = {
-    "PTFE": 0.05,
-    "Graphite": 0.1,
-    "Metal": 0.15,
-    "Elastomer": 0.08
-}
-
-# ========================
-# VALVE DATABASE
-# ========================
-class Valve:
-    def __init__(self, size_inch, valve_type, pressure_class, seat_material, stem_dia_mm, 
-                 max_pressure_bar, min_pressure_bar, max_temp_c, min_temp_c):
-        self.size = size_inch
-        self.type = valve_type
-        self.pressure_class = pressure_class
-        self.seat_material = seat_material
-        self.stem_dia_mm = stem_dia_mm
-        self.max_pressure = max_pressure_bar
-        self.min_pressure = min_pressure_bar
-        self.max_temp = max_temp_c
-        self.min_temp = min_temp_c
-        
-    def get_seal_friction(self):
-        return SEAL_FRICTION.get(self.seat_material, 0.1)
-    
-    def get_area(self):
-        # Calculate valve area in m²
-        radius_m = (self.size * 0.0254) / 2
-        return math.pi * radius_m**2
-
-VALVE_DATABASE = [
-    Valve(2, "Ball", 600, "PTFE", 20, 100, 0, 200, -20),
-    Valve(4, "Ball", 600, "Metal", 30, 100, 0, 250, -20),
-    Valve(6, "Butterfly", 300, "Elastomer", 40, 40, 0, 150, -10),
-    Valve(8, "Butterfly", 150, "PTFE", 50, 25, 0, 180, -10),
-    Valve(3, "Globe", 900, "Graphite", 25, 150, 0, 350, -50),
-    Valve(6, "Gate", 600, "Graphite", 35, 100, 0, 400, -30),
-    Valve(2, "Plug", 600, "PTFE", 22, 100, 0, 200, -20),
-    Valve(10, "Diaphragm", 150, "Elastomer", 60, 16, 0, 120, -10)
-]
-
-# ========================
-# ACTUATOR DATABASE
-# ========================
-class Actuator:
-    def __init__(self, model, manufacturer, torque_nm, thrust_n, max_pressure_bar, 
-                 min_temp_c, max_temp_c, power_kw, supply_type, weight_kg, price_usd):
-        self.model = model
-        self.manufacturer = manufacturer
-        self.torque = torque_nm
-        self.thrust = thrust_n
-        self.max_pressure = max_pressure_bar
-        self.min_temp = min_temp_c
-        self.max_temp = max_temp_c
-        self.power = power_kw
-        self.supply = supply_type
-        self.weight = weight_kg
-        self.price = price_usd
-        
-    def get_torque_lbin(self):
-        return self.torque * NM_TO_LBIN
-    
-    def get_thrust_lbf(self):
-        return self.thrust * N_TO_LBF
-
-ACTUATOR_DATABASE = [
-    Actuator("SR-100", "Rotork", 1000, 0, 100, -30, 120, 0.5, "Pneumatic", 25, 3500),
-    Actuator("SR-500", "Rotork", 5000, 0, 100, -30, 120, 1.0, "Pneumatic", 45, 5500),
-    Actuator("IQT-300", "Rotork", 3000, 0, 100, -40, 150, 0.75, "Electric", 40, 6500),
-    Actuator("SMC-200", "Emerson", 2000, 0, 100, -20, 100, 0.6, "Pneumatic", 30, 4200),
-    Actuator("SMC-800", "Emerson", 8000, 0, 100, -20, 100, 1.5, "Pneumatic", 65, 7800),
-    Actuator("F10", "Flowserve", 0, 15000, 150, -50, 200, 1.2, "Hydraulic", 85, 9500),
-    Actuator("F25", "Flowserve", 0, 25000, 200, -50, 250, 2.0, "Hydraulic", 120, 12500),
-    Actuator("E-200", "AUMA", 2000, 0, 100, -30, 120, 0.8, "Electric", 38, 5800),
-    Actuator("E-1000", "AUMA", 10000, 0, 100, -30, 120, 2.5, "Electric", 95, 11200),
-    Actuator("H-150", "Honeywell", 0, 20000, 180, -40, 180, 1.8, "Hydraulic", 100, 10500)
-]
-
-# ========================
-# TORQUE/THRUST CALCULATION MODULE
-# ========================
-def calculate_ball_valve_torque(valve, pressure_bar, temperature_c):
-    """Calculate torque for ball valves based on size, pressure, and temperature"""
-    # Base torque calculation (Nm)
-    base_torque = valve.size * pressure_bar * 0.8
-    
-    # Temperature adjustment
-    temp_factor = 1.0
-    if temperature_c > 100:
-        temp_factor = 1.0 + (temperature_c - 100) * 0.005
-    
-    # Seat material factor
-    seat_factor = 1.0
-    if valve.seat_material == "Metal":
-        seat_factor = 1.3
-    elif valve.seat_material == "Graphite":
-        seat_factor = 1.1
-    
-    return base_torque * temp_factor * seat_factor
-
-def calculate_butterfly_valve_torque(valve, pressure_bar, temperature_c):
-    """Calculate torque for butterfly valves"""
-    # Base torque calculation (Nm)
-    base_torque = valve.size**1.5 * pressure_bar * 0.5
-    
-    # Temperature adjustment
-    temp_factor = 1.0
-    if temperature_c > 80:
-        temp_factor = 1.0 + (temperature_c - 80) * 0.007
-    
-    # Seat material factor
-    seat_factor = 1.0
-    if valve.seat_material == "Elastomer":
-        seat_factor = 0.9
-    elif valve.seat_material == "PTFE":
-        seat_factor = 1.0
-    
-    return base_torque * temp_factor * seat_factor
-
-def calculate_globe_valve_thrust(valve, pressure_bar, temperature_c):
-    """Calculate thrust for globe valves"""
-    # Differential pressure force
-    area = valve.get_area()
-    dp_force = area * pressure_bar * 100000  # N
-    
-    # Packing friction force
-    stem_area = math.pi * (valve.stem_dia_mm / 1000 / 2)**2
-    packing_force = stem_area * pressure_bar * 100000 * valve.get_seal_friction()
-    
-    # Seat load force (empirical)
-    seat_force = valve.size * 1000
-    
-    # Temperature factor
-    temp_factor = 1.0
-    if temperature_c > 150:
-        temp_factor = 1.0 + (temperature_c - 150) * 0.002
-    
-    return (dp_force + packing_force + seat_force) * temp_factor
-
-def calculate_gate_valve_thrust(valve, pressure_bar, temperature_c):
-    """Calculate thrust for gate valves"""
-    # Differential pressure force
-    area = valve.get_area()
-    dp_force = area * pressure_bar * 100000  # N
-    
-    # Packing friction force
-    stem_area = math.pi * (valve.stem_dia_mm / 1000 / 2)**2
-    packing_force = stem_area * pressure_bar * 100000 * valve.get_seal_friction()
-    
-    # Wedge effect factor
-    wedge_factor = 1.5 if valve.type == "Gate" else 1.0
-    
-    # Temperature factor
-    temp_factor = 1.0
-    if temperature_c > 200:
-        temp_factor = 1.0 + (temperature_c - 200) * 0.0015
-    
-    return (dp_force * wedge_factor + packing_force) * temp_factor
-
-def calculate_valve_torque_thrust(valve, pressure_bar, temperature_c):
-    """Calculate torque or thrust based on valve type"""
-    if valve.type == "Ball" or valve.type == "Plug":
-        return calculate_ball_valve_torque(valve, pressure_bar, temperature_c), "Torque (Nm)"
-    elif valve.type == "Butterfly":
-        return calculate_butterfly_valve_torque(valve, pressure_bar, temperature_c), "Torque (Nm)"
-    elif valve.type == "Globe":
-        return calculate_globe_valve_thrust(valve, pressure_bar, temperature_c), "Thrust (N)"
-    elif valve.type == "Gate":
-        return calculate_gate_valve_thrust(valve, pressure_bar, temperature_c), "Thrust (N)"
-    elif valve.type == "Diaphragm":
-        # Diaphragm valves use thrust but with different calculation
-        area = valve.get_area()
-        return area * pressure_bar * 100000 * 1.2, "Thrust (N)"
-    else:
-        return 0, "Unknown"
-
-# ========================
-# ACTUATOR SELECTION LOGIC
-# ========================
-def find_suitable_actuators(required_value, value_type, valve, safety_factor, supply_type=None):
-    """Find actuators that meet the torque/thrust requirements"""
-    suitable_actuators = []
-    
-    for actuator in ACTUATOR_DATABASE:
-        # Skip actuators that don't match the required motion type
-        if value_type == "Torque (Nm)" and actuator.torque == 0:
-            continue
-        if value_type == "Thrust (N)" and actuator.thrust == 0:
-            continue
-            
-        # Check if actuator matches supply type if specified
-        if supply_type and supply_type != "Any" and actuator.supply != supply_type:
-            continue
-            
-        # Check pressure rating
-        if actuator.max_pressure < valve.max_pressure:
-            continue
-            
-        # Check temperature range
-        if actuator.min_temp > valve.min_temp or actuator.max_temp < valve.max_temp:
-            continue
-            
-        # Check torque/thrust capability with safety factor
-        if value_type == "Torque (Nm)":
-            capability = actuator.torque
-        else:
-            capability = actuator.thrust
-            
-        if capability >= required_value * safety_factor:
-            # Calculate margin
-            margin = (capability / (required_value * safety_factor) - 1) * 100
-            suitable_actuators.append({
-                "actuator": actuator,
-                "capability": capability,
-                "margin": margin
-            })
-    
-    # Sort by capability (ascending) to get the most economical first
-    suitable_actuators.sort(key=lambda x: x["capability"])
-    
-    return suitable_actuators
+from sizing_core import (
+    ACTUATOR_DATABASE, SAFETY_FACTORS, SQLITE_EXTENSIONS, VALVE_DATABASE, ActuatorCatalog,
+    RANKING_OBJECTIVES, calculate_valve_torque_thrust, find_suitable_actuators, load_catalog_file, operating_envelope,
+    rank_suitable_actuators, sizing_status, sweep_pressure, valve_label
+)
+from sizing_dynamics import actuator_parameters, screen_stroke_times, simulate_strokes, stroke_loads
+from sizing_fluids import ATMOSPHERIC_PRESSURE_BAR, FLUID_CHOICES, fluid_model, get_fluid_table
+from sizing_profiles import (
+    ACTUATOR_OUTPUT_CURVES, PROFILE_COEFFICIENTS, SUPPLY_OUTPUT_CURVES, check_actuator_curves, torque_profiles
+)
 
-# ========================
-# ENHANCED PDF REPORT GENERATION
-# ========================
-class EnhancedPDFReport(FPDF):
-    def __init__(self, logo_bytes=None, logo_type=None):
-        super().__init__(orientation='P', unit='mm', format='A4')
-        self.logo_bytes = logo_bytes
-        self.logo_type = logo_type
-        self.set_auto_page_break(auto=True, margin=15)
-        self.set_margins(15, 15, 15)
-        self.set_title("Actuator Sizing Report")
-        self.set_author("VASTAŞ Actuator Sizing Software")
-        self.alias_nb_pages()
-        self.set_compression(True)
-        
-        # Add Unicode support
-        self.add_font('DejaVu', '', 'DejaVuSans.ttf', uni=True)
-        self.add_font('DejaVu', 'B', 'DejaVuSans-Bold.ttf', uni=True)
-        self.add_font('DejaVu', 'I', 'DejaVuSans-Oblique.ttf', uni=True)
-        self.add_font('DejaVu', 'BI', 'DejaVuSans-BoldOblique.ttf', uni=True)
-    
-    def header(self):
-        if self.page_no() == 1:
-            return
-            
-        # Draw top border
-        self.set_draw_color(0, 51, 102)
-        self.set_line_width(0.5)
-        self.line(10, 15, 200, 15)
-        
-        # Logo
-        if self.logo_bytes and self.logo_type:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{self.logo_type.lower()}") as tmpfile:
-                    tmpfile.write(self.logo_bytes)
-                    tmpfile_path = tmpfile.name
-                self.image(tmpfile_path, x=15, y=8, w=20)
-                os.unlink(tmpfile_path)
-            except Exception as e:
-                pass
-        
-        # Title
-        self.set_font('DejaVu', 'B', 10)
-        self.set_text_color(0, 51, 102)
-        self.set_y(10)
-        self.cell(0, 10, 'Actuator Sizing Report', 0, 0, 'C')
-        
-        # Page number
-        self.set_font('DejaVu', 'I', 8)
-        self.set_text_color(100)
-        self.set_y(10)
-        self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', 0, 0, 'R')
-        
-        # Line break
-        self.ln(15)
-        
-    def footer(self):
-        if self.page_no() == 1:
-            return
-            
-        self.set_y(-15)
-        self.set_font('DejaVu', 'I', 8)
-        self.set_text_color(100)
-        self.cell(0, 10, f'Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 0, 0, 'L')
-        self.cell(0, 10, 'Confidential - VASTAŞ Valve Technologies', 0, 0, 'R')
-    
-    def cover_page(self, title, subtitle, project_info=None):
-        self.add_page()
-        
-        # Background rectangle
-        self.set_fill_color(0, 51, 102)
-        self.rect(0, 0, 210, 297, 'F')
-        
-        # Main content area
-        self.set_fill_color(255, 255, 255)
-        self.rect(15, 15, 180, 267, 'F')
-        
-        # Logo at top
-        if self.logo_bytes and self.logo_type:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{self.logo_type.lower()}") as tmpfile:
-                    tmpfile.write(self.logo_bytes)
-                    tmpfile_path = tmpfile.name
-                self.image(tmpfile_path, x=80, y=40, w=50)
-                os.unlink(tmpfile_path)
-            except Exception as e:
-                pass
-        
-        # Title
-        self.set_y(120)
-        self.set_font('DejaVu', 'B', 24)
-        self.set_text_color(0, 51, 102)
-        self.cell(0, 15, title, 0, 1, 'C')
-        
-        # Subtitle
-        self.set_font('DejaVu', 'I', 18)
-        self.set_text_color(70, 70, 70)
-        self.cell(0, 10, subtitle, 0, 1, 'C')
-        
-        # Project info
-        if project_info:
-            self.set_font('DejaVu', '', 14)
-            self.set_text_color(0, 0, 0)
-            self.ln(20)
-            self.cell(0, 10, project_info, 0, 1, 'C')
-        
-        # Company info
-        self.set_y(220)
-        self.set_font('DejaVu', 'B', 14)
-        self.set_text_color(0, 51, 102)
-        self.cell(0, 10, 'VASTAŞ Valve Technologies', 0, 1, 'C')
-        
-        # Date
-        self.set_font('DejaVu', 'I', 12)
-        self.set_text_color(70, 70, 70)
-        self.cell(0, 10, datetime.now().strftime("%B %d, %Y"), 0, 1, 'C')
-        
-        # Confidential notice
-        self.set_y(270)
-        self.set_font('DejaVu', 'I', 10)
-        self.set_text_color(150, 0, 0)
-        self.cell(0, 5, 'CONFIDENTIAL - For internal use only', 0, 0, 'C')
-    
-    def chapter_title(self, title):
-        self.set_font('DejaVu', 'B', 14)
-        self.set_text_color(0, 51, 102)
-        self.set_fill_color(230, 240, 255)
-        self.cell(0, 10, title, 0, 1, 'L', 1)
-        self.ln(5)
-    
-    def chapter_body(self, body, font_size=12):
-        self.set_font('DejaVu', '', font_size)
-        self.set_text_color(0, 0, 0)
-        self.multi_cell(0, 6, body)
-        self.ln()
-    
-    def add_table(self, headers, data, col_widths=None, header_color=(0, 51, 102), 
-                  row_colors=[(255, 255, 255), (240, 248, 255)]):
-        if col_widths is None:
-            col_widths = [self.w / len(headers)] * len(headers)
-        
-        # Table header
-        self.set_font('DejaVu', 'B', 10)
-        self.set_text_color(255, 255, 255)
-        self.set_fill_color(*header_color)
-        
-        for i, header in enumerate(headers):
-            self.cell(col_widths[i], 7, header, 1, 0, 'C', 1)
-        self.ln()
-        
-        # Table data
-        self.set_font('DejaVu', '', 10)
-        self.set_text_color(0, 0, 0)
-        
-        for row_idx, row in enumerate(data):
-            fill_color = row_colors[row_idx % len(row_colors)]
-            self.set_fill_color(*fill_color)
-            
-            for i, item in enumerate(row):
-                self.cell(col_widths[i], 6, str(item), 1, 0, 'C', 1)
-            self.ln()
-    
-    def add_key_value_table(self, data, col_widths=[70, 130], font_size=10):
-        self.set_font('DejaVu', 'B', font_size)
-        self.set_text_color(0, 51, 102)
-        self.set_fill_color(240, 248, 255)
-        
-        for key, value in data:
-            self.cell(col_widths[0], 7, key, 1, 0, 'L', 1)
-            self.set_font('DejaVu', '', font_size)
-            self.set_text_color(0, 0, 0)
-            self.set_fill_color(255, 255, 255)
-            self.multi_cell(col_widths[1], 7, str(value), 1, 'L', 1)
-            self.set_font('DejaVu', 'B', font_size)
-            self.set_text_color(0, 51, 102)
-            self.set_fill_color(240, 248, 255)
+# Plotting (plotly/pandas) and PDF (fpdf) dependencies are imported where they
+# are first used, so the server restarts quickly.
 
 # ========================
 # VISUALIZATION FUNCTIONS
 # ========================
-def plot_actuator_comparison(actuators):
+def plot_actuator_comparison(actuators, total=None):
+    """Capability bar chart of the given actuators; total, when larger, is noted in the title"""
     if not actuators:
         return None
+    
+    import pandas as pd
+    import plotly.express as px
         
     df = pd.DataFrame([{
         "Model": a["actuator"].model,
@@ -460,36 +41,42 @@ def plot_actuator_comparison(actuators):
         "Weight": a["actuator"].weight,
         "Price": a["actuator"].price
     } for a in actuators])
+    title = "Actuator Capability Comparison"
+    if total is not None and total > len(actuators):
+        title += f" (first {len(actuators)} of {total} in ranked order)"
     
     fig = px.bar(df, x="Model", y="Capability", 
                  color="Manufacturer",
-                 title="Actuator Capability Comparison",
+                 title=title,
                  labels={"Capability": "Torque/Thrust Capability"},
                  hover_data=["Margin", "Power", "Weight", "Price"])
     
     fig.update_layout(barmode='group', height=500)
     return fig
 
-def plot_torque_thrust_vs_pressure(valve, temperature_c, max_pressure):
-    pressures = np.linspace(0, max_pressure, 20)
-    values = []
-    labels = []
-    
-    for pressure in pressures:
-        value, value_type = calculate_valve_torque_thrust(valve, pressure, temperature_c)
-        values.append(value)
-        labels.append(value_type)
+def plot_torque_thrust_vs_pressure(valve, valve_index, temperatures_c, max_pressure, surrogate=None, model=None):
+    """Requirement vs pressure at the operating temperature, plus an optional family of other temperatures.
+
+    temperatures_c may be one temperature or a sequence whose first entry is
+    the operating temperature; the curves are sampled adaptively in one sweep.
+    model (e.g. a fluid-aware model) takes precedence over the surrogate.
+    """
+    import plotly.graph_objects as go
     
-    value_type = labels[0]  # All will be the same
+    temperatures = np.atleast_1d(temperatures_c)
+    if model is None and surrogate is not None:
+        model = surrogate.evaluate
+    pressures, values, value_type = sweep_pressure(valve_index, temperatures, max_pressure, model=model)
     
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=pressures, 
-        y=values, 
-        mode='lines+markers',
-        name=value_type,
-        line=dict(width=3)
-    ))
+    for row, temperature in enumerate(temperatures):
+        fig.add_trace(go.Scatter(
+            x=pressures, 
+            y=values[row], 
+            mode='lines',
+            name=f"{value_type} at {temperature:g} °C" if len(temperatures) > 1 else value_type,
+            line=dict(width=3) if row == 0 else dict(width=2, dash='dash')
+        ))
     
     fig.update_layout(
         title=f"{valve.type} Valve {value_type.split(' ')[0]} vs Pressure",
@@ -501,6 +88,289 @@ def plot_torque_thrust_vs_pressure(valve, temperature_c, max_pressure):
     
     return fig
 
+def plot_operating_envelope(envelope, valve):
+    """Heatmap of the cheapest feasible actuator's price over the envelope, with requirement contours"""
+    import plotly.graph_objects as go
+    
+    actuators = envelope["actuators"]
+    rows = envelope["actuator_rows"]
+    feasible = rows >= 0
+    safe_rows = np.where(feasible, rows, 0)
+    price = np.where(feasible, actuators.columns["price"][safe_rows], np.nan)
+    names = np.where(feasible, actuators.labels("manufacturer")[safe_rows] + " " +
+                     actuators.columns["model"][safe_rows].astype(object), "No feasible actuator")
+    value_type = envelope["value_type"]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=envelope["pressures"],
+        y=envelope["temperatures"],
+        z=price,
+        customdata=names,
+        colorscale='Viridis',
+        colorbar=dict(title="Price ($)"),
+        hovertemplate="%{x:.1f} bar, %{y:.0f} °C<br>%{customdata}<br>$%{z:,.0f}<extra></extra>"
+    ))
+    fig.add_trace(go.Contour(
+        x=envelope["pressures"],
+        y=envelope["temperatures"],
+        z=envelope["required"],
+        contours=dict(coloring='lines', showlabels=True),
+        line=dict(color='white', width=1),
+        showscale=False,
+        name=value_type,
+        hovertemplate=f"{value_type}: %{{z:.1f}}<extra></extra>"
+    ))
+    
+    fig.update_layout(
+        title=f"{valve.type} Valve Operating Envelope: Cheapest Feasible Actuator",
+        xaxis_title="Pressure (bar)",
+        yaxis_title="Temperature (°C)",
+        height=550,
+        template='plotly_white'
+    )
+    
+    return fig
+
+def plot_requirement_distribution(requirements, value_type, required_with_sf, bins=80):
+    """Histogram of Monte Carlo requirement samples against the safety-factored requirement"""
+    import plotly.graph_objects as go
+    
+    counts, edges = np.histogram(requirements, bins=bins)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts / len(requirements),
+        width=np.diff(edges),
+        marker_color='#1f77b4',
+        name="Sampled requirement",
+        hovertemplate=f"%{{x:.1f}} {value_type}<br>%{{y:.2%}}<extra></extra>"
+    ))
+    fig.add_vline(x=required_with_sf, line_dash="dash", line_color="red",
+                  annotation_text="With safety factor")
+    
+    fig.update_layout(
+        title="Monte Carlo Requirement Distribution",
+        xaxis_title=value_type,
+        yaxis_title="Share of samples",
+        bargap=0,
+        height=400,
+        template='plotly_white'
+    )
+    
+    return fig
+
+def plot_stroke_profile(profiles, required_with_sf, safety_factor, actuator=None):
+    """Torque over the opening stroke, its components and optionally one actuator's output curve"""
+    import plotly.graph_objects as go
+    
+    angles = profiles["angles"]
+    fig = go.Figure()
+    for key, name in (("unseating", "Unseating"), ("dynamic", "Dynamic"), ("end", "End of stroke")):
+        fig.add_trace(go.Scatter(x=angles, y=profiles[key][0], mode='lines', name=name,
+                                 line=dict(width=1, dash='dot')))
+    fig.add_trace(go.Scatter(x=angles, y=profiles["torque"][0], mode='lines', name="Required torque",
+                             line=dict(width=3)))
+    fig.add_trace(go.Scatter(x=angles, y=profiles["torque"][0] * safety_factor, mode='lines',
+                             name="With safety factor", line=dict(width=2, dash='dash', color='red')))
+    if actuator is not None:
+        curve = SUPPLY_OUTPUT_CURVES.get(actuator.supply, "constant")
+        fig.add_trace(go.Scatter(x=angles, y=actuator.torque * ACTUATOR_OUTPUT_CURVES[curve](angles),
+                                 mode='lines', name=f"{actuator.manufacturer} {actuator.model} output",
+                                 line=dict(width=2, color='green')))
+    
+    fig.update_layout(
+        title=f"Opening Stroke Torque (peak {profiles['peak'][0]:.1f} Nm at {profiles['peak_angle'][0]:g}°, "
+              f"{required_with_sf:.1f} Nm with safety factor)",
+        xaxis_title="Opening angle (°)",
+        yaxis_title="Torque (Nm)",
+        height=450,
+        template='plotly_white'
+    )
+    
+    return fig
+
+def plot_stroke_trajectories(strokes, names, max_stroke_time):
+    """Valve travel over time of simulated strokes (simulate_strokes with trajectories) against the time limit"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    for name, times in zip(names, strokes["time"]):
+        reached = np.isfinite(times)
+        fig.add_trace(go.Scatter(x=times[reached], y=strokes["position"][reached] * 100, mode='lines', name=name))
+    fig.add_vline(x=max_stroke_time, line_dash="dash", line_color="red", annotation_text="Stroke time limit")
+    
+    fig.update_layout(
+        title="Simulated Stroke",
+        xaxis_title="Time (s)",
+        yaxis_title="Valve travel (% open)",
+        height=450,
+        template='plotly_white'
+    )
+    
+    return fig
+
+# ========================
+# RESULTS GRID
+# ========================
+RESULTS_PAGE_SIZES = (25, 50, 100, 250)
+
+# Ranking choices offered above the results (label -> rank_suitable_actuators mode)
+RANKING_MODES = {
+    "Capability": "capability",
+    "Pareto front": "pareto",
+    "Weighted score": "weighted"
+}
+SIZING_STATUSES = ("Over-sized", "Well-sized", "Minimal margin")
+
+# Sort keys over the find_suitable_actuators entries
+RESULTS_SORT_KEYS = {
+    "Rank": None,
+    "Capability": lambda a: a["capability"],
+    "Margin": lambda a: a["margin"],
+    "Price": lambda a: a["actuator"].price,
+    "Power": lambda a: a["actuator"].power,
+    "Weight": lambda a: a["actuator"].weight,
+    "Model": lambda a: f"{a['actuator'].manufacturer} {a['actuator'].model}"
+}
+
+def filter_sort_actuators(suitable_actuators, statuses=None, search="", sort_by="Rank", descending=False):
+    """Positions of the matching entries in display order (stable, so ties keep the ranking order)"""
+    search = search.strip().lower()
+    positions = []
+    for position, entry in enumerate(suitable_actuators):
+        if statuses and sizing_status(entry["margin"])[0] not in statuses:
+            continue
+        act = entry["actuator"]
+        if search and search not in f"{act.manufacturer} {act.model} {act.supply}".lower():
+            continue
+        positions.append(position)
+    key = RESULTS_SORT_KEYS[sort_by]
+    if key is None:
+        return positions[::-1] if descending else positions
+    positions.sort(key=lambda position: key(suitable_actuators[position]), reverse=descending)
+    return positions
+
+def render_actuator_table(entries):
+    """HTML for one page of actuator results, with the sizing status colouring"""
+    rows = []
+    for entry in entries:
+        act = entry["actuator"]
+        status, status_class = sizing_status(entry["margin"])
+        cells = [
+            html.escape(f"{act.manufacturer} {act.model}"),
+            html.escape(act.supply),
+            f"{entry['capability']:.1f}",
+            f"{act.power:.1f} kW",
+            f"{act.weight} kg",
+            f"${act.price}",
+            f"{entry['margin']:.1f}%"
+        ]
+        rows.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) +
+                    f'<td class="{status_class}">{status}</td></tr>')
+    return ("""
+                <table class="actuator-table">
+                    <thead>
+                        <tr>
+                            <th>Model</th>
+                            <th>Type</th>
+                            <th>Capability</th>
+                            <th>Power</th>
+                            <th>Weight</th>
+                            <th>Price</th>
+                            <th>Margin</th>
+                            <th>Status</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                """ + "".join(rows) + "</tbody></table>")
+
+# ========================
+# CACHING
+# ========================
+# Calculation, selection and figure entries kept per session (least recently used are evicted)
+SESSION_CACHE_SIZE = 32
+
+# Monte Carlo sample counts offered in the uncertainty analysis
+MC_SAMPLE_CHOICES = (10_000, 100_000, 1_000_000)
+
+# Candidates listed with their undersize probability
+MC_CANDIDATES_SHOWN = 10
+
+# Candidates checked against their output curves in the stroke profile
+PROFILE_CANDIDATES_SHOWN = 10
+
+# Stroke time screening: default limit (s), candidates listed and candidates plotted
+DEFAULT_MAX_STROKE_TIME = 10.0
+STROKE_CANDIDATES_SHOWN = 25
+STROKE_CANDIDATES_PLOTTED = 5
+
+# Bars in the actuator comparison chart (the best ranked; the table pages through the rest)
+COMPARISON_CANDIDATES_PLOTTED = 25
+
+@st.cache_resource
+def get_valve_options():
+    """Valve picker entries, built once per process and shared by all sessions"""
+    return {valve_label(valve): valve for valve in VALVE_DATABASE}
+
+@st.cache_resource
+def get_actuator_catalog():
+    """Actuator catalog named by ACTUATOR_SIZING_CATALOG, else the built-in one.
+
+    CSV and binary files are loaded (binary ones memory-mapped); a SQLite
+    store is not loaded at all: its index answers selections with SQL.
+    """
+    path = os.environ.get("ACTUATOR_SIZING_CATALOG")
+    if not path:
+        return ACTUATOR_DATABASE
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        from sizing_store import SQLiteCatalogStore
+        return SQLiteCatalogStore(path).actuator_index()
+    return load_catalog_file(path, ActuatorCatalog)
+
+def envelope_actuators(valve, supply_type):
+    """In-memory actuators for an operating envelope (from a SQLite store, only those the valve can use)"""
+    actuators = get_actuator_catalog()
+    if isinstance(actuators, ActuatorCatalog):
+        return actuators
+    return actuators.store.actuator_catalog(supply_type=supply_type, max_pressure=valve.max_pressure,
+                                            min_temp=valve.min_temp, max_temp=valve.max_temp)
+
+@st.cache_resource
+def get_surrogate_table():
+    """Spline surrogate of VALVE_DATABASE, loaded from (or built into) the on-disk cache once per process"""
+    from sizing_surrogate import get_surrogate
+    return get_surrogate()
+
+def session_cached(namespace, key, compute):
+    """Return compute() memoized under (namespace, key) in this session's bounded LRU cache"""
+    cache = st.session_state.setdefault("_lru_cache", OrderedDict())
+    cache_key = (namespace, key)
+    if cache_key in cache:
+        cache.move_to_end(cache_key)
+        return cache[cache_key]
+    value = compute()
+    cache[cache_key] = value
+    while len(cache) > SESSION_CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+def _selection_key(results, supply_type):
+    return (valve_label(results["valve"]), results["required_value"], results["value_type"],
+            results["safety_factor"], supply_type)
+
+def cached_suitable_actuators(results, supply_type, top_k=None):
+    """find_suitable_actuators for the current results, shared by the selection tab and the export"""
+    return session_cached("selection", (_selection_key(results, supply_type), top_k), lambda: find_suitable_actuators(
+        results["required_value"],
+        results["value_type"],
+        results["valve"],
+        results["safety_factor"],
+        supply_type,
+        get_actuator_catalog(),
+        top_k
+    ))
+
 # ========================
 # STREAMLIT APPLICATION
 # ========================
@@ -608,22 +478,29 @@ def main():
             st.session_state.logo_type = "PNG"
             st.success("Logo uploaded successfully!")
         if st.session_state.logo_bytes:
-            st.image(Image.open(BytesIO(st.session_state.logo_bytes)), use_container_width=True)
+            st.image(st.session_state.logo_bytes, use_container_width=True)
         elif os.path.exists("logo.png"):
-            st.image(Image.open("logo.png"), use_container_width=True)
+            st.image("logo.png", use_container_width=True)
         else:
             st.image("https://via.placeholder.com/300x100?text=VASTAŞ+Logo", use_container_width=True)
         
         st.header("Valve Selection")
-        valve_options = {f"{valve.size}\" {valve.type} (Class {valve.pressure_class})": valve for valve in VALVE_DATABASE}
+        valve_options = get_valve_options()
         selected_valve_name = st.selectbox("Select Valve", list(valve_options.keys()))
         selected_valve = valve_options[selected_valve_name]
+        selected_valve_index = list(valve_options).index(selected_valve_name)
         
         st.header("Operating Conditions")
         pressure = st.number_input("Operating Pressure (bar)", min_value=0.0, max_value=500.0, value=10.0, step=1.0)
         temperature = st.number_input("Operating Temperature (°C)", min_value=-50.0, max_value=500.0, value=20.0, step=1.0)
         safety_factor = st.selectbox("Safety Factor", list(SAFETY_FACTORS.keys()), index=0)
         supply_type = st.selectbox("Actuator Supply Type", ["Any", "Pneumatic", "Electric", "Hydraulic"])
+        fluid_choice = st.selectbox("Process Fluid", ["Not specified", *FLUID_CHOICES],
+                                    help="Adds the fluid's dynamic term (density, viscosity, vapour pressure)")
+        fluid = None if fluid_choice == "Not specified" else fluid_choice
+        surrogate_mode = st.checkbox("Surrogate mode (interpolated tables)", value=False,
+                                     help="Use precomputed spline tables for calculations and curves",
+                                     disabled=fluid is not None)
         
         st.header("Actions")
         calculate_btn = st.button("Calculate Torque/Thrust", type="primary", use_container_width=True)
@@ -639,7 +516,7 @@ def main():
         st.markdown(f"**Temp Range:** {selected_valve.min_temp}°C to {selected_valve.max_temp}°C")
     
     # Main content area
-    tab1, tab2 = st.tabs(["Calculation", "Actuator Selection"])
+    tab1, tab2, tab3 = st.tabs(["Calculation", "Actuator Selection", "Operating Envelope"])
     
     with tab1:
         st.subheader("Torque/Thrust Calculation")
@@ -647,7 +524,20 @@ def main():
         if calculate_btn:
             try:
                 # Calculate torque/thrust
-                required_value, value_type = calculate_valve_torque_thrust(selected_valve, pressure, temperature)
+                if fluid is not None:
+                    values, labels = session_cached(
+                        "calculation", (selected_valve_name, pressure, temperature, fluid),
+                        lambda: fluid_model(fluid)(pressure, temperature, selected_valve_index, VALVE_DATABASE)
+                    )
+                    required_value, value_type = float(values), str(labels)
+                elif surrogate_mode:
+                    values, labels = get_surrogate_table().evaluate(pressure, temperature, selected_valve_index)
+                    required_value, value_type = float(values), str(labels)
+                else:
+                    required_value, value_type = session_cached(
+                        "calculation", (selected_valve_name, pressure, temperature),
+                        lambda: calculate_valve_torque_thrust(selected_valve, pressure, temperature)
+                    )
                 sf_value = SAFETY_FACTORS[safety_factor]
                 required_with_sf = required_value * sf_value
                 
@@ -657,6 +547,9 @@ def main():
                     "safety_factor": sf_value,
                     "required_with_sf": required_with_sf,
                     "valve": selected_valve,
+                    "valve_index": selected_valve_index,
+                    "surrogate": surrogate_mode and fluid is None,
+                    "fluid": fluid,
                     "pressure": pressure,
                     "temperature": temperature
                 }
@@ -677,12 +570,58 @@ def main():
                 st.metric("Required with Safety Factor", f"{results['required_with_sf']:.1f}", value_type)
             
             st.subheader("Visualization")
-            fig = plot_torque_thrust_vs_pressure(
-                results["valve"], 
-                results["temperature"],
-                min(100, results["valve"].max_pressure)
+            plot_max_pressure = min(100, results["valve"].max_pressure)
+            surrogate = get_surrogate_table() if results["surrogate"] else None
+            family_options = [t for t in np.linspace(results["valve"].min_temp, results["valve"].max_temp, 7).round().tolist()
+                              if t != results["temperature"]]
+            family = st.multiselect("Compare with other temperatures (°C)", family_options)
+            plot_temperatures = (results["temperature"], *family)
+            fig = session_cached(
+                "pressure_plot",
+                (valve_label(results["valve"]), plot_temperatures, plot_max_pressure, results["surrogate"],
+                 results["fluid"]),
+                lambda: plot_torque_thrust_vs_pressure(results["valve"], results["valve_index"], plot_temperatures,
+                                                       plot_max_pressure, surrogate,
+                                                       fluid_model(results["fluid"]) if results["fluid"] else None)
             )
             st.plotly_chart(fig, use_container_width=True)
+            if surrogate is not None:
+                unit = value_type[value_type.find("(") + 1:-1] if "(" in value_type else ""
+                st.caption(f"Surrogate mode: estimated within ±{surrogate.error_estimate[results['valve_index']]:.3g} "
+                           f"{unit} of the exact correlation inside the valve's pressure/temperature rating")
+            
+            if results["valve"].type in PROFILE_COEFFICIENTS:
+                st.subheader("Stroke Profile")
+                profiles = session_cached(
+                    "stroke_profile", (valve_label(results["valve"]), results["pressure"], results["temperature"],
+                                       results["fluid"]),
+                    lambda: torque_profiles(results["pressure"], results["temperature"], results["valve_index"],
+                                            fluid=results["fluid"], components=True)
+                )
+                candidates = cached_suitable_actuators(results, supply_type, PROFILE_CANDIDATES_SHOWN)
+                shown = None
+                if candidates:
+                    ok, margins, critical = check_actuator_curves(
+                        profiles, 0, [a["capability"] for a in candidates],
+                        [a["actuator"].supply for a in candidates], results["safety_factor"])
+                    passing = np.flatnonzero(ok)
+                    if passing.size:
+                        shown = candidates[int(passing[0])]["actuator"]
+                st.plotly_chart(plot_stroke_profile(profiles, results["required_with_sf"],
+                                                    results["safety_factor"], shown),
+                                use_container_width=True)
+                if candidates:
+                    st.caption("Candidates checked against their output curves over the whole stroke "
+                               "(scotch-yoke for pneumatic/hydraulic, constant for electric)")
+                    st.table([{
+                        "Model": f"{a['actuator'].manufacturer} {a['actuator'].model}",
+                        "Output curve": SUPPLY_OUTPUT_CURVES.get(a["actuator"].supply, "constant"),
+                        "Breakaway margin": f"{a['margin']:.1f}%",
+                        "Stroke margin": f"{margin:.1f}%",
+                        "Critical angle": f"{angle:g}°",
+                        "Meets profile": "Yes" if passed else "No"
+                    } for a, passed, margin, angle in zip(candidates, ok.tolist(), margins.tolist(),
+                                                          critical.tolist())])
             
             st.subheader("Calculation Details")
             with st.expander("View calculation parameters"):
@@ -693,6 +632,14 @@ def main():
                 st.markdown(f"**Operating Pressure:** {results['pressure']} bar")
                 st.markdown(f"**Operating Temperature:** {results['temperature']} °C")
                 st.markdown(f"**Safety Factor:** {results['safety_factor']} ({safety_factor})")
+                if results["fluid"]:
+                    properties = get_fluid_table(results["fluid"]).evaluate(
+                        results["pressure"] + ATMOSPHERIC_PRESSURE_BAR, results["temperature"])
+                    phase = "liquid" if properties["liquid"] else "gas/vapour"
+                    st.markdown(f"**Process Fluid:** {results['fluid']} ({phase}), "
+                                f"density {float(properties['density']):.4g} kg/m³, "
+                                f"viscosity {float(properties['viscosity']) * 1000:.4g} mPa·s, "
+                                f"vapour pressure {float(properties['vapour_pressure']):.4g} bar(a)")
                 
                 if "Torque" in value_type:
                     st.markdown("""
@@ -707,6 +654,51 @@ def main():
                     - Packing friction force: Stem Area × Pressure × Friction Coefficient
                     - Seat load: Empirical value based on valve size
                     """)
+                if results["fluid"]:
+                    st.markdown("""
+                    **Process Fluid Dynamic Term:** Coefficient × Bore Area × Velocity Head × Viscosity Factor
+                    × Cavitation Factor (× bore radius for torque), with fluid properties from interpolated tables
+                    """)
+            
+            st.subheader("Uncertainty Analysis")
+            with st.expander("Monte Carlo sizing"):
+                from sizing_uncertainty import (
+                    DEFAULT_UNCERTAINTY, MC_SAMPLES, sample_requirements, summarize_requirements,
+                    undersize_probabilities
+                )
+                st.caption("Samples pressure, temperature, seal friction, seat factor, temperature derating and "
+                           "an overall model factor: " +
+                           ", ".join(f"{name} {spec}" for name, spec in DEFAULT_UNCERTAINTY.items()))
+                mc_col1, mc_col2 = st.columns(2)
+                with mc_col1:
+                    mc_samples = st.select_slider("Samples", MC_SAMPLE_CHOICES, value=MC_SAMPLES)
+                with mc_col2:
+                    mc_seed = st.number_input("Seed", min_value=0, value=0, step=1)
+                if st.checkbox("Run Monte Carlo analysis", key="monte_carlo"):
+                    requirements = session_cached(
+                        "monte_carlo", (valve_label(results["valve"]), results["pressure"], results["temperature"],
+                                        results["fluid"], mc_samples, mc_seed),
+                        lambda: np.sort(sample_requirements(results["valve_index"], results["pressure"],
+                                                            results["temperature"], samples=mc_samples,
+                                                            seed=mc_seed, fluid=results["fluid"])[0])
+                    )
+                    summary = summarize_requirements(requirements)
+                    metric_cols = st.columns(len(summary["percentiles"]))
+                    for col, (percentile, value) in zip(metric_cols, summary["percentiles"].items()):
+                        with col:
+                            st.metric(f"P{percentile}", f"{value:.1f}", value_type)
+                    st.plotly_chart(plot_requirement_distribution(requirements, value_type,
+                                                                  results["required_with_sf"]),
+                                    use_container_width=True)
+                    candidates = cached_suitable_actuators(results, supply_type, MC_CANDIDATES_SHOWN)
+                    if candidates:
+                        probabilities = undersize_probabilities(requirements, [a["capability"] for a in candidates])
+                        st.table([{
+                            "Model": f"{a['actuator'].manufacturer} {a['actuator'].model}",
+                            "Capability": f"{a['capability']:.1f}",
+                            "Margin": f"{a['margin']:.1f}%",
+                            "P(undersized)": f"{probability:.3%}"
+                        } for a, probability in zip(candidates, probabilities.tolist())])
     
     with tab2:
         st.subheader("Actuator Selection")
@@ -716,93 +708,153 @@ def main():
             value_type = results["value_type"]
             
             # Find suitable actuators
-            suitable_actuators = find_suitable_actuators(
-                results["required_value"],
-                results["value_type"],
-                results["valve"],
-                results["safety_factor"],
-                supply_type
-            )
+            suitable_actuators = cached_suitable_actuators(results, supply_type)
+            
+            # Optional multi-objective ranking of the feasible set
+            ranking_mode = st.radio("Rank actuators by", list(RANKING_MODES), horizontal=True, key="ranking_mode")
+            mode = RANKING_MODES[ranking_mode]
+            weights = {}
+            if suitable_actuators and mode != "capability":
+                with st.expander("Ranking weights"):
+                    weight_cols = st.columns(len(RANKING_OBJECTIVES))
+                    for col, name in zip(weight_cols, RANKING_OBJECTIVES):
+                        with col:
+                            weights[name] = st.slider(name.title(), 0.0, 1.0, 1.0, 0.1, key=f"ranking_weight_{name}")
+                found = len(suitable_actuators)
+                suitable_actuators = session_cached(
+                    "ranking", (_selection_key(results, supply_type), mode, tuple(weights.items())),
+                    lambda: rank_suitable_actuators(suitable_actuators, mode, weights=weights)
+                )
+                if mode == "pareto":
+                    st.caption(f"{len(suitable_actuators)} of {found} suitable actuators are Pareto-optimal on "
+                               f"{', '.join(RANKING_OBJECTIVES)}, ordered by weighted score")
             
             if suitable_actuators:
                 st.success(f"Found {len(suitable_actuators)} suitable actuators")
                 
                 # Show actuator comparison chart
-                st.plotly_chart(plot_actuator_comparison(suitable_actuators), use_container_width=True)
+                comparison_fig = session_cached("comparison_plot",
+                                                (_selection_key(results, supply_type), mode, tuple(weights.items())),
+                                                lambda: plot_actuator_comparison(
+                                                    suitable_actuators[:COMPARISON_CANDIDATES_PLOTTED],
+                                                    len(suitable_actuators)))
+                st.plotly_chart(comparison_fig, use_container_width=True)
                 
-                # Show actuator table
+                # Show actuator table: filtered, sorted and paginated here so only one page is sent
                 st.subheader("Recommended Actuators")
-                actuator_data = []
-                for actuator in suitable_actuators:
-                    act = actuator["actuator"]
-                    capability = actuator["capability"]
-                    margin = actuator["margin"]
-                    
-                    # Determine status
-                    if margin > 50:
-                        status = "Over-sized"
-                        status_class = "status-yellow"
-                    elif margin > 20:
-                        status = "Well-sized"
-                        status_class = "status-green"
-                    else:
-                        status = "Minimal margin"
-                        status_class = "status-red"
-                    
-                    actuator_data.append([
-                        f"{act.manufacturer} {act.model}",
-                        act.supply,
-                        f"{capability:.1f}",
-                        f"{act.power:.1f} kW",
-                        f"{act.weight} kg",
-                        f"${act.price}",
-                        f"{margin:.1f}%",
-                        status
-                    ])
+                filter_col, status_col, sort_col, order_col = st.columns([3, 3, 2, 1])
+                with filter_col:
+                    search = st.text_input("Filter by model, manufacturer or supply", key="results_search")
+                with status_col:
+                    statuses = st.multiselect("Status", SIZING_STATUSES, key="results_status")
+                with sort_col:
+                    sort_by = st.selectbox("Sort by", list(RESULTS_SORT_KEYS), key="results_sort")
+                with order_col:
+                    descending = st.checkbox("Descending", key="results_descending")
                 
-                # Create HTML table with styling
-                html_table = """
-                <table class="actuator-table">
-                    <thead>
-                        <tr>
-                            <th>Model</th>
-                            <th>Type</th>
-                            <th>Capability</th>
-                            <th>Power</th>
-                            <th>Weight</th>
-                            <th>Price</th>
-                            <th>Margin</th>
-                            <th>Status</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                """
+                positions = filter_sort_actuators(suitable_actuators, statuses, search, sort_by, descending)
+                if positions:
+                    size_col, page_col = st.columns([1, 1])
+                    with size_col:
+                        page_size = st.selectbox("Rows per page", RESULTS_PAGE_SIZES, key="results_page_size")
+                    page_count = (len(positions) - 1) // page_size + 1
+                    # The page lives in session state only; filters can shrink the result, so restart
+                    # from the first page rather than overflow
+                    if 'results_page' not in st.session_state or st.session_state.results_page > page_count:
+                        st.session_state.results_page = 1
+                    with page_col:
+                        page = st.number_input("Page", min_value=1, max_value=page_count, step=1,
+                                               key="results_page")
+                    first = (page - 1) * page_size
+                    page_positions = positions[first:first + page_size]
+                    
+                    st.caption(f"Showing {first + 1}–{first + len(page_positions)} of {len(positions)} "
+                               f"matching actuators (page {page} of {page_count})")
+                    st.markdown(render_actuator_table([suitable_actuators[p] for p in page_positions]),
+                                unsafe_allow_html=True)
+                else:
+                    st.info("No actuators match the current filters.")
                 
-                for row in actuator_data:
-                    html_table += "<tr>"
-                    for i, item in enumerate(row):
-                        if i == 7:  # Status column
-                            if "Over-sized" in item:
-                                html_table += f'<td class="status-yellow">{item}</td>'
-                            elif "Well-sized" in item:
-                                html_table += f'<td class="status-green">{item}</td>'
-                            else:
-                                html_table += f'<td class="status-red">{item}</td>'
+                st.subheader("Stroke Time Screening")
+                with st.expander("Simulate stroke times"):
+                    st.caption("Integrates each actuator's output (rated output along its output curve, drooping "
+                               "with speed up to its rated power) against the valve's stroke load profile")
+                    stroke_col1, stroke_col2 = st.columns(2)
+                    with stroke_col1:
+                        max_stroke_time = st.number_input("Stroke time limit (s)", min_value=0.1,
+                                                          value=DEFAULT_MAX_STROKE_TIME, step=1.0)
+                    with stroke_col2:
+                        direction = st.selectbox("Stroke", ["close", "open"], format_func=str.capitalize)
+                    if st.checkbox("Run stroke simulation", key="stroke_simulation"):
+                        screened = session_cached(
+                            "stroke_times",
+                            # The stroke loads depend on the duty point itself, not just on its requirement
+                            (_selection_key(results, supply_type), results["pressure"], results["temperature"],
+                             results["fluid"], mode, tuple(weights.items()), direction),
+                            lambda: screen_stroke_times(results["valve_index"], results["pressure"],
+                                                        results["temperature"], suitable_actuators,
+                                                        direction=direction, fluid=results["fluid"])
+                        )
+                        meeting = [entry for entry in screened if entry["stroke_time"] <= max_stroke_time]
+                        if meeting:
+                            st.success(f"{len(meeting)} of {len(screened)} suitable actuators stroke within "
+                                       f"{max_stroke_time:g} s")
                         else:
-                            html_table += f"<td>{item}</td>"
-                    html_table += "</tr>"
-                
-                html_table += "</tbody></table>"
-                
-                st.markdown(html_table, unsafe_allow_html=True)
+                            st.warning(f"None of the {len(screened)} suitable actuators strokes within "
+                                       f"{max_stroke_time:g} s")
+                        plotted = (meeting or screened)[:STROKE_CANDIDATES_PLOTTED]
+                        loads = stroke_loads(results["pressure"], results["temperature"], results["valve_index"],
+                                             fluid=results["fluid"])
+                        strokes = simulate_strokes(
+                            loads, np.zeros(len(plotted), dtype=np.intp),
+                            actuator_parameters([e["capability"] for e in plotted],
+                                                [e["actuator"].power for e in plotted],
+                                                [e["actuator"].supply for e in plotted],
+                                                [e["actuator"].weight for e in plotted], loads["rotary"][0]),
+                            direction, trajectories=True)
+                        st.plotly_chart(plot_stroke_trajectories(
+                            strokes, [f"{e['actuator'].manufacturer} {e['actuator'].model}" for e in plotted],
+                            max_stroke_time), use_container_width=True)
+                        st.table([{
+                            "Model": f"{e['actuator'].manufacturer} {e['actuator'].model}",
+                            "Supply": e["actuator"].supply,
+                            "Margin": f"{e['margin']:.1f}%",
+                            "Stroke time": "Stalls" if e["stalled"] else f"{e['stroke_time']:.2f} s",
+                            "Within limit": "Yes" if e["stroke_time"] <= max_stroke_time else "No"
+                        } for e in screened[:STROKE_CANDIDATES_SHOWN]])
             else:
                 st.warning("No suitable actuators found. Consider increasing the safety factor or selecting a different valve.")
         else:
             st.info("Perform a calculation first to see actuator recommendations")
     
+    with tab3:
+        st.subheader("Operating Envelope")
+        st.caption(f"Requirement and cheapest feasible actuator over "
+                   f"{selected_valve.min_pressure}–{selected_valve.max_pressure} bar and "
+                   f"{selected_valve.min_temp}–{selected_valve.max_temp} °C "
+                   f"({safety_factor} safety factor, {supply_type} supply"
+                   f"{f', {fluid}' if fluid else ''})")
+        
+        sf_value = SAFETY_FACTORS[safety_factor]
+        envelope = session_cached("envelope", (selected_valve_name, sf_value, supply_type, fluid),
+                                  lambda: operating_envelope(
+                                      selected_valve_index, sf_value, supply_type,
+                                      actuators=envelope_actuators(selected_valve, supply_type),
+                                      model=fluid_model(fluid) if fluid else None))
+        feasible_share = (envelope["actuator_rows"] >= 0).mean()
+        if feasible_share == 0:
+            st.warning("No actuator covers any point of this valve's envelope.")
+        else:
+            if feasible_share < 1:
+                st.warning(f"Only {feasible_share:.0%} of the envelope has a feasible actuator (blank cells).")
+            envelope_fig = session_cached("envelope_plot", (selected_valve_name, sf_value, supply_type, fluid),
+                                          lambda: plot_operating_envelope(envelope, selected_valve))
+            st.plotly_chart(envelope_fig, use_container_width=True)
+    
     if export_btn and st.session_state.results:
         try:
             # Generate PDF report
+            from sizing_report import EnhancedPDFReport, spool_report
             pdf = EnhancedPDFReport(logo_bytes=st.session_state.logo_bytes, 
                                   logo_type=st.session_state.logo_type)
             
@@ -813,85 +865,34 @@ def main():
                 project_info=f"Prepared by VASTAŞ Engineering Department"
             )
             
-            # Valve details
+            # Valve details, operating conditions, results and recommendations
             pdf.add_page()
-            pdf.chapter_title('Valve Details')
-            valve = st.session_state.results["valve"]
-            valve_details = [
-                ("Valve Type:", valve.type),
-                ("Size:", f"{valve.size}\""),
-                ("Pressure Class:", str(valve.pressure_class)),
-                ("Seat Material:", valve.seat_material),
-                ("Stem Diameter:", f"{valve.stem_dia_mm} mm"),
-                ("Max Pressure:", f"{valve.max_pressure} bar"),
-                ("Temperature Range:", f"{valve.min_temp}°C to {valve.max_temp}°C")
-            ]
-            pdf.add_key_value_table(valve_details)
+            suitable_actuators = cached_suitable_actuators(st.session_state.results, supply_type)
+            pdf.add_sizing_sections(st.session_state.results, suitable_actuators, safety_factor)
             
-            # Operating conditions
-            pdf.chapter_title('Operating Conditions')
-            op_conditions = [
-                ("Operating Pressure:", f"{st.session_state.results['pressure']} bar"),
-                ("Operating Temperature:", f"{st.session_state.results['temperature']} °C"),
-                ("Safety Factor:", f"{st.session_state.results['safety_factor']} ({safety_factor})")
-            ]
-            pdf.add_key_value_table(op_conditions)
-            
-            # Calculation results
-            pdf.chapter_title('Calculation Results')
-            value_type = st.session_state.results["value_type"]
-            calc_results = [
-                ("Required Value:", f"{st.session_state.results['required_value']:.1f} {value_type}"),
-                ("With Safety Factor:", f"{st.session_state.results['required_with_sf']:.1f} {value_type}")
-            ]
-            pdf.add_key_value_table(calc_results)
-            
-            # Actuator recommendations
-            suitable_actuators = find_suitable_actuators(
-                st.session_state.results["required_value"],
-                st.session_state.results["value_type"],
-                st.session_state.results["valve"],
-                st.session_state.results["safety_factor"],
-                supply_type
-            )
-            
-            if suitable_actuators:
-                pdf.add_page()
-                pdf.chapter_title('Recommended Actuators')
-                actuator_data = []
-                for actuator in suitable_actuators:
-                    act = actuator["actuator"]
-                    actuator_data.append([
-                        f"{act.manufacturer} {act.model}",
-                        act.supply,
-                        f"{actuator['capability']:.1f}",
-                        f"{actuator['margin']:.1f}%",
-                        f"{act.power:.1f} kW",
-                        f"{act.weight} kg",
-                        f"${act.price}"
-                    ])
-                pdf.add_table(
-                    ["Model", "Type", "Capability", "Margin", "Power", "Weight", "Price"],
-                    actuator_data,
-                    col_widths=[40, 25, 25, 20, 20, 20, 20]
-                )
-            
-            # Generate PDF in memory
-            pdf_bytes_io = BytesIO()
-            pdf.output(pdf_bytes_io)
-            pdf_bytes_io.seek(0)
+            # Write the PDF to the spool directory and serve the download from that file
+            report_path = spool_report(pdf)
+            del pdf
             
             # Download button
-            st.sidebar.download_button(
-                label="Download PDF Report",
-                data=pdf_bytes_io,
-                file_name=f"actuator_sizing_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-                mime="application/pdf"
-            )
+            with open(report_path, "rb") as report_file:
+                st.sidebar.download_button(
+                    label="Download PDF Report",
+                    data=report_file,
+                    file_name=f"actuator_sizing_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                    mime="application/pdf"
+                )
             st.sidebar.success("PDF report generated successfully!")
         except Exception as e:
             st.sidebar.error(f"PDF generation failed: {str(e)}")
             st.sidebar.text(traceback.format_exc())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # Kept for compatibility; sizing_batch.py is the lighter entry point
+        from sizing_batch import batch_cli
+        sys.exit(batch_cli(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "catalog":
+        from sizing_batch import catalog_cli
+        sys.exit(catalog_cli(sys.argv[2:]))
+    main()
@@ -0,0 +1,712 @@
+"""Headless batch sizing of tag lists, streamed from CSV/JSONL."""
+import argparse
+import collections
+import csv
+import itertools
+import json
+import math
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sizing_core import (
+    ACTUATOR_DATABASE, SAFETY_FACTORS, VALVE_DATABASE, ActuatorCatalog, calculate_valve_torque_thrust_batch,
+    get_actuator_index, load_catalog_file, rank_candidates, save_catalog, select_actuators_batch, size_valve, sizing_status,
+    valve_label
+)
+from sizing_dynamics import selection_stroke_times, stroke_loads
+from sizing_fluids import fluid_dynamic_terms, get_fluid_table
+from sizing_profiles import select_actuators_for_profiles, torque_profiles
+from sizing_uncertainty import MC_PERCENTILES, sample_requirements, summarize_requirements, undersize_probabilities
+
+# ========================
+# HEADLESS BATCH SIZING
+# ========================
+# Tag list columns (CSV header / JSONL keys); safety_factor, supply_type and fluid are optional
+TAG_FIELDS = ("tag", "valve", "pressure", "temperature", "safety_factor", "supply_type", "fluid")
+
+RESULT_FIELDS = (
+    "tag", "valve", "pressure", "temperature", "safety_factor", "supply_type", "fluid",
+    "value_type", "required_value", "required_with_sf", "suitable_count",
+    "recommended_actuator", "recommended_supply", "recommended_capability",
+    "recommended_margin", "recommended_status", "error"
+)
+
+# Extra columns of a Monte Carlo run (--monte-carlo)
+UNCERTAINTY_RESULT_FIELDS = ("requirement_mean", "requirement_std",
+                             *(f"requirement_p{percentile}" for percentile in MC_PERCENTILES),
+                             "recommended_p_undersized")
+
+# Extra columns of a stroke profile run (--profiles); blank for valves that are not quarter-turn
+PROFILE_RESULT_FIELDS = ("running_torque", "end_of_stroke_torque", "dynamic_torque", "peak_torque",
+                         "peak_angle", "profile_suitable_count", "profile_actuator", "profile_margin",
+                         "profile_critical_angle")
+
+# Extra columns of a stroke-time screening run (--max-stroke-time)
+STROKE_RESULT_FIELDS = ("recommended_stroke_time", "stroke_ok_count", "stroke_actuator", "stroke_actuator_margin",
+                        "stroke_actuator_time")
+
+# Tags sized per vectorized pass; bounds memory regardless of input size
+BATCH_CHUNK_SIZE = 1000
+
+def _build_valve_references(catalog):
+    references = {}
+    for row, valve in enumerate(catalog):
+        references[valve_label(valve)] = row
+        references[str(row)] = row
+    return references
+
+def resolve_valve_reference(reference, valves=None):
+    """Catalog row for a valve given by its display name or its catalog index"""
+    if valves is None:
+        valves = VALVE_DATABASE
+    references = valves.derived("valve_references", _build_valve_references)
+    reference = str(reference).strip()
+    if reference not in references:
+        raise ValueError(f"Unknown valve reference: {reference!r}")
+    return references[reference]
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+class InvalidTagRecord(dict):
+    """Placeholder for an input line that is not a tag record; sized as an error row"""
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+def read_tag_records(stream, fmt="csv"):
+    """Yield one dict per tag from a CSV or JSONL stream without reading it all.
+
+    Malformed JSONL lines and lines that are not JSON objects are yielded as
+    InvalidTagRecord, so they become error rows instead of ending the run.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield InvalidTagRecord(f"Line {line_number}: invalid JSON: {e}")
+                continue
+            if not isinstance(record, dict):
+                yield InvalidTagRecord(f"Line {line_number}: expected a JSON object, got {type(record).__name__}")
+                continue
+            yield record
+
+def _record_tag(record):
+    return record.get("tag", "") if isinstance(record, dict) else ""
+
+def _parse_tag_record(record, valves):
+    """Validate one tag record; returns (valve_row, pressure, temperature, safety factor class, supply, fluid)"""
+    if isinstance(record, InvalidTagRecord):
+        raise ValueError(record.error)
+    if not isinstance(record, dict):
+        raise ValueError(f"Expected a tag record object, got {type(record).__name__}")
+    valve_row = resolve_valve_reference(record.get("valve", ""), valves)
+    pressure = float(record["pressure"])
+    temperature = float(record["temperature"])
+    sf_class = record.get("safety_factor") or "Standard"
+    if sf_class not in SAFETY_FACTORS:
+        raise ValueError(f"Unknown safety factor class: {sf_class!r}")
+    supply = record.get("supply_type") or "Any"
+    fluid = record.get("fluid") or ""
+    if fluid:
+        # Fails for fluids CoolProp does not know; builds the property table on first use
+        get_fluid_table(fluid)
+    return valve_row, pressure, temperature, sf_class, supply, fluid
+
+def result_fields(monte_carlo=None, profiles=False, stroke=None):
+    """Output columns of a batch run with the given options"""
+    fields = RESULT_FIELDS
+    if monte_carlo is not None:
+        fields += UNCERTAINTY_RESULT_FIELDS
+    if profiles:
+        fields += PROFILE_RESULT_FIELDS
+    if stroke is not None:
+        fields += STROKE_RESULT_FIELDS
+    return fields
+
+def _size_tag_chunk(records, valves, actuators, ranking="capability", monte_carlo=None, start=0, profiles=False,
+                    stroke=None, candidates=None, report=None):
+    """Size one chunk of tag records; returns result dicts in input order.
+
+    monte_carlo holds sample_requirements keyword arguments (samples, seed,
+    uncertainty) for a Monte Carlo run; start is the chunk's first row in
+    the tag list, which keys each tag's random streams. profiles adds the
+    stroke profile columns and the output-curve checked recommendation.
+    stroke ({"max_time": seconds, "direction": "open" or "close"}) screens
+    every candidate's simulated stroke time. candidates lists that many
+    top-ranked actuators per tag under "candidates" (for JSON output).
+    report ({"top_k": k or None}) keeps each tag's ranked candidate rows
+    under "report", for report_results_from_spool.
+    """
+    fields = result_fields(monte_carlo, profiles, stroke)
+    results = []
+    parsed = []
+    for position, record in enumerate(records, start):
+        tag = _record_tag(record)
+        result = dict.fromkeys(fields, "")
+        result["tag"] = tag
+        try:
+            valve_row, pressure, temperature, sf_class, supply, fluid = _parse_tag_record(record, valves)
+        except (KeyError, TypeError, ValueError) as e:
+            result["error"] = str(e)
+            results.append(result)
+            continue
+        result.update({
+            "valve": valve_label(valves[valve_row]),
+            "pressure": pressure,
+            "temperature": temperature,
+            "safety_factor": sf_class,
+            "supply_type": supply,
+            "fluid": fluid
+        })
+        results.append(result)
+        parsed.append((result, valve_row, pressure, temperature, SAFETY_FACTORS[sf_class], supply, fluid, position))
+
+    if not parsed:
+        return results
+
+    rows, valve_rows, pressures, temperatures, sf_values, supplies, fluids, positions = zip(*parsed)
+    valve_rows = np.array(valve_rows, dtype=np.intp)
+    required, value_types = calculate_valve_torque_thrust_batch(pressures, temperatures, valve_rows, valves)
+    # Dynamic terms of the process fluids, one vectorized table lookup per fluid
+    fluid_names = np.array(fluids, dtype=object)
+    for fluid in set(fluids) - {""}:
+        mask = fluid_names == fluid
+        required[mask] += fluid_dynamic_terms(np.asarray(pressures)[mask], np.asarray(temperatures)[mask],
+                                              valve_rows[mask], fluid, valves)[0]
+    selections = select_actuators_batch(
+        required, value_types,
+        valves.columns["max_pressure"][valve_rows],
+        valves.columns["min_temp"][valve_rows],
+        valves.columns["max_temp"][valve_rows],
+        sf_values, supplies, actuators
+    )
+
+    actuator_catalog = get_actuator_index(actuators).catalog
+    recommended = []
+    listed = candidates
+    for result, valve_row, value, value_type, sf_value, (candidates, margins) in zip(
+            rows, valve_rows.tolist(), required.tolist(), value_types, sf_values, selections):
+        result.update({
+            "value_type": value_type,
+            "required_value": value,
+            "required_with_sf": value * sf_value,
+            "suitable_count": len(candidates)
+        })
+        if len(candidates):
+            # By default the first candidate (the weakest that still fits) is the
+            # recommendation; other rankings pick their top candidate instead
+            best = 0
+            if ranking != "capability":
+                best = int(rank_candidates(actuator_catalog, candidates, margins, ranking, top_k=1)[0][0])
+            recommended.append(best)
+            act = actuator_catalog[int(candidates[best])]
+            margin = float(margins[best])
+            result.update({
+                "recommended_actuator": f"{act.manufacturer} {act.model}",
+                "recommended_supply": act.supply,
+                "recommended_capability": act.torque if value_type == "Torque (Nm)" else act.thrust,
+                "recommended_margin": margin,
+                "recommended_status": sizing_status(margin)[0]
+            })
+        else:
+            recommended.append(None)
+        if listed:
+            result["candidates"] = _candidate_entries(actuator_catalog, candidates, margins, value_type, ranking, listed)
+        if report is not None:
+            result["report"] = _report_selection(actuator_catalog, candidates, margins, ranking, report["top_k"],
+                                                 valve_row)
+
+    if stroke is not None:
+        _add_stroke_times(rows, valve_rows, pressures, temperatures, fluids, selections, recommended, valves,
+                          actuators, ranking, stroke)
+    if profiles:
+        _add_profiles(rows, valve_rows, pressures, temperatures, sf_values, supplies, fluids, valves, actuators,
+                      ranking)
+    if monte_carlo is not None:
+        for result, valve_row, pressure, temperature, fluid, position in zip(rows, valve_rows.tolist(), pressures,
+                                                                             temperatures, fluids, positions):
+            _add_uncertainty(result, valve_row, pressure, temperature, fluid, position, valves, monte_carlo)
+    return results
+
+def _candidate_entries(actuator_catalog, candidates, margins, value_type, ranking, top_k):
+    if not len(candidates):
+        return []
+    positions = rank_candidates(actuator_catalog, candidates, margins, ranking, top_k=top_k)[0]
+    entries = []
+    for position in positions.tolist():
+        act = actuator_catalog[int(candidates[position])]
+        margin = float(margins[position])
+        entries.append({
+            "actuator": f"{act.manufacturer} {act.model}",
+            "supply": act.supply,
+            "capability": act.torque if value_type == "Torque (Nm)" else act.thrust,
+            "margin": margin,
+            "status": sizing_status(margin)[0],
+            "price": act.price,
+            "weight": act.weight,
+            "power": act.power
+        })
+    return entries
+
+def _report_selection(actuator_catalog, candidates, margins, ranking, top_k, valve_row):
+    """Ranked catalog rows, margins, scores and Pareto flags of one tag's report list"""
+    if ranking == "capability" or not len(candidates):
+        positions = np.arange(len(candidates) if top_k is None else min(top_k, len(candidates)))
+        scores = on_front = None
+    else:
+        positions, scores, on_front = rank_candidates(actuator_catalog, candidates, margins, ranking, top_k=top_k)
+        scores, on_front = scores[positions], on_front[positions]
+    return {"valve_row": valve_row, "rows": candidates[positions], "margins": margins[positions], "scores": scores,
+            "pareto": on_front}
+
+def _add_stroke_times(rows, valve_rows, pressures, temperatures, fluids, selections, recommended, valves, actuators,
+                      ranking, stroke):
+    actuator_catalog = get_actuator_index(actuators).catalog
+    fluid_names = np.array(fluids, dtype=object)
+    for fluid in set(fluids):
+        group = np.flatnonzero(fluid_names == fluid)
+        loads = stroke_loads(np.asarray(pressures)[group], np.asarray(temperatures)[group], valve_rows[group], valves,
+                             fluid)
+        stroke_times = selection_stroke_times(loads, [selections[i] for i in group], stroke["direction"], actuators)
+        for row, times in zip(group.tolist(), stroke_times):
+            result = rows[row]
+            candidates, margins = selections[row]
+            ok = np.flatnonzero(times <= stroke["max_time"])
+            result["stroke_ok_count"] = len(ok)
+            if recommended[row] is not None:
+                result["recommended_stroke_time"] = float(times[recommended[row]])
+            if len(ok):
+                # The recommendation among the candidates that meet the stroke-time limit
+                best = 0
+                if ranking != "capability":
+                    best = int(rank_candidates(actuator_catalog, candidates[ok], margins[ok], ranking, top_k=1)[0][0])
+                act = actuator_catalog[int(candidates[ok[best]])]
+                result.update({
+                    "stroke_actuator": f"{act.manufacturer} {act.model}",
+                    "stroke_actuator_margin": float(margins[ok[best]]),
+                    "stroke_actuator_time": float(times[ok[best]])
+                })
+
+def _add_profiles(rows, valve_rows, pressures, temperatures, sf_values, supplies, fluids, valves, actuators, ranking):
+    actuator_catalog = get_actuator_index(actuators).catalog
+    fluid_names = np.array(fluids, dtype=object)
+    # One vectorized profile pass per process fluid
+    for fluid in set(fluids):
+        group = np.flatnonzero(fluid_names == fluid)
+        stroke = torque_profiles(np.asarray(pressures)[group], np.asarray(temperatures)[group], valve_rows[group],
+                                 valves, fluid=fluid)
+        selections = select_actuators_for_profiles(stroke, valve_rows[group], np.asarray(sf_values)[group],
+                                                   [supplies[i] for i in group], valves, actuators)
+        for point, (row, (candidates, margins, critical)) in enumerate(zip(group.tolist(), selections)):
+            if not stroke["rotary"][point]:
+                continue
+            result = rows[row]
+            result.update({
+                "running_torque": float(stroke["running"][point]),
+                "end_of_stroke_torque": float(stroke["end_of_stroke"][point]),
+                "dynamic_torque": float(stroke["dynamic_peak"][point]),
+                "peak_torque": float(stroke["peak"][point]),
+                "peak_angle": float(stroke["peak_angle"][point]),
+                "profile_suitable_count": len(candidates)
+            })
+            if len(candidates):
+                best = 0
+                if ranking != "capability":
+                    best = int(rank_candidates(actuator_catalog, candidates, margins, ranking, top_k=1)[0][0])
+                act = actuator_catalog[int(candidates[best])]
+                result.update({
+                    "profile_actuator": f"{act.manufacturer} {act.model}",
+                    "profile_margin": float(margins[best]),
+                    "profile_critical_angle": float(critical[best])
+                })
+
+def _add_uncertainty(result, valve_row, pressure, temperature, fluid, position, valves, monte_carlo):
+    requirements, _ = sample_requirements(valve_row, pressure, temperature, position=position, valves=valves,
+                                          fluid=fluid, **monte_carlo)
+    requirements.sort()
+    summary = summarize_requirements(requirements)
+    result["requirement_mean"] = summary["mean"]
+    result["requirement_std"] = summary["std"]
+    for percentile, value in summary["percentiles"].items():
+        result[f"requirement_p{percentile}"] = value
+    if result["recommended_capability"] != "":
+        result["recommended_p_undersized"] = float(
+            undersize_probabilities(requirements, [result["recommended_capability"]])[0])
+
+CALCULATION_FIELDS = ("tag", "valve", "pressure", "temperature", "safety_factor", "fluid", "value_type",
+                      "required_value", "required_with_sf", "error")
+
+def calculate_tag_records(records, valves=None):
+    """Torque/thrust requirements of a list of tag records, without actuator selection.
+
+    Returns one dict (CALCULATION_FIELDS) per record in input order.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    results = []
+    parsed = []
+    for record in records:
+        result = dict.fromkeys(CALCULATION_FIELDS, "")
+        result["tag"] = _record_tag(record)
+        try:
+            valve_row, pressure, temperature, sf_class, _, fluid = _parse_tag_record(record, valves)
+        except (KeyError, TypeError, ValueError) as e:
+            result["error"] = str(e)
+            results.append(result)
+            continue
+        result.update({
+            "valve": valve_label(valves[valve_row]),
+            "pressure": pressure,
+            "temperature": temperature,
+            "safety_factor": sf_class,
+            "fluid": fluid
+        })
+        results.append(result)
+        parsed.append((result, valve_row, pressure, temperature, SAFETY_FACTORS[sf_class], fluid))
+    if not parsed:
+        return results
+
+    rows, valve_rows, pressures, temperatures, sf_values, fluids = zip(*parsed)
+    valve_rows = np.array(valve_rows, dtype=np.intp)
+    required, value_types = calculate_valve_torque_thrust_batch(pressures, temperatures, valve_rows, valves)
+    fluid_names = np.array(fluids, dtype=object)
+    for fluid in set(fluids) - {""}:
+        mask = fluid_names == fluid
+        required[mask] += fluid_dynamic_terms(np.asarray(pressures)[mask], np.asarray(temperatures)[mask],
+                                              valve_rows[mask], fluid, valves)[0]
+    for result, value, value_type, sf_value in zip(rows, required.tolist(), value_types.tolist(), sf_values):
+        result.update({"value_type": value_type, "required_value": value, "required_with_sf": value * sf_value})
+    return results
+
+def size_tag_records(records, valves=None, actuators=None, chunk_size=BATCH_CHUNK_SIZE, ranking="capability",
+                     monte_carlo=None, profiles=False, stroke=None, candidates=None, start=0, report=None):
+    """Lazily size an iterable of tag records, yielding result dicts in input order.
+
+    ranking chooses the recommended actuator: "capability" (the weakest that
+    fits), "pareto" or "weighted" (see rank_candidates). monte_carlo
+    (sample_requirements keyword arguments) adds the requirement percentiles
+    and the recommended actuator's undersize probability to every result.
+    profiles adds the stroke profile summary of quarter-turn valves and the
+    recommendation checked against the actuators' output curves. stroke
+    ({"max_time": seconds, "direction": "open" or "close"}) adds every
+    candidate's simulated stroke time and the recommendation among those
+    that meet the limit. candidates adds that many top-ranked actuators
+    of every tag as a "candidates" list. report ({"top_k": k or None})
+    keeps the ranked candidates for the consolidated report (see
+    spool_report_selections). start is the position of the first record in
+    the whole tag list (it keys the Monte Carlo streams).
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if valves is None:
+        valves = VALVE_DATABASE
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield from _size_tag_chunk(chunk, valves, actuators, ranking, monte_carlo, start, profiles, stroke, candidates,
+                                   report)
+        start += len(chunk)
+
+# Catalogs installed once per pool worker by _init_sizing_worker
+_WORKER_CATALOGS = None
+
+def _init_sizing_worker(valves, actuators, ranking, monte_carlo, profiles, stroke, report):
+    global _WORKER_CATALOGS
+    _WORKER_CATALOGS = (valves, actuators, ranking, monte_carlo, profiles, stroke, report)
+    # Build the lookup index up front rather than inside the first task
+    get_actuator_index(actuators)
+
+def _size_tag_chunk_in_worker(records, start):
+    valves, actuators, ranking, monte_carlo, profiles, stroke, report = _WORKER_CATALOGS
+    return _size_tag_chunk(records, valves, actuators, ranking, monte_carlo, start, profiles, stroke, report=report)
+
+def size_tag_records_parallel(records, workers=None, valves=None, actuators=None, chunk_size=BATCH_CHUNK_SIZE,
+                              ranking="capability", monte_carlo=None, profiles=False, stroke=None, report=None):
+    """Like size_tag_records, but sizes chunks on a pool of worker processes.
+
+    Each worker receives the catalogs once, through the pool initializer,
+    rather than with every task; memory-mapped catalogs (load_catalog) are
+    sent as their file path and mapped by each worker, so all processes
+    share one physical copy. At most two chunks per worker
+    are in flight, so memory stays bounded, and results are yielded in input
+    order regardless of which worker finishes first.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if valves is None:
+        valves = VALVE_DATABASE
+    if actuators is None:
+        actuators = ACTUATOR_DATABASE
+    workers = workers or os.cpu_count() or 1
+    records = iter(records)
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_sizing_worker,
+                             initargs=(valves, actuators, ranking, monte_carlo, profiles, stroke, report)) as pool:
+        start = 0
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = list(itertools.islice(records, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_size_tag_chunk_in_worker, chunk, start))
+                start += len(chunk)
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+def sizing_results_for_report(records, valves=None, actuators=None, top_k=None, skipped=None):
+    """Full sizing results (with actuator lists) for the valid rows of a tag list, as used by the reports.
+
+    top_k limits each tag's actuator list to the k weakest suitable actuators.
+    Invalid rows are left out; skipped, when given, is a list that collects
+    their error messages.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    for record in records:
+        try:
+            valve_row, pressure, temperature, sf_class, supply, fluid = _parse_tag_record(record, valves)
+        except (KeyError, TypeError, ValueError) as e:
+            if skipped is not None:
+                skipped.append(str(e))
+            continue
+        yield size_valve(valves[valve_row], pressure, temperature, sf_class, supply,
+                         tag=record.get("tag", ""), actuators=actuators, top_k=top_k, fluid=fluid)
+
+def spool_report_selections(results, spool):
+    """Pass results through unchanged apart from their "report" entries, which are pickled to spool.
+
+    This lets the consolidated report reuse the selections of the main pass
+    (report_results_from_spool) without holding every tag in memory.
+    """
+    for result in results:
+        pickle.dump((result, result.pop("report", None)), spool, protocol=pickle.HIGHEST_PROTOCOL)
+        yield result
+
+def _check_value(name, value):
+    if isinstance(value, str):
+        return value
+    if name.endswith("_p_undersized"):
+        return f"{value:.3%}"
+    if name.endswith("margin"):
+        return f"{value:.1f}%"
+    return f"{value:.4g}"
+
+def report_results_from_spool(spool, valves=None, actuators=None, skipped=None):
+    """Report results (as from sizing_core.size_valve) rebuilt from a spool_report_selections file.
+
+    The actuator lists keep the main pass's ranking and top_k, and its Monte
+    Carlo, profile and stroke-time columns become the result's "checks".
+    Rows with an error are left out; skipped, when given, collects their
+    messages.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    actuator_catalog = get_actuator_index(actuators).catalog
+    spool.seek(0)
+    while True:
+        try:
+            result, selection = pickle.load(spool)
+        except EOFError:
+            return
+        if result["error"] or selection is None:
+            if skipped is not None and result["error"]:
+                skipped.append(result["error"])
+            continue
+        entries = []
+        for position, row in enumerate(selection["rows"].tolist()):
+            actuator = actuator_catalog[row]
+            entries.append({
+                "actuator": actuator,
+                "capability": actuator.torque if result["value_type"] == "Torque (Nm)" else actuator.thrust,
+                "margin": float(selection["margins"][position]),
+                "score": None if selection["scores"] is None else float(selection["scores"][position]),
+                "pareto": None if selection["pareto"] is None else bool(selection["pareto"][position])
+            })
+        yield {
+            "tag": result["tag"],
+            "required_value": result["required_value"],
+            "value_type": result["value_type"],
+            "safety_factor": SAFETY_FACTORS[result["safety_factor"]],
+            "safety_factor_class": result["safety_factor"],
+            "required_with_sf": result["required_with_sf"],
+            "valve": valves[selection["valve_row"]],
+            "pressure": result["pressure"],
+            "temperature": result["temperature"],
+            "supply_type": result["supply_type"],
+            "fluid": result["fluid"] or None,
+            "actuators": entries,
+            "checks": [(f"{name.replace('_', ' ').capitalize()}:", _check_value(name, result[name]))
+                       for name in result
+                       if name not in RESULT_FIELDS and name != "candidates" and result[name] != ""]
+        }
+
+def finite_json(value):
+    """value with non-finite floats replaced by None, since strict JSON has no NaN/Infinity
+    (e.g. the margin over a zero requirement or the stroke time of a stalled actuator)"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: finite_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [finite_json(item) for item in value]
+    return value
+
+def write_results(results, stream, fmt="csv", fields=RESULT_FIELDS):
+    """Write result dicts as they arrive; returns the number of rows written"""
+    count = 0
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+    for result in results:
+        if writer:
+            writer.writerow(result)
+        else:
+            stream.write(json.dumps(finite_json(result), allow_nan=False) + "\n")
+        count += 1
+        if count % BATCH_CHUNK_SIZE == 0:
+            stream.flush()
+    stream.flush()
+    return count
+
+def batch_cli(argv=None):
+    """Command-line entry point: python sizing_batch.py TAGS [-o RESULTS]"""
+    parser = argparse.ArgumentParser(
+        prog="sizing_batch.py",
+        description="Size valve actuators for a tag list without the Streamlit UI. "
+                    f"Input columns: {', '.join(TAG_FIELDS)}."
+    )
+    parser.add_argument("input", help="Tag list (.csv or .jsonl), '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="Results file (.csv or .jsonl), '-' for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="Override input format detection")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="Override output format detection")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="Tags sized per vectorized pass")
+    parser.add_argument("--rank", choices=["capability", "pareto", "weighted"], default="capability",
+                        help="How the recommended actuator is chosen (default: weakest that fits)")
+    parser.add_argument("--actuators", help="Actuator catalog (.csv or binary catalog file) instead of the built-in one")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes (1 = run in this process, 0 = one per CPU)")
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="SAMPLES",
+                        help="Also sample each tag's requirement this many times (e.g. 100000) and report "
+                             "percentiles and the recommended actuator's undersize probability")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the Monte Carlo run")
+    parser.add_argument("--uncertainty",
+                        help="JSON file of input distributions overriding DEFAULT_UNCERTAINTY, "
+                             'e.g. {"pressure": ["relative_normal", 0.1]}')
+    parser.add_argument("--profiles", action="store_true",
+                        help="Add stroke torque profile columns for quarter-turn valves and check the "
+                             "actuators' output curves against them")
+    parser.add_argument("--max-stroke-time", type=float, metavar="SECONDS",
+                        help="Simulate every candidate's stroke and recommend among those within this time "
+                             "(e.g. an ESD closing time limit)")
+    parser.add_argument("--stroke-direction", choices=["close", "open"], default="close",
+                        help="Stroke simulated for --max-stroke-time (default: close)")
+    parser.add_argument("--report", help="Also write a consolidated PDF report of all valid tags, listing the "
+                             "actuators in the --rank order with the run's extra columns")
+    parser.add_argument("--logo", help="Logo image for the consolidated report")
+    parser.add_argument("--tags-per-volume", type=int,
+                        help="Split the report into volumes of this many tags to bound memory")
+    parser.add_argument("--report-top-k", type=int,
+                        help="List only this many recommended actuators per tag in the report (default: all)")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.workers < 0:
+        parser.error("--workers must be 0 (one per CPU) or a positive number of processes")
+    if args.tags_per_volume is not None and args.tags_per_volume < 1:
+        parser.error("--tags-per-volume must be at least 1")
+    if args.report_top_k is not None and args.report_top_k < 1:
+        parser.error("--report-top-k must be at least 1")
+
+    actuators = load_catalog_file(args.actuators, ActuatorCatalog) if args.actuators else None
+    monte_carlo = None
+    if args.monte_carlo > 0:
+        uncertainty = None
+        if args.uncertainty:
+            with open(args.uncertainty, encoding="utf-8") as f:
+                uncertainty = json.load(f)
+        monte_carlo = {"samples": args.monte_carlo, "seed": args.seed, "uncertainty": uncertainty}
+    stroke = None
+    if args.max_stroke_time is not None:
+        stroke = {"max_time": args.max_stroke_time, "direction": args.stroke_direction}
+    in_fmt = _detect_format(args.input, args.input_format)
+    out_fmt = _detect_format(args.output, args.output_format)
+    in_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    out_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    # The report reuses the main pass's selections, spooled to disk as the results are written
+    report = {"top_k": args.report_top_k} if args.report else None
+    spool = tempfile.TemporaryFile() if args.report else None
+    try:
+        records = read_tag_records(in_stream, in_fmt)
+        if args.workers == 1:
+            results = size_tag_records(records, actuators=actuators, chunk_size=args.chunk_size, ranking=args.rank,
+                                       monte_carlo=monte_carlo, profiles=args.profiles, stroke=stroke, report=report)
+        else:
+            results = size_tag_records_parallel(records, workers=args.workers or None, actuators=actuators,
+                                                chunk_size=args.chunk_size, ranking=args.rank,
+                                                monte_carlo=monte_carlo, profiles=args.profiles, stroke=stroke,
+                                                report=report)
+        if spool is not None:
+            results = spool_report_selections(results, spool)
+        count = write_results(results, out_stream, out_fmt, result_fields(monte_carlo, args.profiles, stroke))
+        print(f"Sized {count} tags", file=sys.stderr)
+
+        if args.report:
+            from sizing_report import write_consolidated_report
+            logo_bytes = None
+            if args.logo:
+                with open(args.logo, "rb") as f:
+                    logo_bytes = f.read()
+            skipped = []
+            paths = write_consolidated_report(report_results_from_spool(spool, actuators=actuators, skipped=skipped),
+                                              args.report, logo_bytes=logo_bytes,
+                                              logo_type="PNG" if logo_bytes else None,
+                                              tags_per_volume=args.tags_per_volume)
+            print(f"Wrote report for {count - len(skipped)} tags to {', '.join(paths)}", file=sys.stderr)
+            if skipped:
+                print(f"Skipped {len(skipped)} invalid tags in the report (see the error column of the results)",
+                      file=sys.stderr)
+    finally:
+        if in_stream is not sys.stdin:
+            in_stream.close()
+        if out_stream is not sys.stdout:
+            out_stream.close()
+        if spool is not None:
+            spool.close()
+    return 0
+
+def catalog_cli(argv=None):
+    """Command-line entry point: convert an actuator catalog CSV to the memory-mappable binary format"""
+    parser = argparse.ArgumentParser(
+        prog="sizing_batch.py catalog",
+        description="Convert a vendor actuator catalog to the binary columnar format used for memory mapping. "
+                    f"CSV columns: {', '.join(name for name, _, _ in ActuatorCatalog.FIELDS)}."
+    )
+    parser.add_argument("input", help="Actuator catalog (.csv or binary catalog file)")
+    parser.add_argument("output", help="Binary catalog file to write")
+    args = parser.parse_args(argv)
+    catalog = load_catalog_file(args.input, ActuatorCatalog)
+    save_catalog(catalog, args.output)
+    print(f"Wrote {len(catalog)} actuators to {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "catalog":
+        sys.exit(catalog_cli(sys.argv[2:]))
+    sys.exit(batch_cli())
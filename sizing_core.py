@@ -0,0 +1,1234 @@
+"""Valve torque/thrust sizing core: catalogs, calculations and actuator selection.
+
+Imports only NumPy so batch workers and services can use it without the UI stack.
+"""
+import csv
+import json
+import math
+import os
+
+import numpy as np
+
+# ========================
+# CONSTANTS & UNIT CONVERSION
+# ========================
+BAR_TO_PSI = 14.5038
+MM_TO_INCH = 0.0393701
+N_TO_LBF = 0.224809
+NM_TO_LBIN = 8.85075
+KW_TO_HP = 1.34102
+
+# Valve types
+VALVE_TYPES = {
+    "Ball": {"torque_type": "Rotary", "thrust_type": "None"},
+    "Butterfly": {"torque_type": "Rotary", "thrust_type": "None"},
+    "Globe": {"torque_type": "None", "thrust_type": "Linear"},
+    "Gate": {"torque_type": "None", "thrust_type": "Linear"},
+    "Plug": {"torque_type": "Rotary", "thrust_type": "None"},
+    "Diaphragm": {"torque_type": "None", "thrust_type": "Linear"}
+}
+
+# Safety factors
+SAFETY_FACTORS = {
+    "Standard": 1.25,
+    "High": 1.5,
+    "Critical": 2.0
+}
+
+# Seal friction coefficients
+SEAL_FRICTION = {
+    "PTFE": 0.05,
+    "Graphite": 0.1,
+    "Metal": 0.15,
+    "Elastomer": 0.08
+}
+
+# Seat material factors for the torque correlations
+BALL_SEAT_FACTORS = {
+    "Metal": 1.3,
+    "Graphite": 1.1
+}
+
+BUTTERFLY_SEAT_FACTORS = {
+    "Elastomer": 0.9,
+    "PTFE": 1.0
+}
+
+# Temperature (°C) above which each correlation's temperature factor starts to rise
+TEMPERATURE_DERATING_ONSET = {
+    "Ball": 100,
+    "Butterfly": 80,
+    "Globe": 150,
+    "Gate": 200
+}
+
+# Motion types returned by the torque/thrust calculations
+MOTION_TYPES = ("Torque (Nm)", "Thrust (N)", "Unknown")
+
+# On-disk cache for data derived from inputs that rarely change (font metrics, lookup tables)
+CACHE_DIR = os.environ.get("ACTUATOR_SIZING_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "actuator-sizing"))
+
+def cache_path(*parts):
+    """Path of a file under CACHE_DIR, creating its directory if needed"""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+# ========================
+# COLUMNAR CATALOG STORAGE
+# ========================
+def _as_python_number(value):
+    """Convert a NumPy scalar to a Python number, keeping whole numbers as int"""
+    value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+class _CatalogField:
+    """Read-only attribute that reads one column of the row a view points at"""
+    def __init__(self, column):
+        self.column = column
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._catalog.get_value(self.column, obj._row)
+
+class ColumnarCatalog:
+    """Structure-of-arrays storage shared by the valve and actuator catalogs.
+
+    Numeric fields are contiguous NumPy arrays, categorical fields are small
+    integer codes plus a category list, and free text is a fixed-width string
+    array. Rows are exposed as lightweight view objects (Valve/Actuator).
+    """
+    # (column, kind, dtype) in the view constructor's argument order
+    FIELDS = ()
+    VIEW_CLASS = None
+
+    def __init__(self, columns, categories):
+        self.columns = {name: np.ascontiguousarray(columns[name], dtype=dtype) for name, _, dtype in self.FIELDS}
+        self.categories = {name: list(categories[name]) for name, kind, _ in self.FIELDS if kind == "category"}
+        self._kinds = {name: kind for name, kind, _ in self.FIELDS}
+        self._category_codes = {name: {value: code for code, value in enumerate(values)}
+                                for name, values in self.categories.items()}
+        self._derived = {}
+        self._source = None
+        lengths = {len(column) for column in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All catalog columns must have the same length")
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_columns(cls, **values):
+        """Build a catalog from one sequence per field"""
+        columns = {}
+        categories = {}
+        for name, kind, dtype in cls.FIELDS:
+            if kind == "category":
+                labels, codes = np.unique(np.asarray(values[name], dtype=str), return_inverse=True)
+                categories[name] = labels.tolist()
+                columns[name] = codes.reshape(-1).astype(dtype)
+            else:
+                columns[name] = np.asarray(values[name], dtype=dtype)
+        return cls(columns, categories)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a catalog from row tuples in the view constructor's argument order"""
+        records = list(records)
+        names = [name for name, _, _ in cls.FIELDS]
+        fields = list(zip(*records)) if records else [()] * len(names)
+        return cls.from_columns(**dict(zip(names, fields)))
+
+    @classmethod
+    def from_views(cls, views):
+        """Build a catalog by copying the rows of existing view objects"""
+        names = [name for name, _, _ in cls.FIELDS]
+        return cls.from_records(tuple(getattr(view, name) for name in names) for view in views)
+
+    def __getstate__(self):
+        # A memory-mapped catalog travels as its file path; derived caches
+        # (indexes, coefficients) are rebuilt on demand after unpickling
+        if self._source is not None:
+            return {"_source": self._source}
+        state = self.__dict__.copy()
+        state["_derived"] = {}
+        return state
+
+    def __setstate__(self, state):
+        if set(state) == {"_source"}:
+            state = load_catalog(state["_source"]).__dict__
+        self.__dict__.update(state)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for row in range(self._length):
+            yield self.VIEW_CLASS._view(self, row)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            row = int(index)
+            if row < 0:
+                row += self._length
+            if not 0 <= row < self._length:
+                raise IndexError("catalog index out of range")
+            return self.VIEW_CLASS._view(self, row)
+        if isinstance(index, slice):
+            index = np.arange(self._length)[index]
+        return self.take(index)
+
+    def take(self, indices):
+        """Return a new catalog holding the given rows (categories are shared)"""
+        indices = np.asarray(indices)
+        return type(self)({name: column[indices] for name, column in self.columns.items()}, self.categories)
+
+    def get_value(self, column, row):
+        value = self.columns[column][row]
+        kind = self._kinds[column]
+        if kind == "category":
+            return self.categories[column][value]
+        if kind == "text":
+            return str(value)
+        return _as_python_number(value)
+
+    def category_code(self, column, value):
+        """Code of a categorical value in this catalog, or -1 if it never occurs"""
+        return self._category_codes[column].get(value, -1)
+
+    def labels(self, column):
+        """Decoded categorical column as an object array"""
+        return np.array(self.categories[column], dtype=object)[self.columns[column]]
+
+    def derived(self, key, build):
+        """Return a value derived from the columns, building and caching it on first use"""
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+# ========================
+# VALVE DATABASE
+# ========================
+class Valve:
+    __slots__ = ("_catalog", "_row")
+
+    size = _CatalogField("size")
+    type = _CatalogField("type")
+    pressure_class = _CatalogField("pressure_class")
+    seat_material = _CatalogField("seat_material")
+    stem_dia_mm = _CatalogField("stem_dia_mm")
+    max_pressure = _CatalogField("max_pressure")
+    min_pressure = _CatalogField("min_pressure")
+    max_temp = _CatalogField("max_temp")
+    min_temp = _CatalogField("min_temp")
+
+    def __init__(self, size_inch, valve_type, pressure_class, seat_material, stem_dia_mm, 
+                 max_pressure_bar, min_pressure_bar, max_temp_c, min_temp_c):
+        # A standalone valve is a view onto its own single-row catalog
+        self._catalog = ValveCatalog.from_records([(size_inch, valve_type, pressure_class, seat_material, stem_dia_mm,
+                                                    max_pressure_bar, min_pressure_bar, max_temp_c, min_temp_c)])
+        self._row = 0
+
+    @classmethod
+    def _view(cls, catalog, row):
+        valve = cls.__new__(cls)
+        valve._catalog = catalog
+        valve._row = row
+        return valve
+        
+    def get_seal_friction(self):
+        return SEAL_FRICTION.get(self.seat_material, 0.1)
+    
+    def get_area(self):
+        # Calculate valve area in m²
+        radius_m = (self.size * 0.0254) / 2
+        return math.pi * radius_m**2
+
+class ValveCatalog(ColumnarCatalog):
+    FIELDS = (
+        ("size", "numeric", np.float64),
+        ("type", "category", np.int16),
+        ("pressure_class", "numeric", np.int32),
+        ("seat_material", "category", np.int16),
+        ("stem_dia_mm", "numeric", np.float64),
+        ("max_pressure", "numeric", np.float64),
+        ("min_pressure", "numeric", np.float64),
+        ("max_temp", "numeric", np.float64),
+        ("min_temp", "numeric", np.float64)
+    )
+    VIEW_CLASS = Valve
+
+def valve_label(valve):
+    """Display name used to pick a valve in the UI and in batch tag lists"""
+    return f"{valve.size}\" {valve.type} (Class {valve.pressure_class})"
+
+VALVE_DATABASE = ValveCatalog.from_records([
+    (2, "Ball", 600, "PTFE", 20, 100, 0, 200, -20),
+    (4, "Ball", 600, "Metal", 30, 100, 0, 250, -20),
+    (6, "Butterfly", 300, "Elastomer", 40, 40, 0, 150, -10),
+    (8, "Butterfly", 150, "PTFE", 50, 25, 0, 180, -10),
+    (3, "Globe", 900, "Graphite", 25, 150, 0, 350, -50),
+    (6, "Gate", 600, "Graphite", 35, 100, 0, 400, -30),
+    (2, "Plug", 600, "PTFE", 22, 100, 0, 200, -20),
+    (10, "Diaphragm", 150, "Elastomer", 60, 16, 0, 120, -10)
+])
+
+# ========================
+# ACTUATOR DATABASE
+# ========================
+class Actuator:
+    __slots__ = ("_catalog", "_row")
+
+    model = _CatalogField("model")
+    manufacturer = _CatalogField("manufacturer")
+    torque = _CatalogField("torque")
+    thrust = _CatalogField("thrust")
+    max_pressure = _CatalogField("max_pressure")
+    min_temp = _CatalogField("min_temp")
+    max_temp = _CatalogField("max_temp")
+    power = _CatalogField("power")
+    supply = _CatalogField("supply")
+    weight = _CatalogField("weight")
+    price = _CatalogField("price")
+
+    def __init__(self, model, manufacturer, torque_nm, thrust_n, max_pressure_bar, 
+                 min_temp_c, max_temp_c, power_kw, supply_type, weight_kg, price_usd):
+        # A standalone actuator is a view onto its own single-row catalog
+        self._catalog = ActuatorCatalog.from_records([(model, manufacturer, torque_nm, thrust_n, max_pressure_bar,
+                                                       min_temp_c, max_temp_c, power_kw, supply_type, weight_kg, price_usd)])
+        self._row = 0
+
+    @classmethod
+    def _view(cls, catalog, row):
+        actuator = cls.__new__(cls)
+        actuator._catalog = catalog
+        actuator._row = row
+        return actuator
+        
+    def get_torque_lbin(self):
+        return self.torque * NM_TO_LBIN
+    
+    def get_thrust_lbf(self):
+        return self.thrust * N_TO_LBF
+
+class ActuatorCatalog(ColumnarCatalog):
+    FIELDS = (
+        ("model", "text", str),
+        ("manufacturer", "category", np.int16),
+        ("torque", "numeric", np.float64),
+        ("thrust", "numeric", np.float64),
+        ("max_pressure", "numeric", np.float64),
+        ("min_temp", "numeric", np.float64),
+        ("max_temp", "numeric", np.float64),
+        ("power", "numeric", np.float64),
+        ("supply", "category", np.int16),
+        ("weight", "numeric", np.float64),
+        ("price", "numeric", np.float64)
+    )
+    VIEW_CLASS = Actuator
+
+ACTUATOR_DATABASE = ActuatorCatalog.from_records([
+    ("SR-100", "Rotork", 1000, 0, 100, -30, 120, 0.5, "Pneumatic", 25, 3500),
+    ("SR-500", "Rotork", 5000, 0, 100, -30, 120, 1.0, "Pneumatic", 45, 5500),
+    ("IQT-300", "Rotork", 3000, 0, 100, -40, 150, 0.75, "Electric", 40, 6500),
+    ("SMC-200", "Emerson", 2000, 0, 100, -20, 100, 0.6, "Pneumatic", 30, 4200),
+    ("SMC-800", "Emerson", 8000, 0, 100, -20, 100, 1.5, "Pneumatic", 65, 7800),
+    ("F10", "Flowserve", 0, 15000, 150, -50, 200, 1.2, "Hydraulic", 85, 9500),
+    ("F25", "Flowserve", 0, 25000, 200, -50, 250, 2.0, "Hydraulic", 120, 12500),
+    ("E-200", "AUMA", 2000, 0, 100, -30, 120, 0.8, "Electric", 38, 5800),
+    ("E-1000", "AUMA", 10000, 0, 100, -30, 120, 2.5, "Electric", 95, 11200),
+    ("H-150", "Honeywell", 0, 20000, 180, -40, 180, 1.8, "Hydraulic", 100, 10500)
+])
+
+# ========================
+# CATALOG FILES
+# ========================
+# Binary catalog layout: magic, header length (uint64), JSON header, then one
+# aligned native array per column. Columns are memory-mapped read-only, so
+# every process that opens the same file shares one copy in the page cache.
+CATALOG_MAGIC = b"SIZECAT1"
+CATALOG_ALIGN = 64
+CATALOG_CLASSES = {cls.__name__: cls for cls in (ValveCatalog, ActuatorCatalog)}
+
+def _aligned(offset):
+    return -(-offset // CATALOG_ALIGN) * CATALOG_ALIGN
+
+def save_catalog(catalog, path):
+    """Write a catalog in the binary columnar format (atomically)"""
+    columns = [(name, np.ascontiguousarray(catalog.columns[name])) for name, _, _ in catalog.FIELDS]
+    layout = []
+    offset = 0
+    for name, column in columns:
+        layout.append({"name": name, "dtype": column.dtype.str, "offset": offset})
+        offset = _aligned(offset + column.nbytes)
+    header = json.dumps({
+        "catalog": type(catalog).__name__,
+        "rows": len(catalog),
+        "categories": catalog.categories,
+        "columns": layout
+    }).encode()
+    data_start = _aligned(len(CATALOG_MAGIC) + 8 + len(header))
+
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(CATALOG_MAGIC + len(header).to_bytes(8, "little") + header)
+            for (_, column), entry in zip(columns, layout):
+                f.seek(data_start + entry["offset"])
+                f.write(column.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+def load_catalog(path, mmap=True):
+    """Open a binary catalog file; columns are memory-mapped unless mmap is False"""
+    path = os.path.abspath(path)
+    with open(path, "rb") as f:
+        if f.read(len(CATALOG_MAGIC)) != CATALOG_MAGIC:
+            raise ValueError(f"{path} is not a binary catalog file")
+        header_length = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_length))
+        data_start = _aligned(len(CATALOG_MAGIC) + 8 + header_length)
+
+        catalog_class = CATALOG_CLASSES[header["catalog"]]
+        rows = header["rows"]
+        columns = {}
+        for entry in header["columns"]:
+            dtype = np.dtype(entry["dtype"])
+            if mmap and rows:
+                columns[entry["name"]] = np.memmap(path, dtype=dtype, mode="r",
+                                                   offset=data_start + entry["offset"], shape=(rows,))
+            else:
+                f.seek(data_start + entry["offset"])
+                columns[entry["name"]] = np.fromfile(f, dtype=dtype, count=rows)
+
+    catalog = catalog_class(columns, header["categories"])
+    if mmap:
+        # Pickled (e.g. for pool workers) as a reference to the file, which the receiver maps again
+        catalog._source = path
+    return catalog
+
+def load_catalog_csv(path, catalog_class=None):
+    """Read a catalog from a CSV file whose header names the catalog's fields (actuators by default)"""
+    if catalog_class is None:
+        catalog_class = ActuatorCatalog
+    names = [name for name, _, _ in catalog_class.FIELDS]
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader, [])]
+        missing = [name for name in names if name not in header]
+        if missing:
+            raise ValueError(f"{path} is missing catalog columns: {', '.join(missing)}")
+        positions = [header.index(name) for name in names]
+        values = [[] for _ in names]
+        for line in reader:
+            if not line:
+                continue
+            for column, position in zip(values, positions):
+                column.append(line[position].strip())
+
+    fields = {}
+    for (name, kind, dtype), column in zip(catalog_class.FIELDS, values):
+        # NumPy parses the numeric text columns in one pass
+        fields[name] = np.array(column, dtype=dtype) if kind == "numeric" else column
+    return catalog_class.from_columns(**fields)
+
+# Extensions of SQLite catalog stores (see sizing_store)
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+def load_catalog_file(path, catalog_class=None):
+    """Load a catalog from a .csv file, a SQLite store or a binary catalog file (memory-mapped)"""
+    if str(path).lower().endswith(".csv"):
+        return load_catalog_csv(path, catalog_class)
+    if str(path).lower().endswith(SQLITE_EXTENSIONS):
+        from sizing_store import SQLiteCatalogStore
+        store = SQLiteCatalogStore(path)
+        return store.valve_catalog() if catalog_class is ValveCatalog else store.actuator_catalog()
+    catalog = load_catalog(path)
+    if catalog_class is not None and not isinstance(catalog, catalog_class):
+        raise ValueError(f"{path} holds a {type(catalog).__name__}, not a {catalog_class.__name__}")
+    return catalog
+
+# ========================
+# TORQUE/THRUST CALCULATION MODULE
+# ========================
+def calculate_ball_valve_torque(valve, pressure_bar, temperature_c):
+    """Calculate torque for ball valves based on size, pressure, and temperature"""
+    # Base torque calculation (Nm)
+    base_torque = valve.size * pressure_bar * 0.8
+    
+    # Temperature adjustment
+    temp_factor = 1.0
+    onset = TEMPERATURE_DERATING_ONSET["Ball"]
+    if temperature_c > onset:
+        temp_factor = 1.0 + (temperature_c - onset) * 0.005
+    
+    # Seat material factor
+    seat_factor = BALL_SEAT_FACTORS.get(valve.seat_material, 1.0)
+    
+    return base_torque * temp_factor * seat_factor
+
+def calculate_butterfly_valve_torque(valve, pressure_bar, temperature_c):
+    """Calculate torque for butterfly valves"""
+    # Base torque calculation (Nm)
+    base_torque = valve.size**1.5 * pressure_bar * 0.5
+    
+    # Temperature adjustment
+    temp_factor = 1.0
+    onset = TEMPERATURE_DERATING_ONSET["Butterfly"]
+    if temperature_c > onset:
+        temp_factor = 1.0 + (temperature_c - onset) * 0.007
+    
+    # Seat material factor
+    seat_factor = BUTTERFLY_SEAT_FACTORS.get(valve.seat_material, 1.0)
+    
+    return base_torque * temp_factor * seat_factor
+
+def calculate_globe_valve_thrust(valve, pressure_bar, temperature_c):
+    """Calculate thrust for globe valves"""
+    # Differential pressure force
+    area = valve.get_area()
+    dp_force = area * pressure_bar * 100000  # N
+    
+    # Packing friction force
+    stem_area = math.pi * (valve.stem_dia_mm / 1000 / 2)**2
+    packing_force = stem_area * pressure_bar * 100000 * valve.get_seal_friction()
+    
+    # Seat load force (empirical)
+    seat_force = valve.size * 1000
+    
+    # Temperature factor
+    temp_factor = 1.0
+    onset = TEMPERATURE_DERATING_ONSET["Globe"]
+    if temperature_c > onset:
+        temp_factor = 1.0 + (temperature_c - onset) * 0.002
+    
+    return (dp_force + packing_force + seat_force) * temp_factor
+
+def calculate_gate_valve_thrust(valve, pressure_bar, temperature_c):
+    """Calculate thrust for gate valves"""
+    # Differential pressure force
+    area = valve.get_area()
+    dp_force = area * pressure_bar * 100000  # N
+    
+    # Packing friction force
+    stem_area = math.pi * (valve.stem_dia_mm / 1000 / 2)**2
+    packing_force = stem_area * pressure_bar * 100000 * valve.get_seal_friction()
+    
+    # Wedge effect factor
+    wedge_factor = 1.5 if valve.type == "Gate" else 1.0
+    
+    # Temperature factor
+    temp_factor = 1.0
+    onset = TEMPERATURE_DERATING_ONSET["Gate"]
+    if temperature_c > onset:
+        temp_factor = 1.0 + (temperature_c - onset) * 0.0015
+    
+    return (dp_force * wedge_factor + packing_force) * temp_factor
+
+def calculate_valve_torque_thrust(valve, pressure_bar, temperature_c):
+    """Calculate torque or thrust based on valve type"""
+    if valve.type == "Ball" or valve.type == "Plug":
+        return calculate_ball_valve_torque(valve, pressure_bar, temperature_c), "Torque (Nm)"
+    elif valve.type == "Butterfly":
+        return calculate_butterfly_valve_torque(valve, pressure_bar, temperature_c), "Torque (Nm)"
+    elif valve.type == "Globe":
+        return calculate_globe_valve_thrust(valve, pressure_bar, temperature_c), "Thrust (N)"
+    elif valve.type == "Gate":
+        return calculate_gate_valve_thrust(valve, pressure_bar, temperature_c), "Thrust (N)"
+    elif valve.type == "Diaphragm":
+        # Diaphragm valves use thrust but with different calculation
+        area = valve.get_area()
+        return area * pressure_bar * 100000 * 1.2, "Thrust (N)"
+    else:
+        return 0, "Unknown"
+
+# ========================
+# BATCH CALCULATION ENGINE
+# ========================
+# Valve type codes used by the vectorized kernels (-1 = unknown type)
+VALVE_TYPE_CODES = {valve_type: code for code, valve_type in enumerate(VALVE_TYPES)}
+
+def _build_valve_batch_coefficients(catalog):
+    sizes = catalog.columns["size"]
+    materials = catalog.categories["seat_material"]
+    material_codes = catalog.columns["seat_material"]
+    type_lut = np.array([VALVE_TYPE_CODES.get(t, -1) for t in catalog.categories["type"]], dtype=np.int64)
+    # Transcendental terms use Python's float math, row by row, so the kernels
+    # match the scalar path bit for bit; this runs once per catalog
+    return {
+        "type_code": type_lut[catalog.columns["type"]],
+        "size": sizes,
+        "size_pow_1_5": np.array([size**1.5 for size in sizes.tolist()], dtype=float),
+        "area": np.array([math.pi * ((size * 0.0254) / 2)**2 for size in sizes.tolist()], dtype=float),
+        "stem_area": np.array([math.pi * (d / 1000 / 2)**2 for d in catalog.columns["stem_dia_mm"].tolist()], dtype=float),
+        "seal_friction": np.array([SEAL_FRICTION.get(m, 0.1) for m in materials], dtype=float)[material_codes],
+        "ball_seat_factor": np.array([BALL_SEAT_FACTORS.get(m, 1.0) for m in materials], dtype=float)[material_codes],
+        "butterfly_seat_factor": np.array([BUTTERFLY_SEAT_FACTORS.get(m, 1.0) for m in materials], dtype=float)[material_codes]
+    }
+
+def _valve_batch_coefficients(valves):
+    """Per-valve geometry and material factors for the batch kernels, cached per catalog"""
+    catalog = valves if isinstance(valves, ValveCatalog) else ValveCatalog.from_views(valves)
+    return catalog.derived("batch_coefficients", _build_valve_batch_coefficients)
+
+def _ball_torque_kernel(size, seat_factor, pressure, temperature, derating=1.0):
+    base_torque = size * pressure * 0.8
+    onset = TEMPERATURE_DERATING_ONSET["Ball"]
+    temp_factor = np.where(temperature > onset, 1.0 + (temperature - onset) * 0.005 * derating, 1.0)
+    return base_torque * temp_factor * seat_factor
+
+def _butterfly_torque_kernel(size_pow_1_5, seat_factor, pressure, temperature, derating=1.0):
+    base_torque = size_pow_1_5 * pressure * 0.5
+    onset = TEMPERATURE_DERATING_ONSET["Butterfly"]
+    temp_factor = np.where(temperature > onset, 1.0 + (temperature - onset) * 0.007 * derating, 1.0)
+    return base_torque * temp_factor * seat_factor
+
+def _globe_thrust_kernel(size, area, stem_area, seal_friction, pressure, temperature, derating=1.0):
+    dp_force = area * pressure * 100000
+    packing_force = stem_area * pressure * 100000 * seal_friction
+    seat_force = size * 1000
+    onset = TEMPERATURE_DERATING_ONSET["Globe"]
+    temp_factor = np.where(temperature > onset, 1.0 + (temperature - onset) * 0.002 * derating, 1.0)
+    return (dp_force + packing_force + seat_force) * temp_factor
+
+def _gate_thrust_kernel(area, stem_area, seal_friction, pressure, temperature, derating=1.0):
+    dp_force = area * pressure * 100000
+    packing_force = stem_area * pressure * 100000 * seal_friction
+    onset = TEMPERATURE_DERATING_ONSET["Gate"]
+    temp_factor = np.where(temperature > onset, 1.0 + (temperature - onset) * 0.0015 * derating, 1.0)
+    return (dp_force * 1.5 + packing_force) * temp_factor
+
+def _diaphragm_thrust_kernel(area, pressure):
+    return area * pressure * 100000 * 1.2
+
+def _masked(value, mask):
+    return value if np.ndim(value) == 0 else value[mask]
+
+def calculate_valve_torque_thrust_batch(pressures_bar, temperatures_c, valve_indices, valves=None,
+                                        seal_friction=None, seat_factor=None, derating=1.0):
+    """Vectorized calculate_valve_torque_thrust over many duty points.
+
+    pressures_bar, temperatures_c and valve_indices (positions in `valves`,
+    VALVE_DATABASE by default) are broadcast against each other. Returns a
+    float array of requirement values and an array of motion type labels
+    with the same shape; both match the scalar functions exactly.
+
+    seal_friction and seat_factor, when given, replace the valve's material
+    coefficients, and derating scales the slope of the temperature factor;
+    they broadcast with the duty points (the Monte Carlo mode samples them).
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    pressure, temperature, valve_idx = np.broadcast_arrays(
+        np.asarray(pressures_bar, dtype=float),
+        np.asarray(temperatures_c, dtype=float),
+        np.asarray(valve_indices, dtype=np.intp)
+    )
+    overrides = [np.asarray(value, dtype=float) for value in (seal_friction, seat_factor, derating) if value is not None]
+    shape = np.broadcast_shapes(pressure.shape, *(value.shape for value in overrides))
+    pressure, temperature, valve_idx = (np.broadcast_to(a, shape) for a in (pressure, temperature, valve_idx))
+    if np.ndim(derating):
+        derating = np.broadcast_to(np.asarray(derating, dtype=float), shape)
+    if seal_friction is not None:
+        seal_friction = np.broadcast_to(np.asarray(seal_friction, dtype=float), shape)
+    if seat_factor is not None:
+        seat_factor = np.broadcast_to(np.asarray(seat_factor, dtype=float), shape)
+    coeffs = _valve_batch_coefficients(valves)
+    type_code = coeffs["type_code"][valve_idx]
+
+    values = np.zeros(pressure.shape, dtype=float)
+    motion_code = np.full(pressure.shape, MOTION_TYPES.index("Unknown"), dtype=np.int64)
+
+    # Ball and plug valves share the ball correlation
+    mask = (type_code == VALVE_TYPE_CODES["Ball"]) | (type_code == VALVE_TYPE_CODES["Plug"])
+    if mask.any():
+        idx = valve_idx[mask]
+        values[mask] = _ball_torque_kernel(
+            coeffs["size"][idx], coeffs["ball_seat_factor"][idx] if seat_factor is None else seat_factor[mask],
+            pressure[mask], temperature[mask], _masked(derating, mask))
+        motion_code[mask] = MOTION_TYPES.index("Torque (Nm)")
+
+    mask = type_code == VALVE_TYPE_CODES["Butterfly"]
+    if mask.any():
+        idx = valve_idx[mask]
+        values[mask] = _butterfly_torque_kernel(
+            coeffs["size_pow_1_5"][idx], coeffs["butterfly_seat_factor"][idx] if seat_factor is None else seat_factor[mask],
+            pressure[mask], temperature[mask], _masked(derating, mask))
+        motion_code[mask] = MOTION_TYPES.index("Torque (Nm)")
+
+    mask = type_code == VALVE_TYPE_CODES["Globe"]
+    if mask.any():
+        idx = valve_idx[mask]
+        values[mask] = _globe_thrust_kernel(
+            coeffs["size"][idx], coeffs["area"][idx], coeffs["stem_area"][idx],
+            coeffs["seal_friction"][idx] if seal_friction is None else seal_friction[mask],
+            pressure[mask], temperature[mask], _masked(derating, mask))
+        motion_code[mask] = MOTION_TYPES.index("Thrust (N)")
+
+    mask = type_code == VALVE_TYPE_CODES["Gate"]
+    if mask.any():
+        idx = valve_idx[mask]
+        values[mask] = _gate_thrust_kernel(
+            coeffs["area"][idx], coeffs["stem_area"][idx],
+            coeffs["seal_friction"][idx] if seal_friction is None else seal_friction[mask],
+            pressure[mask], temperature[mask], _masked(derating, mask))
+        motion_code[mask] = MOTION_TYPES.index("Thrust (N)")
+
+    mask = type_code == VALVE_TYPE_CODES["Diaphragm"]
+    if mask.any():
+        values[mask] = _diaphragm_thrust_kernel(coeffs["area"][valve_idx[mask]], pressure[mask])
+        motion_code[mask] = MOTION_TYPES.index("Thrust (N)")
+
+    return values, np.array(MOTION_TYPES, dtype=object)[motion_code]
+
+# ========================
+# CURVE SAMPLING
+# ========================
+SWEEP_INITIAL_POINTS = 33
+SWEEP_MAX_POINTS = 513
+SWEEP_RTOL = 1e-3
+
+def sweep_pressure(valve_index, temperatures_c, max_pressure, min_pressure=0.0, valves=None, model=None,
+                   initial_points=SWEEP_INITIAL_POINTS, max_points=SWEEP_MAX_POINTS, rtol=SWEEP_RTOL):
+    """Sample requirement-vs-pressure curves for one valve at one or more temperatures.
+
+    Starts from a uniform grid and repeatedly bisects the intervals whose
+    midpoint departs from the straight line between its ends by more than
+    rtol of the curve's range, so slope changes get dense sampling while
+    straight stretches stay coarse. Intervals narrower than a quarter of
+    the uniform spacing at max_points are never split, so a jump does not
+    swallow the whole budget. All curves share one pressure grid and each
+    refinement pass is a single batch evaluation.
+
+    model(pressures, temperatures, valve_indices) defaults to
+    calculate_valve_torque_thrust_batch on `valves`; a SurrogateTable's
+    evaluate fits as well. Returns (pressures, values with one row per
+    temperature, motion type label).
+    """
+    if model is None:
+        model = lambda p, t, i: calculate_valve_torque_thrust_batch(p, t, i, valves)
+    temperatures = np.atleast_1d(np.asarray(temperatures_c, dtype=float))[:, None]
+    pressures = np.linspace(min_pressure, max_pressure, max(initial_points, 2))
+    values, labels = model(pressures[None, :], temperatures, valve_index)
+    min_width = (max_pressure - min_pressure) / (4 * max_points)
+
+    while len(pressures) < max_points:
+        midpoints = 0.5 * (pressures[:-1] + pressures[1:])
+        mid_values, _ = model(midpoints[None, :], temperatures, valve_index)
+        scale = np.ptp(values, axis=1, keepdims=True)
+        deviation = np.abs(mid_values - 0.5 * (values[:, :-1] + values[:, 1:]))
+        deviation = (deviation / np.where(scale > 0, scale, 1.0)).max(axis=0)
+        refine = np.flatnonzero((deviation > rtol) & (np.diff(pressures) > 2 * min_width))
+        if len(refine) == 0:
+            break
+        # Spend the remaining point budget on the worst intervals first
+        budget = max_points - len(pressures)
+        if len(refine) > budget:
+            refine = np.sort(refine[np.argsort(deviation[refine])[::-1][:budget]])
+        pressures = np.insert(pressures, refine + 1, midpoints[refine])
+        values = np.insert(values, refine + 1, mid_values[:, refine], axis=1)
+
+    return pressures, values, labels[0, 0]
+
+# ========================
+# ACTUATOR SELECTION LOGIC
+# ========================
+# Smallest slice of a partition filtered at a time by a limited query
+QUERY_BLOCK_MIN = 256
+
+class ActuatorIndex:
+    """Prebuilt lookup structure over an actuator catalog.
+
+    Actuators are partitioned by motion type and supply, and each partition
+    is sorted by capability with catalog order breaking ties (the order the
+    old stable sort produced). A query is a binary search for the required
+    capability followed by a vectorized walk over the stronger actuators
+    that applies the pressure and temperature filters.
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._partitions = {}
+
+    def partition(self, value_type, supply_type=None):
+        """Sorted rows and filter columns for one motion type / supply combination"""
+        if value_type not in ("Torque (Nm)", "Thrust (N)"):
+            value_type = "Unknown"
+        if not supply_type or supply_type == "Any":
+            supply_type = None
+        key = (value_type, supply_type)
+        if key not in self._partitions:
+            self._partitions[key] = self._build_partition(value_type, supply_type)
+        return self._partitions[key]
+
+    def _build_partition(self, value_type, supply_type):
+        columns = self.catalog.columns
+        capability = columns["torque"] if value_type == "Torque (Nm)" else columns["thrust"]
+        
+        # Skip actuators that don't match the required motion type
+        mask = np.ones(len(self.catalog), dtype=bool)
+        if value_type != "Unknown":
+            mask &= capability != 0
+        
+        # Restrict to the requested supply type (-1 matches nothing)
+        if supply_type is not None:
+            mask &= columns["supply"] == self.catalog.category_code("supply", supply_type)
+        
+        rows = np.flatnonzero(mask)
+        rows = rows[np.argsort(capability[rows], kind="stable")]
+        return {
+            "rows": rows,
+            "capability": capability[rows],
+            "max_pressure": columns["max_pressure"][rows],
+            "min_temp": columns["min_temp"][rows],
+            "max_temp": columns["max_temp"][rows]
+        }
+
+    def query(self, required_capability, value_type, max_pressure, min_temp, max_temp, supply_type=None,
+              limit=None):
+        """Catalog rows able to deliver required_capability within the given valve limits, weakest first.
+
+        With a limit only the first `limit` matches are returned, and the
+        filters stop being applied once that many have been found.
+        """
+        part = self.partition(value_type, supply_type)
+        start = np.searchsorted(part["capability"], required_capability, side="left")
+        stop = len(part["rows"])
+        block = stop - start if limit is None else max(4 * limit, QUERY_BLOCK_MIN)
+        found = []
+        remaining = limit
+        while start < stop and (remaining is None or remaining > 0):
+            end = min(start + block, stop)
+            ok = ((part["max_pressure"][start:end] >= max_pressure) &
+                  (part["min_temp"][start:end] <= min_temp) &
+                  (part["max_temp"][start:end] >= max_temp))
+            hits = part["rows"][start:end][ok]
+            if remaining is not None:
+                hits = hits[:remaining]
+                remaining -= len(hits)
+            found.append(hits)
+            start = end
+            block *= 2
+        if len(found) == 1:
+            return found[0]
+        return np.concatenate(found) if found else part["rows"][:0]
+
+    def select(self, required_capability, value_type, max_pressure, min_temp, max_temp, supply_type=None,
+               limit=None):
+        """(catalog, rows) for a query; stores that fetch rows on demand return a catalog of just those rows"""
+        return self.catalog, self.query(required_capability, value_type, max_pressure, min_temp, max_temp,
+                                        supply_type, limit)
+
+def get_actuator_index(actuators=None):
+    """Return the lookup index of an actuator catalog (ACTUATOR_DATABASE by default), built once.
+
+    An ActuatorIndex (e.g. a database-backed one) is returned as it is.
+    """
+    if actuators is None:
+        actuators = ACTUATOR_DATABASE
+    if isinstance(actuators, ActuatorIndex):
+        return actuators
+    if not isinstance(actuators, ActuatorCatalog):
+        actuators = ActuatorCatalog.from_views(actuators)
+    return actuators.derived("actuator_index", ActuatorIndex)
+
+def find_suitable_actuators(required_value, value_type, valve, safety_factor, supply_type=None, actuators=None,
+                            top_k=None, ranking="capability", weights=None):
+    """Find actuators that meet the torque/thrust requirements.
+
+    top_k keeps only the k best entries, where ranking decides what best
+    means ("capability", "pareto" or "weighted", see rank_candidates); result
+    records are only built for the entries returned. Every entry has the keys
+    actuator, capability, margin, score and pareto; score and pareto are None
+    under capability ranking, which scores nothing.
+    """
+    index = get_actuator_index(actuators)
+    required_capability = required_value * safety_factor
+    
+    # Rows come back sorted by capability (ascending), most economical first
+    catalog, rows = index.select(required_capability, value_type, valve.max_pressure, valve.min_temp,
+                                 valve.max_temp, supply_type, limit=top_k if ranking == "capability" else None)
+    capabilities = catalog.columns["torque" if value_type == "Torque (Nm)" else "thrust"][rows]
+    # A zero requirement leaves every actuator with an infinite margin, as in select_actuators_batch
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margins = (capabilities / required_capability - 1) * 100
+    
+    if ranking == "capability":
+        return _suitable_entries(catalog, rows, capabilities, margins)
+    order, scores, on_front = rank_candidates(catalog, rows, margins, ranking, weights=weights, top_k=top_k)
+    return _suitable_entries(catalog, rows[order], capabilities[order], margins[order], scores[order],
+                             on_front[order])
+
+def _suitable_entries(catalog, rows, capabilities, margins, scores=None, on_front=None):
+    suitable_actuators = []
+    for position, row in enumerate(rows.tolist()):
+        suitable_actuators.append({
+            "actuator": catalog[row],
+            "capability": capabilities[position].item(),
+            "margin": margins[position].item(),
+            "score": None if scores is None else float(scores[position]),
+            "pareto": None if on_front is None else bool(on_front[position])
+        })
+    
+    return suitable_actuators
+
+def sizing_status(margin):
+    """Classify a capability margin (%) as (status, CSS class)"""
+    if margin > 50:
+        return "Over-sized", "status-yellow"
+    elif margin > 20:
+        return "Well-sized", "status-green"
+    return "Minimal margin", "status-red"
+
+def size_valve(valve, pressure_bar, temperature_c, safety_factor="Standard", supply_type="Any", tag="",
+               actuators=None, top_k=None, fluid=None):
+    """Size one duty point; returns the result dict shared by the UI and the reports.
+
+    top_k limits the actuator list to the k weakest suitable actuators.
+    fluid (a CoolProp fluid name) adds the process fluid's dynamic term.
+    """
+    required_value, value_type = calculate_valve_torque_thrust(valve, pressure_bar, temperature_c)
+    if fluid:
+        from sizing_fluids import fluid_dynamic_term
+        required_value += fluid_dynamic_term(valve, pressure_bar, temperature_c, fluid)
+    sf_value = SAFETY_FACTORS[safety_factor]
+    return {
+        "tag": tag,
+        "required_value": required_value,
+        "value_type": value_type,
+        "safety_factor": sf_value,
+        "safety_factor_class": safety_factor,
+        "required_with_sf": required_value * sf_value,
+        "valve": valve,
+        "pressure": pressure_bar,
+        "temperature": temperature_c,
+        "supply_type": supply_type,
+        "fluid": fluid,
+        "actuators": find_suitable_actuators(required_value, value_type, valve, sf_value, supply_type, actuators,
+                                             top_k)
+    }
+
+# Upper bound on duty point x actuator cells evaluated at once by the batch selector
+SELECTION_BLOCK_CELLS = 2**22
+
+def select_actuators_batch(required_values, value_types, valve_max_pressures, valve_min_temps, valve_max_temps,
+                           safety_factors, supply_types=None, actuators=None, chunk_size=None):
+    """Matrix version of find_suitable_actuators for N duty points against a whole catalog.
+
+    Every argument except actuators/chunk_size is either a scalar or one entry
+    per duty point. Feasibility and margin are evaluated as duty point x
+    actuator matrices, in row blocks of at most chunk_size duty points so
+    memory stays bounded. Returns one (catalog_rows, margins) array pair per
+    duty point, ordered by capability ascending exactly like
+    find_suitable_actuators. A zero requirement yields infinite margins
+    instead of raising.
+    """
+    index = get_actuator_index(actuators)
+    catalog = index.catalog
+
+    required = np.atleast_1d(np.asarray(required_values, dtype=float))
+    n = required.shape[0]
+    value_types = np.broadcast_to(np.asarray(value_types, dtype=object), (n,))
+    # Anything that is neither torque nor thrust is treated like find_suitable_actuators treats "Unknown"
+    motion_code = np.where(value_types == "Torque (Nm)", 0, np.where(value_types == "Thrust (N)", 1, 2))
+    threshold = required * np.broadcast_to(np.asarray(safety_factors, dtype=float), (n,))
+    max_pressure = np.broadcast_to(np.asarray(valve_max_pressures, dtype=float), (n,))
+    min_temp = np.broadcast_to(np.asarray(valve_min_temps, dtype=float), (n,))
+    max_temp = np.broadcast_to(np.asarray(valve_max_temps, dtype=float), (n,))
+
+    # Supply filter per duty point: -2 means "Any", -1 a supply absent from the catalog
+    if supply_types is None or isinstance(supply_types, str):
+        supply_types = [supply_types] * n
+    supply_code = np.array([-2 if not supply or supply == "Any" else catalog.category_code("supply", supply)
+                            for supply in supply_types], dtype=np.int64)
+
+    if chunk_size is None:
+        chunk_size = max(1, SELECTION_BLOCK_CELLS // max(1, len(catalog)))
+
+    results = [None] * n
+    for code, motion in enumerate(MOTION_TYPES):
+        rows = np.flatnonzero(motion_code == code)
+        if rows.size == 0:
+            continue
+
+        # Columns come from the index partition: motion-filtered and already in capability order
+        part = index.partition(motion)
+        cols = part["rows"]
+        capability = part["capability"]
+        act_supply = catalog.columns["supply"][cols]
+
+        for start in range(0, rows.size, chunk_size):
+            block = rows[start:start + chunk_size]
+            block_threshold = threshold[block][:, None]
+            block_supply = supply_code[block][:, None]
+
+            feasible = ((capability >= block_threshold) &
+                        (part["max_pressure"] >= max_pressure[block][:, None]) &
+                        (part["min_temp"] <= min_temp[block][:, None]) &
+                        (part["max_temp"] >= max_temp[block][:, None]) &
+                        ((block_supply == -2) | (act_supply == block_supply)))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                margin = (capability / block_threshold - 1) * 100
+
+            # np.nonzero walks row-major, so each row's columns stay in capability order
+            hit_rows, hit_cols = np.nonzero(feasible)
+            splits = np.searchsorted(hit_rows, np.arange(1, block.size))
+            for row, row_cols, row_margins in zip(block.tolist(), np.split(hit_cols, splits),
+                                                  np.split(margin[hit_rows, hit_cols], splits)):
+                results[row] = (cols[row_cols], row_margins)
+
+    return results
+
+# ========================
+# ACTUATOR RANKING
+# ========================
+# Ranking objectives: actuator attribute (or "margin") -> +1 to minimize, -1 to maximize
+RANKING_OBJECTIVES = {
+    "price": 1,
+    "weight": 1,
+    "power": 1,
+    "margin": -1
+}
+
+# Candidates compared at once by the many-objective Pareto filter
+PARETO_BLOCK_SIZE = 256
+
+def _dense_ranks(values):
+    """Per-column dense ranks (ties share a rank), so comparisons run on small integers"""
+    return np.column_stack([np.unique(column, return_inverse=True)[1].reshape(-1) for column in values.T])
+
+def _pareto_two(points):
+    # Lexicographic order: only earlier points can dominate; an earlier point
+    # with a smaller or equal second objective does (points are distinct)
+    prefix_min = np.minimum.accumulate(points[:, 1])
+    dominated = np.zeros(len(points), dtype=bool)
+    dominated[1:] = prefix_min[:-1] <= points[1:, 1]
+    return ~dominated
+
+def _pareto_three(points):
+    # Lexicographic order again, so point i is dominated iff some j < i has
+    # b_j <= b_i and c_j <= c_i. Divide and conquer over position blocks:
+    # at each level every right half is checked against its left half with
+    # one sort and one running minimum over the whole array.
+    n = len(points)
+    b, c = points[:, 1], points[:, 2]
+    position = np.arange(n)
+    dominated = np.zeros(n, dtype=bool)
+    half = 1
+    while half < n:
+        block = position // (2 * half)
+        right = (position // half) % 2 == 1
+        # Left points sort before right points with the same b
+        order = np.lexsort((right, b, block))
+        # Offsetting c by block keeps each block's running minimum from
+        # reaching into the next block (earlier blocks always compare larger)
+        shifted = c - block * n
+        running = np.minimum.accumulate(np.where(right, np.iinfo(np.int64).max, shifted)[order])
+        hit = right[order] & (running <= shifted[order])
+        dominated[order[hit]] = True
+        half *= 2
+    return ~dominated
+
+def _pareto_many(points):
+    # Rank-sum order: a point can only be dominated by one before it, and a
+    # dominated point's dominator is dominated by nothing later, so checking
+    # each block against the front found so far (and itself) is enough
+    # Points are distinct, so "<= everywhere" against another point is domination
+    order = np.argsort(points.sum(axis=1), kind="stable")
+    points = points.astype(np.int32)
+    on_front = np.zeros(len(points), dtype=bool)
+    front = points[:0]
+    for start in range(0, len(order), PARETO_BLOCK_SIZE):
+        block = order[start:start + PARETO_BLOCK_SIZE]
+        candidates = points[block]
+        for column in range(points.shape[1]):
+            if column == 0:
+                le_front = front[None, :, 0] <= candidates[:, None, 0]
+                le_block = candidates[None, :, 0] <= candidates[:, None, 0]
+            else:
+                le_front &= front[None, :, column] <= candidates[:, None, column]
+                le_block &= candidates[None, :, column] <= candidates[:, None, column]
+        np.fill_diagonal(le_block, False)
+        dominated = le_front.any(axis=1) | le_block.any(axis=1)
+        on_front[block[~dominated]] = True
+        front = np.concatenate([front, candidates[~dominated]])
+    return on_front
+
+def pareto_front(values):
+    """Boolean mask of the non-dominated rows of an (n, k) array, every column minimized.
+
+    Duplicate rows share one verdict. Two objectives take a sort and a
+    running minimum (O(n log n)); three use a vectorized divide and conquer
+    (O(n log^2 n)); more fall back to a blocked comparison against the
+    growing front.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("pareto_front expects an (n, k) array")
+    if len(values) == 0:
+        return np.zeros(0, dtype=bool)
+    # Distinct points in lexicographic order; duplicates map back through `inverse`
+    points, inverse = np.unique(_dense_ranks(values), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    k = points.shape[1]
+    if k == 1:
+        on_front = points[:, 0] == points[0, 0]
+    elif k == 2:
+        on_front = _pareto_two(points)
+    elif k == 3:
+        on_front = _pareto_three(points)
+    else:
+        on_front = _pareto_many(points)
+    return on_front[inverse]
+
+def pareto_members(values, positions):
+    """pareto_front(values)[positions], checking only the given rows against the whole set"""
+    values = np.asarray(values, dtype=float)
+    members = np.empty(len(positions), dtype=bool)
+    for i, point in enumerate(values[positions]):
+        members[i] = not ((values <= point).all(axis=1) & (values < point).any(axis=1)).any()
+    return members
+
+def candidate_objectives(catalog, rows, margins, objectives=None):
+    """(n, k) matrix of candidate objectives, every column oriented for minimization"""
+    if objectives is None:
+        objectives = RANKING_OBJECTIVES
+    # A zero requirement gives infinite margins; keep them orderable
+    margins = np.nan_to_num(np.asarray(margins, dtype=float), posinf=np.finfo(float).max)
+    columns = [(margins if name == "margin" else catalog.columns[name][rows]) * sign
+               for name, sign in objectives.items()]
+    return np.column_stack(columns) if columns else np.zeros((len(rows), 0))
+
+def weighted_scores(values, weights=None):
+    """Weighted sum of min-max normalized objectives (lower is better); equal weights by default"""
+    values = np.asarray(values, dtype=float)
+    weights = np.ones(values.shape[1]) if weights is None else np.asarray(weights, dtype=float)
+    low = values.min(axis=0, initial=np.inf)
+    span = values.max(axis=0, initial=-np.inf) - low
+    with np.errstate(invalid="ignore", over="ignore"):
+        normalized = np.where(span > 0, (values - low) / np.where(span > 0, span, 1.0), 0.0)
+    return normalized @ weights
+
+def top_positions(scores, k, positions=None):
+    """The k positions with the lowest scores, best first, ties in position order.
+
+    Equivalent to a stable argsort cut to k, but argpartition only orders the
+    winners. positions (ascending) restricts the choice to a subset.
+    """
+    if positions is None:
+        positions = np.arange(len(scores))
+    values = scores[positions]
+    if k < len(positions):
+        kth = np.partition(values, k - 1)[k - 1]
+        keep = values <= kth
+        positions = positions[keep]
+        values = values[keep]
+    return positions[np.argsort(values, kind="stable")][:k]
+
+def rank_candidates(catalog, rows, margins, mode="pareto", objectives=None, weights=None, top_k=None):
+    """Order feasible candidates for one duty point.
+
+    mode "weighted" orders every candidate by weighted score; "pareto" keeps
+    only the Pareto set, ordered by the same score; "capability" keeps the
+    find_suitable_actuators order. weights maps objective names to weights;
+    top_k cuts the order to the k best. Returns (positions into rows, score
+    of each candidate, Pareto mask). A weighted top_k ranking never needs the
+    whole front, so its mask is only filled in at the returned positions.
+    """
+    if objectives is None:
+        objectives = RANKING_OBJECTIVES
+    values = candidate_objectives(catalog, rows, margins, objectives)
+    weight_vector = None if weights is None else [weights.get(name, 0.0) for name in objectives]
+    scores = weighted_scores(values, weight_vector)
+    if mode == "weighted" and top_k is not None:
+        order = top_positions(scores, top_k)
+        on_front = np.zeros(len(rows), dtype=bool)
+        on_front[order] = pareto_members(values, order)
+        return order, scores, on_front
+    on_front = pareto_front(values)
+    if mode == "capability":
+        return np.arange(len(rows) if top_k is None else min(top_k, len(rows))), scores, on_front
+    if mode == "pareto":
+        positions = np.flatnonzero(on_front)
+    elif mode == "weighted":
+        positions = None
+    else:
+        raise ValueError(f"Unknown ranking mode: {mode!r}")
+    return top_positions(scores, len(rows) if top_k is None else top_k, positions), scores, on_front
+
+def rank_suitable_actuators(suitable_actuators, mode="pareto", objectives=None, weights=None, top_k=None):
+    """rank_candidates for find_suitable_actuators output; entries gain "score" and "pareto" keys"""
+    if not suitable_actuators:
+        return []
+    catalog = suitable_actuators[0]["actuator"]._catalog
+    if any(entry["actuator"]._catalog is not catalog for entry in suitable_actuators):
+        catalog = ActuatorCatalog.from_views([entry["actuator"] for entry in suitable_actuators])
+        rows = np.arange(len(suitable_actuators))
+    else:
+        rows = np.array([entry["actuator"]._row for entry in suitable_actuators], dtype=np.intp)
+    margins = [entry["margin"] for entry in suitable_actuators]
+    order, scores, on_front = rank_candidates(catalog, rows, margins, mode, objectives, weights, top_k)
+    return [dict(suitable_actuators[position], score=float(scores[position]), pareto=bool(on_front[position]))
+            for position in order.tolist()]
+
+# ========================
+# OPERATING ENVELOPE
+# ========================
+ENVELOPE_PRESSURE_POINTS = 101
+ENVELOPE_TEMPERATURE_POINTS = 81
+
+def operating_envelope(valve_index, safety_factor, supply_type=None, valves=None, actuators=None,
+                       pressure_points=ENVELOPE_PRESSURE_POINTS, temperature_points=ENVELOPE_TEMPERATURE_POINTS,
+                       model=None):
+    """Requirement and cheapest feasible actuator over a valve's whole pressure x temperature rating.
+
+    The requirement is evaluated on a min_pressure..max_pressure x
+    min_temp..max_temp grid in one batch call. The actuators that pass the valve's limits (the
+    same filter find_suitable_actuators applies) are taken in capability
+    order, and a suffix minimum over their prices gives, for every capability
+    threshold, the cheapest actuator able to meet it; each cell is then one
+    binary search. Ties on price go to the actuator find_suitable_actuators
+    lists first.
+
+    Returns a dict with the grid axes, the requirement (temperature rows x
+    pressure columns), the motion type, the actuator catalog and the
+    catalog row of each cell's cheapest actuator (-1 where none is feasible).
+    model replaces calculate_valve_torque_thrust_batch (same signature).
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    if model is None:
+        model = calculate_valve_torque_thrust_batch
+    valve = valves[valve_index]
+    pressures = np.linspace(valve.min_pressure, valve.max_pressure, pressure_points)
+    temperatures = np.linspace(valve.min_temp, valve.max_temp, temperature_points)
+    required, labels = model(pressures[None, :], temperatures[:, None], valve_index, valves)
+    value_type = labels[0, 0]
+
+    index = get_actuator_index(actuators)
+    part = index.partition(value_type, supply_type)
+    ok = ((part["max_pressure"] >= valve.max_pressure) &
+          (part["min_temp"] <= valve.min_temp) &
+          (part["max_temp"] >= valve.max_temp))
+    rows = part["rows"][ok]
+    capability = part["capability"][ok]
+
+    # best[k]: position of the cheapest of rows[k:] (earliest on ties); best[len] = no actuator
+    price = index.catalog.columns["price"][rows][::-1]
+    positions = np.arange(len(rows))
+    latest_min = np.maximum.accumulate(np.where(price <= np.minimum.accumulate(price), positions, 0))
+    best = np.append(rows[len(rows) - 1 - latest_min[::-1]], -1)
+
+    start = np.searchsorted(capability, required * safety_factor, side="left")
+    return {
+        "pressures": pressures,
+        "temperatures": temperatures,
+        "required": required,
+        "value_type": value_type,
+        "actuators": index.catalog,
+        "actuator_rows": best[start]
+    }
@@ -0,0 +1,333 @@
+"""Stroke-time simulation of valve-actuator pairs.
+
+The actuator's available output at travel s (0 closed, 1 open) and speed v is
+
+    rated x curve(s) x (1 - v / v_free)
+
+where curve is its output curve (ACTUATOR_OUTPUT_CURVES; linear actuators
+are constant). The no-load speed v_free is set so that the droop line peaks
+at the actuator's usable power: rated x v_free / 4 = power x efficiency.
+The moving parts have an inertia derived from the actuator weight, and the
+load is the valve's stroke profile: the angle-resolved torque of
+quarter-turn valves (sizing_profiles) or a seat/running thrust profile of
+linear valves.
+
+The equation of motion is integrated in kinetic energy over a fixed travel
+grid,
+
+    d(I v^2 / 2) / ds = output(s, v) - load(s)
+
+taking the speed implicitly in each step. Each step is then a closed-form
+quadratic, stable for any inertia. In the small-inertia limit it reduces
+to the quasi-static speed. Time follows from dt = ds / mean speed; the
+first step, which starts at rest, is split into geometrically growing
+sub-steps so that the time of the step out of rest is not overestimated.
+Every step is a handful of array operations over all pairs, so one call
+simulates thousands of valve-actuator pairs in one pass over the travel grid.
+An actuator stalls where the energy would go negative: it cannot push
+through that point and its stroke time is infinite.
+"""
+import numpy as np
+
+from sizing_core import (
+    VALVE_DATABASE, calculate_valve_torque_thrust_batch, get_actuator_index, select_actuators_batch
+)
+from sizing_profiles import (
+    ACTUATOR_OUTPUT_CURVES, CURVE_NAMES, PROFILE_ANGLE_STEP, STROKE_ANGLE, SUPPLY_OUTPUT_CURVES, torque_profiles
+)
+
+# ========================
+# LOAD PROFILES
+# ========================
+# Linear valves: running thrust as a ratio of the breakaway (seat) thrust, and the seat travel as a fraction of the stroke
+LINEAR_PROFILE_COEFFICIENTS = {
+    "Globe": {"running": 0.4, "seat_travel": 0.1},
+    "Gate": {"running": 0.6, "seat_travel": 0.05},
+    "Diaphragm": {"running": 0.5, "seat_travel": 0.2}
+}
+
+# Stem travel of linear valves per inch of valve size (m)
+LINEAR_TRAVEL_PER_INCH = {
+    "Globe": 0.3 * 0.0254,
+    "Gate": 1.0 * 0.0254,
+    "Diaphragm": 0.25 * 0.0254
+}
+
+def _build_linear_shapes(catalog, travel):
+    names = catalog.categories["type"]
+    count = len(names)
+    shapes = {
+        "linear": np.array([name in LINEAR_PROFILE_COEFFICIENTS for name in names], dtype=bool),
+        "running": np.full(count, np.nan),
+        "travel_per_inch": np.full(count, np.nan),
+        "seat_shape": np.zeros((count, len(travel)))
+    }
+    for code, name in enumerate(names):
+        coefficients = LINEAR_PROFILE_COEFFICIENTS.get(name)
+        if coefficients is None:
+            continue
+        shapes["running"][code] = coefficients["running"]
+        shapes["travel_per_inch"][code] = LINEAR_TRAVEL_PER_INCH[name]
+        shapes["seat_shape"][code] = np.clip(1.0 - travel / coefficients["seat_travel"], 0.0, 1.0)
+    return shapes
+
+def stroke_loads(pressures_bar, temperatures_c, valve_indices, valves=None, fluid=None, step=PROFILE_ANGLE_STEP):
+    """Load profiles of N duty points over a common travel grid.
+
+    Returns a dict with "travel" (m,) from 0 (closed) to 1 (open), "load"
+    (N, m) in Nm or N, "stroke" (N,) in rad or m, "rotary" (N,) and
+    "valid" (N,); invalid points (unknown valve types) have NaN loads.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    profiles = torque_profiles(pressures_bar, temperatures_c, valve_indices, valves, step, fluid)
+    travel = profiles["angles"] / STROKE_ANGLE
+    pressure, temperature, valve_idx = (np.atleast_1d(a) for a in np.broadcast_arrays(
+        np.asarray(pressures_bar, dtype=float),
+        np.asarray(temperatures_c, dtype=float),
+        np.asarray(valve_indices, dtype=np.intp)
+    ))
+    shapes = valves.derived(("linear_shapes", step), lambda catalog: _build_linear_shapes(catalog, travel))
+    type_code = valves.columns["type"][valve_idx]
+    rotary = profiles["rotary"]
+    linear = shapes["linear"][type_code]
+
+    load = profiles["torque"]
+    stroke = np.where(rotary, np.radians(STROKE_ANGLE), np.nan)
+    if linear.any():
+        rows = np.flatnonzero(linear)
+        breakaway, _ = calculate_valve_torque_thrust_batch(pressure[rows], temperature[rows], valve_idx[rows], valves)
+        if fluid:
+            from sizing_fluids import fluid_dynamic_terms
+            breakaway = breakaway + fluid_dynamic_terms(pressure[rows], temperature[rows], valve_idx[rows], fluid,
+                                                        valves)[0]
+        running = shapes["running"][type_code[rows]] * breakaway
+        load[rows] = running[:, None] + (breakaway - running)[:, None] * shapes["seat_shape"][type_code[rows]]
+        stroke[rows] = shapes["travel_per_inch"][type_code[rows]] * valves.columns["size"][valve_idx[rows]]
+    return {"travel": travel, "load": load, "stroke": stroke, "rotary": rotary, "valid": rotary | linear}
+
+# ========================
+# ACTUATOR MODEL
+# ========================
+# Share of the rated power available at the output (motor/gearbox, air or oil losses)
+SUPPLY_EFFICIENCY = {
+    "Electric": 0.6,
+    "Pneumatic": 0.35,
+    "Hydraulic": 0.7
+}
+DEFAULT_EFFICIENCY = 0.5
+
+# Moving parts as a share of the actuator weight, and their radius of gyration for rotary actuators
+MOVING_MASS_FRACTION = 0.2
+ROTARY_GYRATION_RADIUS = 0.05   # m
+
+def _supply_lookup(supplies):
+    """Output efficiency and output curve code of each supply type name"""
+    efficiency = np.array([SUPPLY_EFFICIENCY.get(supply, DEFAULT_EFFICIENCY) for supply in supplies])
+    curve = np.array([CURVE_NAMES.index(SUPPLY_OUTPUT_CURVES.get(supply, "constant")) for supply in supplies],
+                     dtype=np.intp)
+    return efficiency, curve
+
+def _actuator_parameters(ratings, powers, efficiency, curve, weights, rotary):
+    mass = MOVING_MASS_FRACTION * np.asarray(weights, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        free_speed = 4.0 * np.asarray(powers, dtype=float) * 1000.0 * efficiency / ratings
+    return {
+        "rating": ratings,
+        "free_speed": free_speed,
+        "inertia": np.where(rotary, mass * ROTARY_GYRATION_RADIUS**2, mass),
+        # Linear actuators push with a constant force over the stroke
+        "curve": np.where(rotary, curve, CURVE_NAMES.index("constant"))
+    }
+
+def actuator_parameters(ratings, powers, supplies, weights, rotary):
+    """Arrays describing N actuators for simulate_strokes.
+
+    ratings are the rated torques (rotary) or thrusts (linear), powers in kW,
+    supplies the supply type names and rotary the motion of the valve each
+    actuator drives (which selects the output curve and the inertia units).
+    """
+    ratings = np.atleast_1d(np.asarray(ratings, dtype=float))
+    rotary = np.broadcast_to(np.asarray(rotary, dtype=bool), ratings.shape)
+    names, codes = np.unique(np.broadcast_to(np.asarray(supplies, dtype=object), ratings.shape).astype(str),
+                             return_inverse=True)
+    efficiency, curve = _supply_lookup(names.tolist())
+    return _actuator_parameters(ratings, powers, efficiency[codes], curve[codes], weights, rotary)
+
+def catalog_actuator_parameters(rows, rotary, actuators=None):
+    """actuator_parameters for catalog rows"""
+    catalog = get_actuator_index(actuators).catalog
+    rows = np.asarray(rows, dtype=np.intp)
+    rotary = np.broadcast_to(np.asarray(rotary, dtype=bool), rows.shape)
+    columns = catalog.columns
+    efficiency, curve = catalog.derived("supply_dynamics", lambda c: _supply_lookup(c.categories["supply"]))
+    supply = columns["supply"][rows]
+    ratings = np.where(rotary, columns["torque"][rows], columns["thrust"][rows])
+    return _actuator_parameters(ratings, columns["power"][rows], efficiency[supply], curve[supply],
+                                columns["weight"][rows], rotary)
+
+# ========================
+# STROKE SIMULATION
+# ========================
+# The first step starts at rest, where the mean-speed time of a step can be up to
+# twice the true one; it is split into this many geometrically growing sub-steps
+START_SUBSTEPS = 10
+
+def simulate_strokes(loads, points, actuator, direction="open", load_factor=1.0, trajectories=False):
+    """Simulate N valve-actuator pairs over a full stroke.
+
+    loads comes from stroke_loads; points (N,) selects each pair's duty
+    point, so one load profile can be shared by many candidate actuators.
+    actuator comes from actuator_parameters (N pairs). direction "close"
+    runs the profile from open to closed; load_factor scales the loads
+    (e.g. by the safety factor).
+
+    Returns a dict of (N,) arrays: "stroke_time" in s (inf when stalled,
+    NaN for invalid duty points), "stalled", "stall_position" (valve travel
+    where it stalled, 0 closed to 1 open; NaN otherwise), "peak_speed" and
+    "peak_output" (largest output delivered; NaN when stalled) and
+    "peak_load". With
+    trajectories=True it adds "position" (m,), the valve travel in stroke
+    order, and "time" (N, m), when each position is reached.
+    """
+    points = np.asarray(points, dtype=np.intp)
+    n = points.size
+    load = loads["load"][points] * load_factor
+    travel = loads["travel"]
+    curves = np.stack([ACTUATOR_OUTPUT_CURVES[name](travel * STROKE_ANGLE) for name in CURVE_NAMES])
+    output_curve = actuator["rating"][:, None] * curves[actuator["curve"]]
+    if direction == "close":
+        load = load[:, ::-1]
+        output_curve = output_curve[:, ::-1]
+    elif direction != "open":
+        raise ValueError(f"Unknown stroke direction: {direction!r}")
+
+    # Per-step terms, laid out (step, pair) so every step reads contiguous rows
+    step_length = loads["stroke"][points] * np.diff(travel)[0]
+    load_step = 0.5 * (load[:, 1:] + load[:, :-1]).T
+    drive_step = 0.5 * (output_curve[:, 1:] + output_curve[:, :-1]).T
+    inertia = actuator["inertia"]
+    free_speed = actuator["free_speed"]
+    valid = loads["valid"][points] & (actuator["rating"] > 0) & (free_speed > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        work_step = step_length * (drive_step - load_step)
+        damping_step = step_length * drive_step / free_speed
+    half_inertia = 0.5 * inertia
+    two_inertia = 2.0 * inertia
+
+    speed = np.zeros(n)
+    elapsed = np.zeros(n)
+    stalled = ~valid
+    stall_step = np.full(n, -1)
+    peak_speed = np.zeros(n)
+    peak_output = np.zeros(n)
+    times = np.zeros((len(travel), n)) if trajectories else None
+    fractions = [2.0**-START_SUBSTEPS] + [2.0**-j for j in range(START_SUBSTEPS, 0, -1)]
+    schedule = [(0, fraction) for fraction in fractions] + [(k, 1.0) for k in range(1, len(travel) - 1)]
+    # Pairs keep integrating after a stall, but their results are discarded
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for k, fraction in schedule:
+            if fraction == 1.0:
+                length, work, damping = step_length, work_step[k], damping_step[k]
+            else:
+                length, work, damping = step_length * fraction, work_step[k] * fraction, damping_step[k] * fraction
+            # Implicit speed: inertia/2 v'^2 + damping v' - energy = 0, solved in the cancellation-free form
+            energy = half_inertia * speed**2
+            energy += work
+            newly_stalled = energy <= 0
+            newly_stalled &= ~stalled
+            if newly_stalled.any():
+                stall_step[newly_stalled] = k
+                stalled |= newly_stalled
+                np.maximum(energy, 0.0, out=energy)
+            new_speed = 2.0 * energy / (damping + np.sqrt(damping * damping + two_inertia * energy))
+
+            mean_speed = speed + new_speed
+            mean_speed *= 0.5
+            elapsed += length / mean_speed
+            np.fmax(peak_output, drive_step[k] * (1.0 - mean_speed / free_speed), out=peak_output)
+            np.fmax(peak_speed, new_speed, out=peak_speed)
+            speed = new_speed
+            if trajectories:
+                times[k + 1] = elapsed
+
+    results = {
+        "stroke_time": np.where(valid, np.where(stalled, np.inf, elapsed), np.nan),
+        "stalled": stalled & valid,
+        "stall_position": np.where(stall_step >= 0, travel[np.maximum(stall_step, 0)], np.nan),
+        "peak_speed": np.where(stalled, np.nan, peak_speed),
+        "peak_output": np.where(stalled, np.nan, peak_output),
+        "peak_load": np.nanmax(np.where(valid[:, None], load, np.nan), axis=1, initial=0.0)
+    }
+    if direction == "close":
+        results["stall_position"] = 1.0 - results["stall_position"]
+    if trajectories:
+        times = times.T
+        times[(stall_step[:, None] >= 0) & (np.arange(len(travel)) > stall_step[:, None])] = np.inf
+        times[stalled & (stall_step < 0)] = np.nan
+        results.update(position=travel if direction == "open" else travel[::-1], time=times)
+    return results
+
+# Valve-actuator pairs simulated per pass; bounds the per-step arrays to a few tens of MB
+STROKE_BLOCK_PAIRS = 4096
+
+def screen_stroke_times(valve_index, pressure_bar, temperature_c, suitable_actuators, max_stroke_time=None,
+                        direction="close", load_factor=1.0, valves=None, fluid=None):
+    """Simulate every find_suitable_actuators entry on one valve.
+
+    Each entry comes back as a copy with "stroke_time", "stalled" and, when
+    max_stroke_time is given, "meets_stroke_time".
+    """
+    if not suitable_actuators:
+        return []
+    loads = stroke_loads(pressure_bar, temperature_c, valve_index, valves, fluid)
+    actuator = actuator_parameters([entry["capability"] for entry in suitable_actuators],
+                                   [entry["actuator"].power for entry in suitable_actuators],
+                                   [entry["actuator"].supply for entry in suitable_actuators],
+                                   [entry["actuator"].weight for entry in suitable_actuators],
+                                   loads["rotary"][0])
+    results = simulate_strokes(loads, np.zeros(len(suitable_actuators), dtype=np.intp), actuator, direction,
+                               load_factor)
+    screened = []
+    for position, entry in enumerate(suitable_actuators):
+        entry = dict(entry, stroke_time=float(results["stroke_time"][position]),
+                     stalled=bool(results["stalled"][position]))
+        if max_stroke_time is not None:
+            entry["meets_stroke_time"] = entry["stroke_time"] <= max_stroke_time
+        screened.append(entry)
+    return screened
+
+def selection_stroke_times(loads, selections, direction="close", actuators=None, max_pairs=STROKE_BLOCK_PAIRS):
+    """Stroke times of the candidates of select_actuators_batch-style selections.
+
+    selections holds one (catalog rows, ...) tuple per duty point of loads;
+    all valve-actuator pairs are simulated together, in blocks of at most
+    max_pairs. Returns one stroke time array per duty point.
+    """
+    counts = np.array([len(selection[0]) for selection in selections], dtype=np.intp)
+    points = np.repeat(np.arange(len(selections)), counts)
+    rows = np.concatenate([selection[0] for selection in selections] + [np.empty(0, dtype=np.intp)])
+    stroke_times = np.empty(len(rows))
+    for start in range(0, len(rows), max_pairs):
+        block = slice(start, start + max_pairs)
+        actuator = catalog_actuator_parameters(rows[block], loads["rotary"][points[block]], actuators)
+        stroke_times[block] = simulate_strokes(loads, points[block], actuator, direction)["stroke_time"]
+    return np.split(stroke_times, np.cumsum(counts)[:-1])
+
+def screen_stroke_times_batch(pressures_bar, temperatures_c, valve_indices, required_values, value_types,
+                              safety_factors, supply_types=None, direction="close", valves=None, actuators=None,
+                              fluid=None):
+    """Stroke times of every suitable actuator of N duty points.
+
+    Candidates are those of select_actuators_batch. Returns one (catalog
+    rows, margins, stroke times) triple per duty point in capability order.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    valve_idx = np.atleast_1d(np.asarray(valve_indices, dtype=np.intp))
+    selections = select_actuators_batch(
+        required_values, value_types, valves.columns["max_pressure"][valve_idx], valves.columns["min_temp"][valve_idx],
+        valves.columns["max_temp"][valve_idx], safety_factors, supply_types, actuators)
+    loads = stroke_loads(pressures_bar, temperatures_c, valve_idx, valves, fluid)
+    stroke_times = selection_stroke_times(loads, selections, direction, actuators)
+    return [(rows, margins, times) for (rows, margins), times in zip(selections, stroke_times)]
@@ -0,0 +1,312 @@
+"""Process fluid properties and the fluid-aware torque/thrust model.
+
+The base correlations only see the pressure and the temperature. With a
+process fluid given, its density, viscosity and vapour pressure at the
+inlet state add a dynamic term on top of them:
+
+    force   = DYNAMIC_COEFFICIENTS[type] * bore area * q * viscous factor * cavitation factor
+    torque  = force * bore radius                        (rotary valves)
+    q       = min(0.5 * density * v^2, pressure drop)    v = FLUID_DESIGN_VELOCITY[phase]
+
+- The viscous factor grows with log10(viscosity / water's).
+- The cavitation factor rises as the cavitation index of a liquid,
+  (P1 - Pv) / dP, falls below CAVITATION_SIGMA_INCIPIENT.
+- The operating pressure is taken as the gauge inlet pressure.
+- The valve is assumed to discharge to atmosphere, so the pressure drop
+  equals the operating pressure.
+
+Property tables:
+- CoolProp evaluations are far too slow to call per duty point, let alone
+  per Monte Carlo sample. Properties are therefore served from one table per
+  fluid over (temperature, log pressure), interpolated bilinearly. Viscosity
+  is interpolated in log space.
+- The vapour pressure is interpolated in log space along the temperature
+  nodes, and the phase of a state is decided against it.
+- Where the saturation line cuts a cell, each temperature row is
+  interpolated between its node on the query's side and the saturated state
+  at that row's temperature, so interpolation never blends liquid and vapour.
+- Tables are built on first use, the only time CoolProp is imported. They
+  are persisted under CACHE_DIR, so later runs load them without CoolProp.
+- States outside the table (or outside the fluid's own limits) are clamped
+  to its edge.
+"""
+import functools
+import hashlib
+import math
+import os
+import threading
+
+import numpy as np
+
+from sizing_core import VALVE_DATABASE, ValveCatalog, cache_path, calculate_valve_torque_thrust_batch
+
+# ========================
+# PROPERTY TABLES
+# ========================
+ATMOSPHERIC_PRESSURE_BAR = 1.01325
+
+FLUID_PRESSURE_RANGE = (0.05, 500.0)     # bar absolute, log-spaced nodes
+FLUID_TEMPERATURE_RANGE = (-50.0, 500.0)  # °C, narrowed to the fluid's own limits
+FLUID_PRESSURE_NODES = 97
+FLUID_TEMPERATURE_NODES = 111
+
+# Bump when the file layout changes
+FLUID_TABLE_FORMAT = 1
+
+# Fluids offered by the UI (any CoolProp fluid name is accepted)
+FLUID_CHOICES = ("Water", "Air", "Nitrogen", "Methane", "Propane", "CarbonDioxide", "Ammonia", "Hydrogen")
+
+def _coolprop_props():
+    try:
+        from CoolProp.CoolProp import PropsSI
+    except ImportError as e:
+        raise ValueError("CoolProp is needed to build fluid property tables") from e
+    return PropsSI
+
+def _fill_gaps(values):
+    """Replace NaN nodes (failed property calls) by interpolation along each row"""
+    for row in values:
+        bad = np.isnan(row)
+        if bad.any() and not bad.all():
+            positions = np.arange(len(row))
+            row[bad] = np.interp(positions[bad], positions[~bad], row[~bad])
+    return values
+
+class FluidPropertyTable:
+    """Density, viscosity and vapour pressure of one fluid over a (temperature, pressure) grid.
+
+    Pressures are bar absolute, temperatures °C, density kg/m³ and viscosity Pa·s.
+    """
+    ARRAYS = ("temperature_nodes", "log_pressure_nodes", "density", "log_viscosity", "dense",
+              "vapour_pressure", "saturated_density", "saturated_log_viscosity", "critical")
+
+    def __init__(self, fluid, arrays):
+        self.fluid = fluid
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def build(cls, fluid, pressure_nodes=FLUID_PRESSURE_NODES, temperature_nodes=FLUID_TEMPERATURE_NODES,
+              props=None):
+        """Tabulate a fluid with CoolProp (or `props`, a function with the PropsSI signature)"""
+        if props is None:
+            props = _coolprop_props()
+        t_min = max(FLUID_TEMPERATURE_RANGE[0], props("Tmin", fluid) - 273.15)
+        t_max = min(FLUID_TEMPERATURE_RANGE[1], props("Tmax", fluid) - 273.15)
+        p_max = min(FLUID_PRESSURE_RANGE[1], props("pmax", fluid) / 1e5)
+        t_critical = props("Tcrit", fluid) - 273.15
+        p_critical = props("pcrit", fluid) / 1e5
+        temperatures = np.linspace(t_min, t_max, temperature_nodes)
+        log_pressures = np.linspace(math.log(FLUID_PRESSURE_RANGE[0]), math.log(p_max), pressure_nodes)
+
+        def call(output, name1, value1, name2, value2):
+            try:
+                return props(output, name1, value1, name2, value2, fluid)
+            except ValueError:
+                return math.nan
+
+        # Saturation line up to the critical point; above it the critical values stand in
+        # (columns: liquid, vapour)
+        vapour_pressure = np.full(temperature_nodes, p_critical)
+        saturated = {output: np.full((temperature_nodes, 2), math.nan) for output in ("D", "V")}
+        critical_temperature_k = t_critical + 273.15
+        for i, temperature in enumerate(temperatures.tolist()):
+            t_sat = min(temperature + 273.15, critical_temperature_k - 1e-3)
+            if temperature < t_critical:
+                vapour_pressure[i] = call("P", "T", t_sat, "Q", 0) / 1e5
+            for output, values in saturated.items():
+                values[i] = [call(output, "T", t_sat, "Q", quality) for quality in (0, 1)]
+
+        density = np.empty((temperature_nodes, pressure_nodes))
+        viscosity = np.empty((temperature_nodes, pressure_nodes))
+        for i, temperature in enumerate(temperatures.tolist()):
+            for j, pressure in enumerate(np.exp(log_pressures).tolist()):
+                density[i, j] = call("D", "T", temperature + 273.15, "P", pressure * 1e5)
+                viscosity[i, j] = call("V", "T", temperature + 273.15, "P", pressure * 1e5)
+        # Dense side of the saturation line, continued above the critical point at the critical pressure
+        dense = np.exp(log_pressures)[None, :] > vapour_pressure[:, None]
+
+        saturated_density = _fill_gaps(saturated["D"].T.copy()).T
+        saturated_log_viscosity = _fill_gaps(np.log(saturated["V"]).T.copy()).T
+        return cls(fluid, {
+            "temperature_nodes": temperatures,
+            "log_pressure_nodes": log_pressures,
+            "density": _fill_gaps(density),
+            "log_viscosity": _fill_gaps(np.log(viscosity)),
+            "dense": dense,
+            "vapour_pressure": _fill_gaps(vapour_pressure[None, :])[0],
+            "saturated_density": saturated_density,
+            "saturated_log_viscosity": saturated_log_viscosity,
+            "critical": np.array([t_critical, p_critical])
+        })
+
+    def evaluate(self, pressures_bar_abs, temperatures_c):
+        """Properties at the given states (broadcast against each other).
+
+        Returns a dict of arrays: density (kg/m³), viscosity (Pa·s),
+        vapour_pressure (bar absolute, the critical pressure above the
+        critical temperature) and liquid (bool).
+        """
+        pressure, temperature = np.broadcast_arrays(np.asarray(pressures_bar_abs, dtype=float),
+                                                    np.asarray(temperatures_c, dtype=float))
+        t_nodes = self.temperature_nodes
+        p_nodes = self.log_pressure_nodes
+        temperature = np.clip(temperature, t_nodes[0], t_nodes[-1])
+        log_pressure = np.clip(np.log(np.maximum(pressure, 1e-12)), p_nodes[0], p_nodes[-1])
+
+        i = np.clip(np.searchsorted(t_nodes, temperature, side="right") - 1, 0, len(t_nodes) - 2)
+        j = np.clip(np.searchsorted(p_nodes, log_pressure, side="right") - 1, 0, len(p_nodes) - 2)
+        wt = (temperature - t_nodes[i]) / (t_nodes[i + 1] - t_nodes[i])
+        wp = (log_pressure - p_nodes[j]) / (p_nodes[j + 1] - p_nodes[j])
+
+        # ln(Pv) is close to linear in temperature; interpolating Pv itself overestimates it between
+        # nodes, and states just above saturation would be taken for vapour
+        log_vapour_pressure = (1.0 - wt) * np.log(self.vapour_pressure[i]) + wt * np.log(self.vapour_pressure[i + 1])
+        dense = log_pressure > log_vapour_pressure
+        phase = np.where(dense, 0, 1)
+
+        def interpolate(grid, saturated):
+            result = np.zeros(temperature.shape)
+            for row, weight_t in ((i, 1.0 - wt), (i + 1, wt)):
+                low, high = grid[row, j], grid[row, j + 1]
+                low_same = self.dense[row, j] == dense
+                high_same = self.dense[row, j + 1] == dense
+                # Where the saturation line cuts this row's interval, interpolate
+                # between the same-phase node and the saturated state instead
+                sat_value = saturated[row, phase]
+                log_sat = np.log(self.vapour_pressure[row])
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    towards_sat = np.clip((log_pressure - p_nodes[j]) / (log_sat - p_nodes[j]), 0.0, 1.0)
+                    from_sat = np.clip((log_pressure - log_sat) / (p_nodes[j + 1] - log_sat), 0.0, 1.0)
+                value = np.where(
+                    low_same & high_same, low + (high - low) * wp,
+                    np.where(low_same, low + (sat_value - low) * np.nan_to_num(towards_sat),
+                             np.where(high_same, sat_value + (high - sat_value) * np.nan_to_num(from_sat, nan=1.0),
+                                      sat_value)))
+                result += weight_t * value
+            return result
+
+        return {
+            "density": interpolate(self.density, self.saturated_density),
+            "viscosity": np.exp(interpolate(self.log_viscosity, self.saturated_log_viscosity)),
+            "vapour_pressure": np.exp(log_vapour_pressure),
+            "liquid": dense & (temperature < self.critical[0])
+        }
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+    @staticmethod
+    def cache_file(fluid, pressure_nodes, temperature_nodes):
+        key = hashlib.sha256(
+            f"{FLUID_TABLE_FORMAT}:{fluid}:{FLUID_PRESSURE_RANGE}:{FLUID_TEMPERATURE_RANGE}:"
+            f"{pressure_nodes}:{temperature_nodes}".encode()
+        ).hexdigest()
+        return cache_path("fluids", f"{key}.npz")
+
+    def save(self, path):
+        tmp_file = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez_compressed(tmp_file, **{name: getattr(self, name) for name in self.ARRAYS})
+            os.replace(tmp_file, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path, fluid):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in cls.ARRAYS}
+        return cls(fluid, arrays)
+
+_FLUID_TABLES = {}
+_FLUID_TABLES_LOCK = threading.Lock()
+
+def get_fluid_table(fluid, pressure_nodes=FLUID_PRESSURE_NODES, temperature_nodes=FLUID_TEMPERATURE_NODES):
+    """Property table of a fluid, loaded from (or built into) the on-disk cache once per process.
+
+    Raises ValueError for fluids CoolProp does not know, or when a table has
+    to be built and CoolProp is not installed.
+    """
+    key = (fluid, pressure_nodes, temperature_nodes)
+    with _FLUID_TABLES_LOCK:
+        if key not in _FLUID_TABLES:
+            path = FluidPropertyTable.cache_file(fluid, pressure_nodes, temperature_nodes)
+            try:
+                table = FluidPropertyTable.load(path, fluid)
+            except (OSError, KeyError, ValueError):
+                table = FluidPropertyTable.build(fluid, pressure_nodes, temperature_nodes)
+                table.save(path)
+            _FLUID_TABLES[key] = table
+        return _FLUID_TABLES[key]
+
+# ========================
+# FLUID-AWARE TORQUE/THRUST
+# ========================
+# Dynamic force coefficients per valve type, on bore area x velocity head
+DYNAMIC_COEFFICIENTS = {
+    "Ball": 0.3,
+    "Plug": 0.3,
+    "Butterfly": 0.6,
+    "Globe": 1.0,
+    "Gate": 0.5,
+    "Diaphragm": 1.0
+}
+
+# Design line velocities (m/s) setting the velocity head
+FLUID_DESIGN_VELOCITY = {
+    "liquid": 3.0,
+    "gas": 30.0
+}
+
+REFERENCE_VISCOSITY = 1.0e-3   # Pa·s, water at about 20 °C
+VISCOSITY_FACTOR = 0.15        # added per decade of viscosity above the reference
+CAVITATION_SIGMA_INCIPIENT = 2.0
+CAVITATION_FACTOR = 0.5        # added at full cavitation (index 0)
+
+ROTARY_VALVE_TYPES = ("Ball", "Plug", "Butterfly")
+
+def fluid_dynamic_terms(pressures_bar, temperatures_c, valve_indices, fluid, valves=None):
+    """Dynamic torque (Nm) or thrust (N) of a fluid at the given duty points, plus the properties used"""
+    if valves is None:
+        valves = VALVE_DATABASE
+    pressure, temperature, valve_idx = np.broadcast_arrays(
+        np.asarray(pressures_bar, dtype=float),
+        np.asarray(temperatures_c, dtype=float),
+        np.asarray(valve_indices, dtype=np.intp)
+    )
+    properties = get_fluid_table(fluid).evaluate(pressure + ATMOSPHERIC_PRESSURE_BAR, temperature)
+    pressure_drop = np.maximum(pressure, 0.0) * 1e5
+
+    velocity = np.where(properties["liquid"], FLUID_DESIGN_VELOCITY["liquid"], FLUID_DESIGN_VELOCITY["gas"])
+    velocity_head = np.minimum(0.5 * properties["density"] * velocity**2, pressure_drop)
+    viscous = 1.0 + VISCOSITY_FACTOR * np.maximum(np.log10(properties["viscosity"] / REFERENCE_VISCOSITY), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = ((pressure + ATMOSPHERIC_PRESSURE_BAR - properties["vapour_pressure"]) * 1e5 /
+                 np.where(pressure_drop > 0, pressure_drop, np.inf))
+    cavitation = 1.0 + CAVITATION_FACTOR * np.where(
+        properties["liquid"], np.clip(1.0 - sigma / CAVITATION_SIGMA_INCIPIENT, 0.0, 1.0), 0.0)
+
+    type_codes = valves.columns["type"][valve_idx]
+    type_names = valves.categories["type"]
+    coefficient = np.array([DYNAMIC_COEFFICIENTS.get(t, 0.0) for t in type_names], dtype=float)[type_codes]
+    rotary = np.array([t in ROTARY_VALVE_TYPES for t in type_names], dtype=bool)[type_codes]
+    radius = valves.columns["size"][valve_idx] * 0.0254 / 2
+    force = coefficient * math.pi * radius**2 * velocity_head * viscous * cavitation
+    return np.where(rotary, force * radius, force), properties
+
+def fluid_dynamic_term(valve, pressure_bar, temperature_c, fluid):
+    """Dynamic torque or thrust of a fluid for one valve and duty point"""
+    dynamic, _ = fluid_dynamic_terms(pressure_bar, temperature_c, 0, fluid, ValveCatalog.from_views([valve]))
+    return float(dynamic)
+
+def calculate_fluid_torque_thrust_batch(pressures_bar, temperatures_c, valve_indices, valves=None, fluid="Water"):
+    """calculate_valve_torque_thrust_batch plus the dynamic term of a process fluid (same arguments and outputs)"""
+    if valves is None:
+        valves = VALVE_DATABASE
+    values, labels = calculate_valve_torque_thrust_batch(pressures_bar, temperatures_c, valve_indices, valves)
+    dynamic, _ = fluid_dynamic_terms(pressures_bar, temperatures_c, valve_indices, fluid, valves)
+    return values + dynamic, labels
+
+def fluid_model(fluid):
+    """calculate_fluid_torque_thrust_batch bound to a fluid, usable wherever a model function is accepted"""
+    return functools.partial(calculate_fluid_torque_thrust_batch, fluid=fluid)
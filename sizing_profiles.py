@@ -0,0 +1,227 @@
+"""Angle-resolved stroke torque profiles for quarter-turn (ball, plug, butterfly) valves.
+
+The static correlations give one number, taken here as the breakaway
+torque at 0° (closed). Over the 0–90° opening stroke the requirement is
+made up of four parts:
+
+    unseating   (breakaway - running), fading out over the first seat_angle degrees
+    running     running x breakaway, constant over the stroke
+    dynamic     dynamic x breakaway x the type's normalized curve, plus the
+                process fluid's dynamic term when a fluid is given
+    end         (end_of_stroke - running), building up over the last seat_angle degrees
+
+PROFILE_COEFFICIENTS holds the ratios for each valve type. Profiles are
+one array per duty point over a common angle grid, built for all duty
+points at once from per-type shape tables.
+
+An actuator meets a profile when its output curve (its rated torque times
+the normalized curve for its supply, ACTUATOR_OUTPUT_CURVES) is at least
+the safety-factored profile at every angle. For each curve shape the rating
+needed is max(profile / curve) over the stroke. That reduces the check
+against a whole catalog to one comparison per actuator, and the angle where
+the maximum occurs is the critical angle.
+"""
+import numpy as np
+
+from sizing_core import (
+    VALVE_DATABASE, calculate_valve_torque_thrust_batch, get_actuator_index, select_actuators_batch
+)
+
+# ========================
+# STROKE PROFILES
+# ========================
+PROFILE_ANGLE_STEP = 0.5   # degrees
+STROKE_ANGLE = 90.0
+
+# Ratios to the breakaway torque (running, end_of_stroke, dynamic peak) and the seat travel in degrees
+PROFILE_COEFFICIENTS = {
+    "Ball": {"running": 0.55, "end_of_stroke": 0.8, "dynamic": 0.1, "seat_angle": 10.0},
+    "Plug": {"running": 0.7, "end_of_stroke": 0.9, "dynamic": 0.05, "seat_angle": 10.0},
+    "Butterfly": {"running": 0.35, "end_of_stroke": 0.6, "dynamic": 0.5, "seat_angle": 15.0}
+}
+
+# Normalized dynamic torque over the stroke (peak 1), tabulated every 10°
+DYNAMIC_CURVE_ANGLES = np.arange(0.0, 91.0, 10.0)
+DYNAMIC_TORQUE_CURVES = {
+    "Ball": (0.0, 0.1, 0.25, 0.45, 0.65, 0.85, 1.0, 0.8, 0.4, 0.1),
+    "Plug": (0.0, 0.1, 0.25, 0.45, 0.65, 0.85, 1.0, 0.8, 0.4, 0.1),
+    "Butterfly": (0.0, 0.05, 0.12, 0.22, 0.35, 0.5, 0.68, 0.88, 1.0, 0.3)
+}
+
+def profile_angles(step=PROFILE_ANGLE_STEP):
+    """Opening angles (degrees) of the profile grid, 0 (closed) to 90 (open)"""
+    return np.linspace(0.0, STROKE_ANGLE, int(round(STROKE_ANGLE / step)) + 1)
+
+def _build_profile_shapes(catalog, angles):
+    """Per valve-type category: coefficient vectors and (category, angle) shape tables"""
+    names = catalog.categories["type"]
+    count = len(names)
+    shapes = {
+        "rotary": np.array([name in PROFILE_COEFFICIENTS for name in names], dtype=bool),
+        "running": np.full(count, np.nan),
+        "end_of_stroke": np.full(count, np.nan),
+        "dynamic": np.full(count, np.nan),
+        "unseating_shape": np.zeros((count, len(angles))),
+        "end_shape": np.zeros((count, len(angles))),
+        "dynamic_shape": np.zeros((count, len(angles)))
+    }
+    for code, name in enumerate(names):
+        coefficients = PROFILE_COEFFICIENTS.get(name)
+        if coefficients is None:
+            continue
+        for key in ("running", "end_of_stroke", "dynamic"):
+            shapes[key][code] = coefficients[key]
+        seat_angle = coefficients["seat_angle"]
+        shapes["unseating_shape"][code] = np.clip(1.0 - angles / seat_angle, 0.0, 1.0)
+        shapes["end_shape"][code] = np.clip(1.0 - (STROKE_ANGLE - angles) / seat_angle, 0.0, 1.0)
+        shapes["dynamic_shape"][code] = np.interp(angles, DYNAMIC_CURVE_ANGLES, DYNAMIC_TORQUE_CURVES[name])
+    return shapes
+
+def torque_profiles(pressures_bar, temperatures_c, valve_indices, valves=None, step=PROFILE_ANGLE_STEP, fluid=None,
+                    components=False):
+    """Opening-stroke torque profiles (Nm) for N duty points.
+
+    pressures_bar, temperatures_c and valve_indices are broadcast to one
+    dimension. Returns a dict with "angles" (m,), "torque" (N, m), the
+    per-point "breakaway", "running", "end_of_stroke", "dynamic_peak",
+    "peak" and "peak_angle", and "rotary" (False, with NaN profiles, for
+    valves that are not quarter-turn). With components=True it also holds
+    "unseating", "dynamic" and "end" as (N, m) arrays.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    pressure, temperature, valve_idx = (np.atleast_1d(a) for a in np.broadcast_arrays(
+        np.asarray(pressures_bar, dtype=float),
+        np.asarray(temperatures_c, dtype=float),
+        np.asarray(valve_indices, dtype=np.intp)
+    ))
+    angles = profile_angles(step)
+    shapes = valves.derived(("profile_shapes", step), lambda catalog: _build_profile_shapes(catalog, angles))
+    type_code = valves.columns["type"][valve_idx]
+    rotary = shapes["rotary"][type_code]
+
+    breakaway, _ = calculate_valve_torque_thrust_batch(pressure, temperature, valve_idx, valves)
+    breakaway = np.where(rotary, breakaway, np.nan)
+    running = shapes["running"][type_code] * breakaway
+    end_of_stroke = shapes["end_of_stroke"][type_code] * breakaway
+    dynamic_peak = shapes["dynamic"][type_code] * breakaway
+    if fluid:
+        from sizing_fluids import fluid_dynamic_terms
+        dynamic_peak = dynamic_peak + fluid_dynamic_terms(pressure, temperature, valve_idx, fluid, valves)[0]
+
+    unseating = (breakaway - running)[:, None] * shapes["unseating_shape"][type_code]
+    dynamic = dynamic_peak[:, None] * shapes["dynamic_shape"][type_code]
+    end = np.maximum(end_of_stroke - running, 0.0)[:, None] * shapes["end_shape"][type_code]
+    torque = unseating + dynamic + end
+    torque += running[:, None]
+
+    peak_position = np.argmax(np.where(rotary[:, None], torque, 0.0), axis=1)
+    profiles = {
+        "angles": angles,
+        "torque": torque,
+        "breakaway": breakaway,
+        "running": running,
+        "end_of_stroke": end_of_stroke,
+        "dynamic_peak": dynamic_peak,
+        "peak": torque[np.arange(len(torque)), peak_position],
+        "peak_angle": np.where(rotary, angles[peak_position], np.nan),
+        "rotary": rotary
+    }
+    if components:
+        profiles.update(unseating=unseating, dynamic=dynamic, end=end)
+    return profiles
+
+# ========================
+# ACTUATOR OUTPUT CURVES
+# ========================
+def _constant_output(angles):
+    return np.ones_like(angles)
+
+def _scotch_yoke_output(angles):
+    # Highest at both ends of the stroke, half of that at mid-stroke
+    return 0.5 / np.cos(np.radians(angles - 45.0))**2
+
+# Output torque over the stroke as a fraction of the rated (breakaway) torque
+ACTUATOR_OUTPUT_CURVES = {
+    "constant": _constant_output,
+    "scotch_yoke": _scotch_yoke_output
+}
+
+# Output curve of each supply type (others are treated as constant)
+SUPPLY_OUTPUT_CURVES = {
+    "Electric": "constant",
+    "Pneumatic": "scotch_yoke",
+    "Hydraulic": "scotch_yoke"
+}
+CURVE_NAMES = tuple(ACTUATOR_OUTPUT_CURVES)
+
+def actuator_curve_codes(catalog):
+    """Index into CURVE_NAMES of every actuator's output curve"""
+    lut = np.array([CURVE_NAMES.index(SUPPLY_OUTPUT_CURVES.get(supply, "constant"))
+                    for supply in catalog.categories["supply"]], dtype=np.intp)
+    return lut[catalog.columns["supply"]]
+
+def required_curve_ratings(profiles):
+    """Rated torque each output curve needs to cover each profile.
+
+    Returns (ratings, critical_angles), both (len(CURVE_NAMES), N): the
+    largest ratio of profile to curve over the stroke and where it occurs.
+    """
+    angles = profiles["angles"]
+    torque = profiles["torque"]
+    ratings = np.empty((len(CURVE_NAMES), len(torque)))
+    critical = np.empty((len(CURVE_NAMES), len(torque)))
+    for code, name in enumerate(CURVE_NAMES):
+        ratio = torque / ACTUATOR_OUTPUT_CURVES[name](angles)
+        position = np.argmax(np.nan_to_num(ratio, nan=-np.inf), axis=1)
+        ratings[code] = ratio[np.arange(len(torque)), position]
+        critical[code] = angles[position]
+    return ratings, critical
+
+def check_actuator_curves(profiles, point, capabilities, supplies, safety_factor):
+    """Output-curve check of actuators (rated torques and supply types) against one profile.
+
+    Returns (ok mask, margins in % at the critical angle, critical angles);
+    the margin is relative to the safety-factored requirement like everywhere else.
+    """
+    ratings, critical = required_curve_ratings({"angles": profiles["angles"],
+                                                "torque": profiles["torque"][point:point + 1]})
+    codes = np.array([CURVE_NAMES.index(SUPPLY_OUTPUT_CURVES.get(supply, "constant")) for supply in supplies],
+                     dtype=np.intp)
+    need = ratings[codes, 0] * safety_factor
+    capabilities = np.asarray(capabilities, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margins = (capabilities / need - 1) * 100
+    return capabilities >= need, margins, critical[codes, 0]
+
+def select_actuators_for_profiles(profiles, valve_indices, safety_factors, supply_types=None, valves=None,
+                                  actuators=None):
+    """select_actuators_batch against whole stroke profiles instead of the breakaway torque.
+
+    Returns one (catalog rows, margins, critical angles) triple per duty point,
+    in capability order; non-rotary points get empty arrays.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    catalog = get_actuator_index(actuators).catalog
+    n = len(profiles["torque"])
+    valve_idx = np.broadcast_to(np.asarray(valve_indices, dtype=np.intp), (n,))
+    sf = np.broadcast_to(np.asarray(safety_factors, dtype=float), (n,))
+    ratings, critical = required_curve_ratings(profiles)
+
+    # The smallest rating over all curves preselects through the index; each candidate is then held to its own curve
+    lower = np.where(profiles["rotary"], np.nan_to_num(ratings.min(axis=0), nan=np.inf), np.inf)
+    selections = select_actuators_batch(
+        lower, "Torque (Nm)", valves.columns["max_pressure"][valve_idx], valves.columns["min_temp"][valve_idx],
+        valves.columns["max_temp"][valve_idx], sf, supply_types, actuators)
+    curve_codes = actuator_curve_codes(catalog)
+    capability = catalog.columns["torque"]
+    results = []
+    for point, (rows, _) in enumerate(selections):
+        codes = curve_codes[rows]
+        need = ratings[codes, point] * sf[point]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            margins = (capability[rows] / need - 1) * 100
+        ok = capability[rows] >= need
+        results.append((rows[ok], margins[ok], critical[codes[ok], point]))
+    return results
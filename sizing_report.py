@@ -0,0 +1,641 @@
+"""PDF report generation for actuator sizing results."""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+
+import fpdf
+from fpdf import FPDF
+
+from sizing_core import cache_path, valve_label
+
+# ========================
+# FONT REGISTRY
+# ========================
+# DejaVu family used by every report: (style, font file)
+REPORT_FONTS = (
+    ('', 'DejaVuSans.ttf'),
+    ('B', 'DejaVuSans-Bold.ttf'),
+    ('I', 'DejaVuSans-Oblique.ttf'),
+    ('BI', 'DejaVuSans-BoldOblique.ttf')
+)
+
+# fpdf2 releases FontRegistry._build_font is written against (see requirements.txt)
+FPDF2_VERSIONS = ((2, 8, 9), (2, 9))
+
+def _check_fpdf2_version(version=fpdf.__version__):
+    release = tuple(int(part) for part in version.split(".")[:3] if part.isdigit())
+    low, high = FPDF2_VERSIONS
+    if not low <= release < high:
+        raise ImportError(f"Reports need fpdf2 >={'.'.join(map(str, low))},<{'.'.join(map(str, high))} "
+                          f"(see requirements.txt), found {version}")
+
+class FontRegistry:
+    """Process-wide store of parsed report fonts.
+
+    Each font file is read, parsed and measured once per process; the
+    metrics are also persisted under CACHE_DIR keyed by the file's SHA-256,
+    so later processes skip the parse as well. Reports then attach a
+    prepared font without touching the TTF file again.
+
+    fpdf2 subsets a document's fonts in place when it writes the document, so
+    parsed fonts cannot be shared between documents and each one gets a font
+    object rebuilt from the metrics. That follows fpdf2's TTFFont internals,
+    so the fpdf2 version is pinned and checked when the registry is created.
+    """
+    def __init__(self):
+        _check_fpdf2_version()
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve(fname):
+        # Same lookup as FPDF.add_font (working directory), then next to this module
+        for parent in (Path("."), Path(__file__).resolve().parent):
+            if (parent / fname).exists():
+                return (parent / fname).resolve()
+        raise FileNotFoundError(f"TTF Font file not found: {fname}")
+
+    def prepare(self, fname):
+        """Load (once) and return the prepared font for a file name"""
+        path = self._resolve(fname)
+        with self._lock:
+            if path not in self._fonts:
+                self._fonts[path] = self._load(path)
+            return self._fonts[path]
+
+    def _load(self, path):
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        # fpdf2's font internals change between releases, so its version is part of the key
+        cache_file = cache_path("fonts", f"{digest}-fpdf2-{fpdf.__version__}.json")
+        try:
+            with open(cache_file, encoding="utf-8") as f:
+                metrics = json.load(f)
+        except (OSError, ValueError):
+            metrics = self._measure(path)
+            self._store(cache_file, metrics)
+
+        prepared = {"path": path, "data": data, "metrics": metrics}
+        # JSON object keys are strings; fpdf2 looks characters up by code point
+        for table in ("cw", "cmap", "glyph_ids"):
+            prepared[table] = {int(char): value for char, value in metrics[table].items()}
+        return prepared
+
+    @staticmethod
+    def _store(cache_file, metrics):
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(metrics, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _measure(path):
+        """Parse a font the way FPDF.add_font does and keep the document-independent results"""
+        probe = FPDF()
+        probe.add_font("probe", "", str(path))
+        font = probe.fonts["probe"]
+        desc = font.desc
+        return {
+            "name": font.name,
+            "scale": font.scale,
+            "up": font.up,
+            "ut": font.ut,
+            "sp": font.sp,
+            "ss": font.ss,
+            "is_cff": font.is_cff,
+            "is_cid_keyed": font.is_cid_keyed,
+            "is_symbol": font.is_symbol,
+            "cff_ros": font.cff_ros,
+            "desc": {
+                "ascent": desc.ascent,
+                "descent": desc.descent,
+                "cap_height": desc.cap_height,
+                "flags": desc.flags.value,
+                "font_b_box": desc.font_b_box,
+                "italic_angle": desc.italic_angle,
+                "stem_v": desc.stem_v,
+                "missing_width": desc.missing_width
+            },
+            "cw": {str(char): width for char, width in font.cw.items()},
+            "cmap": {str(char): glyph for char, glyph in font.cmap.items()},
+            "glyph_ids": {str(char): glyph_id for char, glyph_id in font.glyph_ids.items()}
+        }
+
+    def attach(self, pdf, family, style, fname):
+        """Make a prepared font available on pdf, equivalent to pdf.add_font(family, style, fname)"""
+        prepared = self.prepare(fname)
+        style = "".join(sorted(style.upper()))
+        fontkey = f"{family.lower()}{style}"
+        if fontkey not in pdf.fonts:
+            pdf.fonts[fontkey] = self._build_font(pdf, prepared, fontkey, style)
+
+    @staticmethod
+    def _build_font(pdf, prepared, fontkey, style):
+        # Mirrors TTFFont.__init__/__deepcopy__: metrics come from the registry,
+        # per-document state (index, subset, width cache, descriptor) is fresh
+        from fontTools import ttLib
+        from fpdf.enums import FontDescriptorFlags, TextEmphasis
+        from fpdf.font_type_3 import get_color_font_object
+        from fpdf.fonts import PDFFontDescriptor, SubsetMap, TTFFont
+
+        metrics = prepared["metrics"]
+        desc = dict(metrics["desc"])
+        desc["flags"] = FontDescriptorFlags(desc["flags"])
+
+        font = TTFFont.__new__(TTFFont)
+        font.i = len(pdf.fonts) + 1
+        font.type = "TTF"
+        font.ttffile = prepared["path"]
+        font.is_compressed = False
+        font._hbfont = None
+        font.fontkey = fontkey
+        font.biggest_size_pt = 0
+        font.collection_font_number = 0
+        # Parsed lazily from memory; only the tables needed to embed the subset are read
+        font.ttfont = ttLib.TTFont(BytesIO(prepared["data"]), recalcTimestamp=False, lazy=True)
+        font.is_cff = metrics["is_cff"]
+        font.is_cid_keyed = metrics["is_cid_keyed"]
+        font.is_symbol = metrics["is_symbol"]
+        font.cff_ros = tuple(metrics["cff_ros"]) if metrics["cff_ros"] else None
+        font.scale = metrics["scale"]
+        font.desc = PDFFontDescriptor(**desc)
+        font.cw = defaultdict(lambda: desc["missing_width"], prepared["cw"])
+        font.cmap = prepared["cmap"]
+        font.glyph_ids = dict(prepared["glyph_ids"])
+        font.missing_glyphs = []
+        font.name = metrics["name"]
+        font.up = metrics["up"]
+        font.ut = metrics["ut"]
+        font.sp = metrics["sp"]
+        font.ss = metrics["ss"]
+        font.emphasis = TextEmphasis.coerce(style)
+        font.subset = SubsetMap(font)
+        font.palette_index = 0
+        font.color_font = get_color_font_object(pdf, font, 0) if pdf.render_color_fonts else None
+        return font
+
+FONT_REGISTRY = FontRegistry()
+
+# ========================
+# LOGO IMAGE PIPELINE
+# ========================
+# Largest width the logo is printed at (cover page) and the print resolution
+LOGO_MAX_WIDTH_MM = 50
+LOGO_DPI = 300
+
+# Prepared logos shared by all reports in the process, keyed by content hash
+_LOGO_CACHE = OrderedDict()
+_LOGO_CACHE_SIZE = 16
+_LOGO_CACHE_LOCK = threading.Lock()
+
+def prepare_logo(logo_bytes, max_width_mm=LOGO_MAX_WIDTH_MM, dpi=LOGO_DPI):
+    """Decode a logo once, downsample it to its print size and return it as PNG bytes.
+
+    Results are cached per process by content hash, so every report (and every
+    page, through fpdf2's per-document image cache) reuses the same image.
+    """
+    key = (hashlib.sha256(logo_bytes).hexdigest(), max_width_mm, dpi)
+    with _LOGO_CACHE_LOCK:
+        if key in _LOGO_CACHE:
+            _LOGO_CACHE.move_to_end(key)
+            return _LOGO_CACHE[key]
+
+    from PIL import Image
+
+    with Image.open(BytesIO(logo_bytes)) as img:
+        img.load()
+        max_px = round(max_width_mm / 25.4 * dpi)
+        if img.width > max_px:
+            img = img.resize((max_px, max(1, round(img.height * max_px / img.width))), Image.LANCZOS)
+        if img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA")
+        out = BytesIO()
+        img.save(out, format="PNG", optimize=True)
+    prepared = out.getvalue()
+
+    with _LOGO_CACHE_LOCK:
+        _LOGO_CACHE[key] = prepared
+        while len(_LOGO_CACHE) > _LOGO_CACHE_SIZE:
+            _LOGO_CACHE.popitem(last=False)
+    return prepared
+
+# ========================
+# ENHANCED PDF REPORT GENERATION
+# ========================
+class EnhancedPDFReport(FPDF):
+    def __init__(self, logo_bytes=None, logo_type=None):
+        super().__init__(orientation='P', unit='mm', format='A4')
+        self.logo_bytes = logo_bytes
+        self.logo_type = logo_type
+        
+        # Decode the logo once; pages reuse the same embedded image
+        self.logo_image = None
+        if self.logo_bytes and self.logo_type:
+            try:
+                self.logo_image = prepare_logo(self.logo_bytes)
+            except (ImportError, OSError, ValueError):
+                pass
+        self.set_auto_page_break(auto=True, margin=15)
+        self.set_margins(15, 15, 15)
+        self.set_title("Actuator Sizing Report")
+        self.set_author("VASTAŞ Actuator Sizing Software")
+        self.alias_nb_pages()
+        self.set_compression(True)
+        
+        # Add Unicode support (fonts are parsed once per process by the registry)
+        for style, fname in REPORT_FONTS:
+            FONT_REGISTRY.attach(self, 'DejaVu', style, fname)
+    
+    def header(self):
+        if self.page_no() == 1:
+            return
+            
+        # Draw top border
+        self.set_draw_color(0, 51, 102)
+        self.set_line_width(0.5)
+        self.line(10, 15, 200, 15)
+        
+        # Logo
+        if self.logo_image:
+            try:
+                self.image(self.logo_image, x=15, y=8, w=20)
+            except Exception as e:
+                pass
+        
+        # Title
+        self.set_font('DejaVu', 'B', 10)
+        self.set_text_color(0, 51, 102)
+        self.set_y(10)
+        self.cell(0, 10, 'Actuator Sizing Report', 0, 0, 'C')
+        
+        # Page number
+        self.set_font('DejaVu', 'I', 8)
+        self.set_text_color(100)
+        self.set_y(10)
+        self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', 0, 0, 'R')
+        
+        # Line break
+        self.ln(15)
+        
+    def footer(self):
+        if self.page_no() == 1:
+            return
+            
+        self.set_y(-15)
+        self.set_font('DejaVu', 'I', 8)
+        self.set_text_color(100)
+        self.cell(0, 10, f'Generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 0, 0, 'L')
+        self.cell(0, 10, 'Confidential - VASTAŞ Valve Technologies', 0, 0, 'R')
+    
+    def cover_page(self, title, subtitle, project_info=None):
+        self.add_page()
+        
+        # Background rectangle
+        self.set_fill_color(0, 51, 102)
+        self.rect(0, 0, 210, 297, 'F')
+        
+        # Main content area
+        self.set_fill_color(255, 255, 255)
+        self.rect(15, 15, 180, 267, 'F')
+        
+        # Logo at top
+        if self.logo_image:
+            try:
+                self.image(self.logo_image, x=80, y=40, w=50)
+            except Exception as e:
+                pass
+        
+        # Title
+        self.set_y(120)
+        self.set_font('DejaVu', 'B', 24)
+        self.set_text_color(0, 51, 102)
+        self.cell(0, 15, title, 0, 1, 'C')
+        
+        # Subtitle
+        self.set_font('DejaVu', 'I', 18)
+        self.set_text_color(70, 70, 70)
+        self.cell(0, 10, subtitle, 0, 1, 'C')
+        
+        # Project info
+        if project_info:
+            self.set_font('DejaVu', '', 14)
+            self.set_text_color(0, 0, 0)
+            self.ln(20)
+            self.cell(0, 10, project_info, 0, 1, 'C')
+        
+        # Company info
+        self.set_y(220)
+        self.set_font('DejaVu', 'B', 14)
+        self.set_text_color(0, 51, 102)
+        self.cell(0, 10, 'VASTAŞ Valve Technologies', 0, 1, 'C')
+        
+        # Date
+        self.set_font('DejaVu', 'I', 12)
+        self.set_text_color(70, 70, 70)
+        self.cell(0, 10, datetime.now().strftime("%B %d, %Y"), 0, 1, 'C')
+        
+        # Confidential notice
+        self.set_y(270)
+        self.set_font('DejaVu', 'I', 10)
+        self.set_text_color(150, 0, 0)
+        self.cell(0, 5, 'CONFIDENTIAL - For internal use only', 0, 0, 'C')
+    
+    def chapter_title(self, title):
+        self.set_font('DejaVu', 'B', 14)
+        self.set_text_color(0, 51, 102)
+        self.set_fill_color(230, 240, 255)
+        self.cell(0, 10, title, 0, 1, 'L', 1)
+        self.ln(5)
+    
+    def chapter_body(self, body, font_size=12):
+        self.set_font('DejaVu', '', font_size)
+        self.set_text_color(0, 0, 0)
+        self.multi_cell(0, 6, body)
+        self.ln()
+    
+    def add_table(self, headers, data, col_widths=None, header_color=(0, 51, 102), 
+                  row_colors=[(255, 255, 255), (240, 248, 255)], font_size=10):
+        if col_widths is None:
+            col_widths = [self.w / len(headers)] * len(headers)
+        
+        def table_header():
+            self.set_font('DejaVu', 'B', font_size)
+            self.set_text_color(255, 255, 255)
+            self.set_fill_color(*header_color)
+            for i, header in enumerate(headers):
+                self.cell(col_widths[i], 7, header, 1, 0, 'C', 1)
+            self.ln()
+            self.set_font('DejaVu', '', font_size)
+            self.set_text_color(0, 0, 0)
+        
+        # Table header
+        table_header()
+        
+        # Table data
+        for row_idx, row in enumerate(data):
+            # Repeat the header when a long table continues on a new page
+            if self.will_page_break(6):
+                self.add_page()
+                table_header()
+            
+            fill_color = row_colors[row_idx % len(row_colors)]
+            self.set_fill_color(*fill_color)
+            
+            for i, item in enumerate(row):
+                self.cell(col_widths[i], 6, str(item), 1, 0, 'C', 1)
+            self.ln()
+    
+    def add_key_value_table(self, data, col_widths=[70, 130], font_size=10):
+        self.set_font('DejaVu', 'B', font_size)
+        self.set_text_color(0, 51, 102)
+        self.set_fill_color(240, 248, 255)
+        
+        for key, value in data:
+            self.cell(col_widths[0], 7, key, 1, 0, 'L', 1)
+            self.set_font('DejaVu', '', font_size)
+            self.set_text_color(0, 0, 0)
+            self.set_fill_color(255, 255, 255)
+            self.multi_cell(col_widths[1], 7, str(value), 1, 'L', 1)
+            self.set_font('DejaVu', 'B', font_size)
+            self.set_text_color(0, 51, 102)
+            self.set_fill_color(240, 248, 255)
+    
+    def add_sizing_sections(self, result, suitable_actuators, safety_factor_name, actuators_on_new_page=True):
+        """Valve Details, Operating Conditions, Calculation Results and Recommended Actuators for one sizing result"""
+        # Valve details
+        self.chapter_title('Valve Details')
+        valve = result["valve"]
+        valve_details = [
+            ("Valve Type:", valve.type),
+            ("Size:", f"{valve.size}\""),
+            ("Pressure Class:", str(valve.pressure_class)),
+            ("Seat Material:", valve.seat_material),
+            ("Stem Diameter:", f"{valve.stem_dia_mm} mm"),
+            ("Max Pressure:", f"{valve.max_pressure} bar"),
+            ("Temperature Range:", f"{valve.min_temp}°C to {valve.max_temp}°C")
+        ]
+        self.add_key_value_table(valve_details)
+        
+        # Operating conditions
+        self.chapter_title('Operating Conditions')
+        op_conditions = [
+            ("Operating Pressure:", f"{result['pressure']} bar"),
+            ("Operating Temperature:", f"{result['temperature']} °C"),
+            ("Safety Factor:", f"{result['safety_factor']} ({safety_factor_name})")
+        ]
+        if result.get("fluid"):
+            op_conditions.append(("Process Fluid:", result["fluid"]))
+        self.add_key_value_table(op_conditions)
+        
+        # Calculation results
+        self.chapter_title('Calculation Results')
+        value_type = result["value_type"]
+        calc_results = [
+            ("Required Value:", f"{result['required_value']:.1f} {value_type}"),
+            ("With Safety Factor:", f"{result['required_with_sf']:.1f} {value_type}")
+        ]
+        self.add_key_value_table(calc_results)
+        
+        # Monte Carlo, stroke profile and stroke time columns of a batch run
+        if result.get("checks"):
+            self.chapter_title('Selection Checks')
+            self.add_key_value_table(result["checks"])
+        
+        # Actuator recommendations
+        if suitable_actuators:
+            if actuators_on_new_page:
+                self.add_page()
+            self.chapter_title('Recommended Actuators')
+            actuator_data = []
+            for actuator in suitable_actuators:
+                act = actuator["actuator"]
+                actuator_data.append([
+                    f"{act.manufacturer} {act.model}",
+                    act.supply,
+                    f"{actuator['capability']:.1f}",
+                    f"{actuator['margin']:.1f}%",
+                    f"{act.power:.1f} kW",
+                    f"{act.weight} kg",
+                    f"${act.price}"
+                ])
+            self.add_table(
+                ["Model", "Type", "Capability", "Margin", "Power", "Weight", "Price"],
+                actuator_data,
+                col_widths=[40, 25, 25, 20, 20, 20, 20]
+            )
+    
+    def add_summary_table(self, results):
+        """One row per tag: conditions, requirement and the top recommended actuator"""
+        summary_data = []
+        for result in results:
+            actuators = result["actuators"]
+            if actuators:
+                best = actuators[0]
+                recommended = f"{best['actuator'].manufacturer} {best['actuator'].model}"
+                margin = f"{best['margin']:.1f}%"
+            else:
+                recommended = "None suitable"
+                margin = "-"
+            summary_data.append([
+                result["tag"],
+                valve_label(result["valve"]),
+                f"{result['pressure']}",
+                f"{result['temperature']}",
+                f"{result['required_with_sf']:.1f}",
+                result["value_type"].split(' ')[0],
+                recommended,
+                margin
+            ])
+        self.add_table(
+            ["Tag", "Valve", "P (bar)", "T (°C)", "Required", "Type", "Recommended", "Margin"],
+            summary_data,
+            col_widths=[22, 38, 15, 15, 20, 16, 38, 16],
+            font_size=8
+        )
+
+# ========================
+# CONSOLIDATED REPORTS
+# ========================
+def build_consolidated_report(results, logo_bytes=None, logo_type=None,
+                              project_info="Prepared by VASTAŞ Engineering Department",
+                              subtitle=None, include_summary=True, summary_results=None):
+    """Single report for many tags: cover page, summary table, then the sizing sections of every tag.
+
+    results are dicts as returned by sizing_core.size_valve. Fonts and the
+    logo are set up once for the whole document. summary_results (default:
+    results) lets a volume of a larger report carry the summary of all tags.
+    """
+    if summary_results is None:
+        summary_results = results
+    pdf = EnhancedPDFReport(logo_bytes=logo_bytes, logo_type=logo_type)
+    pdf.cover_page(
+        title="VALVE ACTUATOR SIZING REPORT",
+        subtitle=subtitle or f"Consolidated Report - {len(summary_results)} Tags",
+        project_info=project_info
+    )
+    
+    if include_summary:
+        pdf.add_page()
+        pdf.chapter_title('Tag Summary')
+        pdf.add_summary_table(summary_results)
+    
+    for result in results:
+        pdf.add_page()
+        pdf.chapter_title(f"Tag {result['tag']}")
+        pdf.add_sizing_sections(result, result["actuators"], result["safety_factor_class"],
+                                actuators_on_new_page=False)
+    return pdf
+
+# ========================
+# DISK OUTPUT
+# ========================
+# Finished reports waiting to be downloaded; files older than the max age are purged
+REPORT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), "actuator-sizing-reports")
+REPORT_SPOOL_MAX_AGE = 24 * 3600
+
+def write_report(pdf, target):
+    """Serialize a finished report to a file path or binary stream.
+
+    fpdf2 builds the whole PDF in memory before it can be written, so large
+    reports should be split into volumes (write_consolidated_report). The
+    document is consumed: its page buffers are dropped once the output is
+    serialized. Files are written under a temporary name and renamed into
+    place, so a reader never sees a partial report. Returns the number of
+    bytes written.
+    """
+    data = pdf.output()
+    pdf.pages.clear()
+    
+    if isinstance(target, (str, os.PathLike)):
+        tmp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    else:
+        target.write(data)
+        target.flush()
+    return len(data)
+
+def spool_report(pdf, prefix="actuator_sizing_report"):
+    """Write a report into REPORT_SPOOL_DIR and return its path (old spooled reports are purged)"""
+    os.makedirs(REPORT_SPOOL_DIR, exist_ok=True)
+    cutoff = time.time() - REPORT_SPOOL_MAX_AGE
+    for entry in os.scandir(REPORT_SPOOL_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+    path = os.path.join(REPORT_SPOOL_DIR, f"{prefix}_{uuid.uuid4().hex}.pdf")
+    write_report(pdf, path)
+    return path
+
+def _summary_entry(result):
+    """The part of a sizing result the summary table needs (only the recommended actuator is kept)"""
+    entry = {key: result[key] for key in ("tag", "valve", "pressure", "temperature", "required_with_sf", "value_type")}
+    entry["actuators"] = result["actuators"][:1]
+    return entry
+
+def write_consolidated_report(results, path, logo_bytes=None, logo_type=None, tags_per_volume=None,
+                              project_info="Prepared by VASTAŞ Engineering Department"):
+    """Write a consolidated report to disk, split into volumes when it is large.
+
+    results may be any iterable of sizing results, e.g. a generator. fpdf2
+    holds a whole document in memory until it is written, so with
+    tags_per_volume the results are taken tags_per_volume at a time and every
+    volume is rendered, written and released before the next one is read.
+    Only the summary row of each tag is kept across volumes; the summary table
+    of all tags is written last, to its own file next to the volumes. Without
+    tags_per_volume (or when everything fits in one volume) a single file is
+    written to path. Returns the list of files written.
+    """
+    results = iter(results)
+    volume_results = list(islice(results, tags_per_volume)) if tags_per_volume else list(results)
+    following = list(islice(results, 1))
+    if not following:
+        pdf = build_consolidated_report(volume_results, logo_bytes, logo_type, project_info)
+        write_report(pdf, path)
+        return [path]
+    
+    stem, ext = os.path.splitext(path)
+    ext = ext or ".pdf"
+    summary = []
+    paths = []
+    while volume_results:
+        pdf = build_consolidated_report(
+            volume_results, logo_bytes, logo_type, project_info,
+            subtitle=f"Consolidated Report - Volume {len(paths) + 1} - {len(volume_results)} Tags",
+            include_summary=False
+        )
+        volume_path = f"{stem}_vol{len(paths) + 1:03d}{ext}"
+        write_report(pdf, volume_path)
+        del pdf
+        paths.append(volume_path)
+        summary.extend(_summary_entry(result) for result in volume_results)
+        volume_results = following + list(islice(results, tags_per_volume - len(following)))
+        following = []
+    
+    pdf = build_consolidated_report(
+        [], logo_bytes, logo_type, project_info,
+        subtitle=f"Consolidated Report - {len(summary)} Tags in {len(paths)} Volumes - Summary",
+        summary_results=summary
+    )
+    summary_path = f"{stem}_summary{ext}"
+    write_report(pdf, summary_path)
+    return [summary_path] + paths
@@ -0,0 +1,385 @@
+"""Local HTTP/JSON sizing service: python sizing_service.py [--port 8765]
+
+Endpoints (JSON request bodies, one tag record or a batch):
+
+    GET  /health       service status and catalog sizes
+    POST /calculate    torque/thrust requirements (calculate_tag_records)
+    POST /select       sizing and actuator selection (size_tag_records)
+    POST /report       consolidated PDF report (application/pdf)
+
+A body is either one tag record ({"tag": ..., "valve": ..., "pressure": ...,
+"temperature": ...}, see TAG_FIELDS), a list of records, or an object with
+the records under "tags" plus options. Single records get a single result
+object back; batches get {"results": [...]} in input order. Invalid tags are
+reported in their result's "error" field rather than failing the request.
+
+/select options: ranking, candidates (top-ranked actuators listed per tag),
+profiles, max_stroke_time, stroke_direction, monte_carlo (samples), seed and
+uncertainty, all as in sizing_batch. /report options: top_k.
+
+Requests are parsed on one asyncio event loop. The sizing runs on a pool of
+worker processes, each of which loads the catalogs once at start-up and keeps
+them and their lookup indexes resident. Large batches are split into chunks
+that run on several workers at once.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+from sizing_core import (
+    ACTUATOR_DATABASE, RANKING_OBJECTIVES, VALVE_DATABASE, ActuatorCatalog, get_actuator_index, load_catalog_file
+)
+from sizing_uncertainty import resolve_uncertainty
+from sizing_batch import (
+    BATCH_CHUNK_SIZE, calculate_tag_records, finite_json, size_tag_records, sizing_results_for_report
+)
+
+# ========================
+# SERVICE SETTINGS
+# ========================
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+MAX_TAGS_PER_REQUEST = 100_000
+MAX_REPORT_TAGS = 1000
+# Tags per worker task; smaller batches run as a single task
+SERVICE_CHUNK_SIZE = BATCH_CHUNK_SIZE
+# Worker tasks in flight per worker; further requests wait for a slot
+PENDING_TASKS_PER_WORKER = 4
+KEEP_ALIVE_TIMEOUT = 15.0   # s
+
+# Limits on /select options, so one request cannot hold the worker pool indefinitely
+MAX_CANDIDATES = 1000
+MAX_MC_SAMPLES = 1_000_000
+MAX_MC_SAMPLES_PER_REQUEST = 200_000_000
+
+RANKING_MODES = ("capability", "pareto", "weighted")
+STROKE_DIRECTIONS = ("close", "open")
+
+class ServiceError(Exception):
+    """A request the service rejects, with the HTTP status to answer with"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ========================
+# WORKER TASKS
+# ========================
+# Catalogs installed once per worker by _init_service_worker
+_SERVICE_CATALOGS = None
+
+def _init_service_worker(valves, actuators):
+    global _SERVICE_CATALOGS
+    _SERVICE_CATALOGS = (valves, actuators)
+    # Build the lookup index up front rather than inside the first request
+    get_actuator_index(actuators)
+
+def _catalog_sizes():
+    valves, actuators = _SERVICE_CATALOGS
+    return {"valves": len(valves), "actuators": len(get_actuator_index(actuators).catalog)}
+
+def _calculate_task(records):
+    valves, _ = _SERVICE_CATALOGS
+    return calculate_tag_records(records, valves)
+
+def _select_task(records, start, options):
+    valves, actuators = _SERVICE_CATALOGS
+    return list(size_tag_records(records, valves, actuators, start=start, **options))
+
+def _report_task(records, top_k):
+    from sizing_report import build_consolidated_report, write_report
+    valves, actuators = _SERVICE_CATALOGS
+    results = list(sizing_results_for_report(records, valves, actuators, top_k))
+    if not results:
+        raise ValueError("No valid tags to report")
+    buffer = io.BytesIO()
+    write_report(build_consolidated_report(results), buffer)
+    return buffer.getvalue()
+
+# ========================
+# REQUEST PAYLOADS
+# ========================
+def parse_payload(body):
+    """Split a request body into (records, options, batch flag)"""
+    try:
+        payload = json.loads(body or b"null")
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+    if isinstance(payload, list):
+        records, options, batch = payload, {}, True
+    elif isinstance(payload, dict) and "tags" in payload:
+        records = payload["tags"]
+        options = {key: value for key, value in payload.items() if key != "tags"}
+        batch = True
+    elif isinstance(payload, dict):
+        records, options, batch = [payload], {}, False
+    else:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Expected a tag record, a list of tag records or {\"tags\": [...]}")
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Tag records must be JSON objects")
+    if len(records) > MAX_TAGS_PER_REQUEST:
+        raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                           f"At most {MAX_TAGS_PER_REQUEST} tags per request")
+    return records, options, batch
+
+def _positive_int(options, name, maximum):
+    value = options[name]
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or \
+            value != int(value) or not 1 <= value <= maximum:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer from 1 to {maximum}")
+    return int(value)
+
+def selection_options(options, tag_count=1):
+    """size_tag_records keyword arguments from /select request options.
+
+    Every option is validated here, so a bad request is answered with 400
+    before it reaches a worker.
+    """
+    unknown = set(options) - {"ranking", "candidates", "profiles", "max_stroke_time", "stroke_direction",
+                              "monte_carlo", "seed", "uncertainty"}
+    if unknown:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Unknown options: {', '.join(sorted(unknown))}")
+    ranking = options.get("ranking", "capability")
+    if ranking not in RANKING_MODES:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"ranking must be one of {', '.join(RANKING_MODES)}")
+    selection = {"ranking": ranking, "profiles": bool(options.get("profiles", False))}
+    if options.get("candidates") is not None:
+        selection["candidates"] = _positive_int(options, "candidates", MAX_CANDIDATES)
+    if options.get("max_stroke_time") is not None:
+        max_time = options["max_stroke_time"]
+        if isinstance(max_time, bool) or not isinstance(max_time, (int, float)) or not math.isfinite(max_time) or \
+                max_time <= 0:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "max_stroke_time must be a positive, finite number of seconds")
+        direction = options.get("stroke_direction", "close")
+        if direction not in STROKE_DIRECTIONS:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"stroke_direction must be one of {', '.join(STROKE_DIRECTIONS)}")
+        selection["stroke"] = {"max_time": float(max_time), "direction": direction}
+    if options.get("monte_carlo") is not None:
+        samples = _positive_int(options, "monte_carlo", MAX_MC_SAMPLES)
+        if samples * tag_count > MAX_MC_SAMPLES_PER_REQUEST:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"monte_carlo x tags is limited to {MAX_MC_SAMPLES_PER_REQUEST} samples per request")
+        seed = options.get("seed", 0)
+        if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "seed must be a non-negative integer")
+        try:
+            resolve_uncertainty(options.get("uncertainty"))
+        except ValueError as e:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, str(e))
+        selection["monte_carlo"] = {"samples": samples, "seed": seed, "uncertainty": options.get("uncertainty")}
+    return selection
+
+def encode_results(results, batch):
+    payload = {"results": results} if batch else results[0]
+    return json.dumps(finite_json(payload), allow_nan=False).encode()
+
+# ========================
+# SERVICE
+# ========================
+class SizingService:
+    """Routes requests to worker tasks; one instance per server"""
+    def __init__(self, workers=None, valves=None, actuators=None, chunk_size=SERVICE_CHUNK_SIZE):
+        if valves is None:
+            valves = VALVE_DATABASE
+        if actuators is None:
+            actuators = ACTUATOR_DATABASE
+        self.chunk_size = chunk_size
+        if workers == 0:
+            # In-process: a single thread sharing the server's catalogs (lowest latency for small requests)
+            _init_service_worker(valves, actuators)
+            self.workers = 1
+            self.pool = ThreadPoolExecutor(max_workers=1)
+        else:
+            self.workers = workers or os.cpu_count() or 1
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_service_worker,
+                                            initargs=(valves, actuators))
+        self.slots = asyncio.Semaphore(self.workers * PENDING_TASKS_PER_WORKER)
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("POST", "/calculate"): self.calculate,
+            ("POST", "/select"): self.select,
+            ("POST", "/report"): self.report
+        }
+
+    async def run(self, function, *args):
+        async with self.slots:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, function, *args)
+
+    async def start_workers(self):
+        """Start every worker and load its catalogs before the first request"""
+        await asyncio.gather(*(self.run(_catalog_sizes) for _ in range(self.workers)))
+
+    def _chunks(self, records):
+        return [(records[start:start + self.chunk_size], start) for start in range(0, len(records), self.chunk_size)]
+
+    async def handle(self, method, path, body):
+        """Answer one request; returns (status, content type, body bytes)"""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise ServiceError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported on {path}")
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"No endpoint {path}")
+        return await handler(body)
+
+    async def health(self, body):
+        sizes = await self.run(_catalog_sizes)
+        status = {"status": "ok", "workers": self.workers, "valves": sizes["valves"], "actuators": sizes["actuators"],
+                  "ranking_objectives": list(RANKING_OBJECTIVES)}
+        return HTTPStatus.OK, "application/json", json.dumps(status).encode()
+
+    async def calculate(self, body):
+        records, options, batch = parse_payload(body)
+        if options:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Unknown options: {', '.join(sorted(options))}")
+        parts = await asyncio.gather(*(self.run(_calculate_task, chunk) for chunk, _ in self._chunks(records)))
+        results = [result for part in parts for result in part]
+        return HTTPStatus.OK, "application/json", encode_results(results, batch)
+
+    async def select(self, body):
+        records, options, batch = parse_payload(body)
+        selection = selection_options(options, len(records))
+        parts = await asyncio.gather(*(self.run(_select_task, chunk, start, selection)
+                                       for chunk, start in self._chunks(records)))
+        results = [result for part in parts for result in part]
+        return HTTPStatus.OK, "application/json", encode_results(results, batch)
+
+    async def report(self, body):
+        records, options, _ = parse_payload(body)
+        unknown = set(options) - {"top_k"}
+        if unknown:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Unknown options: {', '.join(sorted(unknown))}")
+        if len(records) > MAX_REPORT_TAGS:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"At most {MAX_REPORT_TAGS} tags per report")
+        top_k = None if options.get("top_k") is None else _positive_int(options, "top_k", MAX_CANDIDATES)
+        try:
+            pdf = await self.run(_report_task, records, top_k)
+        except ValueError as e:
+            raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        return HTTPStatus.OK, "application/pdf", pdf
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+# ========================
+# HTTP/1.1
+# ========================
+async def read_request(reader):
+    """Next request on a connection as (method, path, headers, body); None once the client is done"""
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None
+    if not request_line.strip():
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            # StreamReader's line limit
+            raise ServiceError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Request header line too long")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise ServiceError(HTTPStatus.LENGTH_REQUIRED, "Chunked request bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request bodies are limited to {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b""
+    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+    return method, target.split("?", 1)[0], keep_alive, body
+
+def format_response(status, content_type, body, keep_alive):
+    head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+def _error_body(message):
+    return json.dumps({"error": message}).encode()
+
+async def serve_connection(service, reader, writer):
+    """Answer requests on one connection until it closes (keep-alive, one request at a time)"""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, keep_alive, body = request
+                status, content_type, payload = await service.handle(method, path, body)
+            except ServiceError as e:
+                status, content_type, payload = e.status, "application/json", _error_body(str(e))
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            except Exception as e:
+                status, content_type, payload = (HTTPStatus.INTERNAL_SERVER_ERROR, "application/json",
+                                                 _error_body(f"{type(e).__name__}: {e}"))
+            writer.write(format_response(status, content_type, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, actuators=None, chunk_size=SERVICE_CHUNK_SIZE):
+    service = SizingService(workers, actuators=actuators, chunk_size=chunk_size)
+    try:
+        await service.start_workers()
+        server = await asyncio.start_server(lambda reader, writer: serve_connection(service, reader, writer),
+                                            host, port)
+        addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+        print(f"Sizing service on {addresses} with {service.workers} workers", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def service_cli(argv=None):
+    """Command-line entry point: python sizing_service.py [--host HOST] [--port PORT]"""
+    parser = argparse.ArgumentParser(
+        prog="sizing_service.py",
+        description="Serve valve actuator sizing over HTTP/JSON (/calculate, /select, /report, /health)."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("-j", "--workers", type=int,
+                        help="Worker processes (default: one per CPU; 0 sizes in the server process)")
+    parser.add_argument("--actuators", help="Actuator catalog (.csv or binary catalog file) instead of the built-in one")
+    parser.add_argument("--chunk-size", type=int, default=SERVICE_CHUNK_SIZE,
+                        help="Tags per worker task when a batch is split across workers")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 0:
+        parser.error("--workers must be 0 (size in the server process) or a positive number of processes")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    actuators = load_catalog_file(args.actuators, ActuatorCatalog) if args.actuators else None
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, actuators, args.chunk_size))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(service_cli())
@@ -0,0 +1,170 @@
+"""SQLite-backed valve and actuator catalog store.
+
+Catalogs too large to hold in every process live in one SQLite file that
+any number of processes read concurrently (the database runs in WAL mode).
+Actuator selection is pushed down to the database: motion type, supply,
+the valve's pressure and temperature limits, the safety-factor threshold and
+the capability ordering become a single query served by partial indexes,
+and only the matching rows are materialized as a catalog.
+"""
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from sizing_core import ActuatorCatalog, ActuatorIndex, ValveCatalog
+
+# ========================
+# SCHEMA
+# ========================
+SQL_TYPES = {"numeric": "REAL", "category": "TEXT", "text": "TEXT"}
+
+# (table, catalog class, index definitions)
+STORE_TABLES = {
+    "valves": (ValveCatalog, (
+        "CREATE INDEX IF NOT EXISTS ix_valves_type ON valves(type)",
+    )),
+    "actuators": (ActuatorCatalog, (
+        # Partial indexes stand in for the motion type: a torque (thrust) query
+        # range-scans the actuators with nonzero torque (thrust) in capability
+        # order, which is also the order the results are returned in
+        "CREATE INDEX IF NOT EXISTS ix_actuators_torque ON actuators(torque) WHERE torque != 0",
+        "CREATE INDEX IF NOT EXISTS ix_actuators_thrust ON actuators(thrust) WHERE thrust != 0",
+        "CREATE INDEX IF NOT EXISTS ix_actuators_supply_torque ON actuators(supply, torque) WHERE torque != 0",
+        "CREATE INDEX IF NOT EXISTS ix_actuators_supply_thrust ON actuators(supply, thrust) WHERE thrust != 0",
+        "CREATE INDEX IF NOT EXISTS ix_actuators_max_pressure ON actuators(max_pressure)",
+        "CREATE INDEX IF NOT EXISTS ix_actuators_temperature ON actuators(min_temp, max_temp)"
+    ))
+}
+
+def _table_for(catalog):
+    for table, (catalog_class, _) in STORE_TABLES.items():
+        if isinstance(catalog, catalog_class):
+            return table
+    raise TypeError(f"Cannot store a {type(catalog).__name__}")
+
+# ========================
+# CATALOG STORE
+# ========================
+class SQLiteCatalogStore:
+    """Valve and actuator catalogs in a SQLite file.
+
+    Rows keep their catalog position as the primary key, so ties in
+    capability are broken in catalog order exactly like ActuatorIndex.
+    Connections are opened per thread; the store pickles as its path.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._local = threading.local()
+        self._index = None
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def connection(self):
+        """This thread's connection to the store"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def write_catalog(self, catalog):
+        """Replace the valves or actuators table with the rows of a catalog"""
+        table = _table_for(catalog)
+        catalog_class, indexes = STORE_TABLES[table]
+        names = [name for name, _, _ in catalog_class.FIELDS]
+        columns = ", ".join(f"{name} {SQL_TYPES[kind]} NOT NULL" for name, kind, _ in catalog_class.FIELDS)
+        # Decode categorical codes once per column rather than once per row
+        values = [catalog.labels(name).tolist() if kind == "category" else catalog.columns[name].tolist()
+                  for name, kind, _ in catalog_class.FIELDS]
+
+        conn = self.connection()
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, {columns})")
+            conn.executemany(f"INSERT INTO {table} VALUES (?, {', '.join('?' * len(names))})",
+                             zip(range(len(catalog)), *values))
+            for statement in indexes:
+                conn.execute(statement)
+        conn.execute("ANALYZE")
+
+    def _read(self, catalog_class, table, where="", params=(), order_by="id", limit=None):
+        names = [name for name, _, _ in catalog_class.FIELDS]
+        sql = f"SELECT {', '.join(names)} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return catalog_class.from_records(self.connection().execute(sql, params))
+
+    def valve_catalog(self):
+        """All stored valves as a ValveCatalog"""
+        return self._read(ValveCatalog, "valves")
+
+    def actuator_catalog(self, value_type=None, supply_type=None, max_pressure=None, min_temp=None, max_temp=None):
+        """Stored actuators as an ActuatorCatalog, in catalog order.
+
+        Any filter given is applied in the database with the same meaning as
+        in find_suitable_actuators, so e.g. an operating envelope for one
+        valve only loads the actuators that valve could use.
+        """
+        where, params = _actuator_filters(value_type, supply_type, max_pressure, min_temp, max_temp)
+        return self._read(ActuatorCatalog, "actuators", " AND ".join(where), params)
+
+    def actuator_index(self):
+        """ActuatorIndex that answers find_suitable_actuators queries with indexed SQL"""
+        if self._index is None:
+            self._index = SQLiteActuatorIndex(self)
+        return self._index
+
+def _actuator_filters(value_type, supply_type, max_pressure, min_temp, max_temp):
+    where = []
+    params = []
+    if value_type in ("Torque (Nm)", "Thrust (N)"):
+        # Skip actuators that don't match the required motion type
+        where.append(f"{'torque' if value_type == 'Torque (Nm)' else 'thrust'} != 0")
+    if supply_type and supply_type != "Any":
+        where.append("supply = ?")
+        params.append(supply_type)
+    for clause, value in (("max_pressure >= ?", max_pressure), ("min_temp <= ?", min_temp),
+                          ("max_temp >= ?", max_temp)):
+        if value is not None:
+            where.append(clause)
+            params.append(float(value))
+    return where, params
+
+class SQLiteActuatorIndex(ActuatorIndex):
+    """ActuatorIndex over a SQLiteCatalogStore.
+
+    select() runs one indexed query and returns a catalog holding only the
+    matching actuators. The partition-based bulk paths (batch selection,
+    operating envelopes) need the actuators in memory; load them with
+    SQLiteCatalogStore.actuator_catalog().
+    """
+    def __init__(self, store):
+        super().__init__(None)
+        self.store = store
+
+    def partition(self, value_type, supply_type=None):
+        raise TypeError("Bulk selection needs an in-memory catalog; use SQLiteCatalogStore.actuator_catalog()")
+
+    def select(self, required_capability, value_type, max_pressure, min_temp, max_temp, supply_type=None,
+               limit=None):
+        capability = "torque" if value_type == "Torque (Nm)" else "thrust"
+        where, params = _actuator_filters(value_type, supply_type, max_pressure, min_temp, max_temp)
+        where.insert(0, f"{capability} >= ?")
+        params.insert(0, float(required_capability))
+        catalog = self.store._read(ActuatorCatalog, "actuators", " AND ".join(where), params,
+                                   order_by=f"{capability}, id", limit=limit)
+        return catalog, np.arange(len(catalog))
+
+    def query(self, required_capability, value_type, max_pressure, min_temp, max_temp, supply_type=None,
+              limit=None):
+        raise TypeError("SQLiteActuatorIndex has no catalog rows to return; use select()")
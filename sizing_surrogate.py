@@ -0,0 +1,270 @@
+"""Spline surrogate tables for the valve torque/thrust correlations.
+
+For every valve in a catalog the requirement is tabulated over a pressure x
+temperature grid spanning the valve's rated envelope. At each temperature
+node a cubic spline is fitted along pressure; between temperature nodes the
+two neighbouring splines are blended linearly. Queries and curve rendering
+are then a table lookup plus a cubic polynomial, however expensive the
+underlying correlation is.
+
+Temperature nodes include the model's breakpoints (by default the derating
+onsets in TEMPERATURE_DERATING_ONSET), so kinks never fall inside a cell.
+
+Error estimate: after fitting, the surrogate is compared with the exact
+model at SURROGATE_ERROR_SAMPLES evenly spaced points per pressure and
+temperature cell. The largest absolute deviation is widened by
+SURROGATE_ERROR_MARGIN, because the true maximum can sit between the
+samples, and is never taken below a few ULPs of the valve's largest value,
+the level at which floating-point rounding alone differs. The result is
+stored per valve in `SurrogateTable.error_estimate`, in the valve's own unit
+(Nm or N). It is an estimate, not a guaranteed bound: a model with sharper
+features than the sampling resolves can exceed it. Points outside a valve's
+rated envelope are always computed with the exact model.
+"""
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from sizing_core import (
+    MOTION_TYPES, TEMPERATURE_DERATING_ONSET, VALVE_DATABASE, ValveCatalog, cache_path, calculate_valve_torque_thrust_batch
+)
+
+# ========================
+# SURROGATE TABLES
+# ========================
+SURROGATE_PRESSURE_NODES = 33
+SURROGATE_TEMPERATURE_NODES = 17
+SURROGATE_TEMPERATURE_BREAKPOINTS = tuple(sorted(set(TEMPERATURE_DERATING_ONSET.values())))
+SURROGATE_ERROR_SAMPLES = 4     # per cell and direction, including the cell's first node
+SURROGATE_ERROR_MARGIN = 1.5
+SURROGATE_ERROR_ULPS = 8
+# Sample points compared per pass when measuring the error (bounds the temporaries)
+SURROGATE_ERROR_BLOCK_POINTS = 1 << 18
+
+# Bump when the file layout changes; model changes are picked up from the model's source file
+SURROGATE_FORMAT = 3
+
+def _catalog_digest(catalog):
+    digest = hashlib.sha256()
+    for name, column in sorted(catalog.columns.items()):
+        digest.update(name.encode())
+        digest.update(column.dtype.str.encode())
+        digest.update(column.tobytes())
+    digest.update(json.dumps(catalog.categories, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def _model_digest(model):
+    digest = hashlib.sha256(f"{model.__module__}.{model.__qualname__}".encode())
+    try:
+        with open(inspect.getsourcefile(model), "rb") as f:
+            digest.update(f.read())
+    except (OSError, TypeError):
+        pass
+    return digest.hexdigest()
+
+def _node_grid(low, high, count):
+    """Uniform node grids (one row per valve) and their steps; a zero-width range gets step 1"""
+    span = high - low
+    step = np.where(span > 0, span / (count - 1), 1.0)
+    nodes = low[:, None] + np.arange(count) * step[:, None]
+    nodes[:, -1] = np.where(span > 0, high, low)
+    return nodes, step
+
+def _temperature_nodes(low, high, count, breakpoints):
+    """Per-valve temperature nodes: a uniform grid plus the breakpoints inside the range.
+
+    Every row gets count + len(breakpoints) strictly increasing nodes (the
+    widest cells are split to pad rows with fewer breakpoints in range); a
+    zero-width range repeats its single temperature.
+    """
+    total = count + len(breakpoints)
+    rows = []
+    for lo, hi in zip(low.tolist(), high.tolist()):
+        if hi <= lo:
+            rows.append(np.full(total, lo))
+            continue
+        nodes = np.union1d(np.linspace(lo, hi, count), [b for b in breakpoints if lo < b < hi])
+        while len(nodes) < total:
+            widest = int(np.argmax(np.diff(nodes)))
+            nodes = np.insert(nodes, widest + 1, 0.5 * (nodes[widest] + nodes[widest + 1]))
+        rows.append(nodes)
+    return np.array(rows, dtype=float).reshape(len(low), total)
+
+class SurrogateTable:
+    """Per-valve spline tables over the rated pressure x temperature envelope.
+
+    `model` has the signature of calculate_valve_torque_thrust_batch and is
+    what the table approximates (and falls back to outside the envelope).
+    """
+    ARRAYS = ("pressure_min", "pressure_max", "pressure_step", "temperature_nodes",
+              "coefficients", "motion_code", "error_estimate")
+
+    def __init__(self, valves, model, arrays):
+        self.valves = valves
+        self.model = model
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.temperature_min = self.temperature_nodes[:, 0]
+        self.temperature_max = self.temperature_nodes[:, -1]
+
+    @classmethod
+    def build(cls, valves, model=calculate_valve_torque_thrust_batch,
+              pressure_nodes=SURROGATE_PRESSURE_NODES, temperature_nodes=SURROGATE_TEMPERATURE_NODES,
+              temperature_breakpoints=SURROGATE_TEMPERATURE_BREAKPOINTS):
+        """Tabulate the model, fit the splines and estimate the interpolation error"""
+        if pressure_nodes < 4 or temperature_nodes < 2:
+            raise ValueError("Surrogate tables need at least 4 pressure and 2 temperature nodes")
+        columns = valves.columns
+        pressure_min = columns["min_pressure"].astype(float)
+        pressure_max = columns["max_pressure"].astype(float)
+        pressure_grid, pressure_step = _node_grid(pressure_min, pressure_max, pressure_nodes)
+        temperature_grid = _temperature_nodes(columns["min_temp"].astype(float), columns["max_temp"].astype(float),
+                                              temperature_nodes, temperature_breakpoints)
+
+        # One model call for the whole catalog: (valve, temperature node, pressure node)
+        valve_idx = np.arange(len(valves))[:, None, None]
+        values, labels = model(pressure_grid[:, None, :], temperature_grid[:, :, None], valve_idx, valves)
+        motion_code = np.array([MOTION_TYPES.index(label) for label in labels[:, 0, 0]], dtype=np.int8)
+
+        # Spline coefficients, highest power first, per (valve, temperature node, pressure interval)
+        coefficients = np.empty((len(valves), temperature_grid.shape[1], pressure_nodes - 1, 4))
+        for row in range(len(valves)):
+            if pressure_max[row] > pressure_min[row]:
+                spline = CubicSpline(pressure_grid[row], values[row], axis=1)
+                coefficients[row] = spline.c.transpose(2, 1, 0)
+            else:
+                # Zero-width pressure range: a constant per temperature node
+                coefficients[row] = 0.0
+                coefficients[row, :, :, 3] = values[row, :, :1]
+
+        table = cls(valves, model, {
+            "pressure_min": pressure_min, "pressure_max": pressure_max, "pressure_step": pressure_step,
+            "temperature_nodes": temperature_grid, "coefficients": coefficients,
+            "motion_code": motion_code, "error_estimate": np.zeros(len(valves))
+        })
+        table.error_estimate = table._measure_error()
+        return table
+
+    def _measure_error(self):
+        samples = SURROGATE_ERROR_SAMPLES
+        pressure_grid, _ = _node_grid(self.pressure_min, self.pressure_max, samples * self.coefficients.shape[2] + 1)
+        # Evenly spaced points in every temperature cell (the cells are not uniform)
+        nodes = self.temperature_nodes
+        fractions = np.arange(samples) / samples
+        temperature_grid = np.concatenate([
+            (nodes[:, :-1, None] + (nodes[:, 1:] - nodes[:, :-1])[:, :, None] * fractions).reshape(len(nodes), -1),
+            nodes[:, -1:]
+        ], axis=1)
+        per_valve = pressure_grid.shape[1] * temperature_grid.shape[1]
+        block = max(1, SURROGATE_ERROR_BLOCK_POINTS // per_valve)
+
+        estimate = np.zeros(len(self.valves))
+        for start in range(0, len(self.valves), block):
+            rows = np.arange(start, min(start + block, len(self.valves)))
+            pressure, temperature, valve_idx = np.broadcast_arrays(
+                pressure_grid[rows, None, :], temperature_grid[rows, :, None], rows[:, None, None])
+            exact, _ = self.model(pressure, temperature, valve_idx, self.valves)
+            approx = self._interpolate(pressure, temperature, valve_idx)
+            deviation = np.abs(approx - exact).reshape(len(rows), -1).max(axis=1, initial=0.0)
+            rounding = SURROGATE_ERROR_ULPS * np.finfo(float).eps * np.abs(exact).reshape(len(rows), -1).max(
+                axis=1, initial=0.0)
+            estimate[rows] = np.maximum(deviation * SURROGATE_ERROR_MARGIN, rounding)
+        return estimate
+
+    def _interpolate(self, pressure, temperature, valve_idx):
+        n_pressure = self.coefficients.shape[2] + 1
+        n_temperature = self.coefficients.shape[1]
+        p0 = self.pressure_min[valve_idx]
+        dp = self.pressure_step[valve_idx]
+        i = np.clip(np.floor((pressure - p0) / dp).astype(np.intp), 0, n_pressure - 2)
+        dx = pressure - (p0 + i * dp)
+        nodes = self.temperature_nodes[valve_idx]
+        j = np.clip((nodes <= temperature[..., None]).sum(axis=-1) - 1, 0, n_temperature - 2)
+        t0 = np.take_along_axis(nodes, j[..., None], axis=-1)[..., 0]
+        t1 = np.take_along_axis(nodes, j[..., None] + 1, axis=-1)[..., 0]
+        weight = (temperature - t0) / np.where(t1 > t0, t1 - t0, 1.0)
+
+        def spline_at(node):
+            c = self.coefficients[valve_idx, node, i]
+            return ((c[..., 0] * dx + c[..., 1]) * dx + c[..., 2]) * dx + c[..., 3]
+
+        return (1.0 - weight) * spline_at(j) + weight * spline_at(j + 1)
+
+    def evaluate(self, pressures_bar, temperatures_c, valve_indices):
+        """Surrogate counterpart of calculate_valve_torque_thrust_batch (same arguments and outputs).
+
+        Points inside a valve's rated envelope are interpolated, typically
+        to within error_estimate[valve] of the exact model; the rest are exact.
+        """
+        pressure, temperature, valve_idx = np.broadcast_arrays(
+            np.asarray(pressures_bar, dtype=float),
+            np.asarray(temperatures_c, dtype=float),
+            np.asarray(valve_indices, dtype=np.intp)
+        )
+        inside = ((pressure >= self.pressure_min[valve_idx]) & (pressure <= self.pressure_max[valve_idx]) &
+                  (temperature >= self.temperature_min[valve_idx]) & (temperature <= self.temperature_max[valve_idx]))
+        values = np.empty(pressure.shape, dtype=float)
+        values[inside] = self._interpolate(pressure[inside], temperature[inside], valve_idx[inside])
+        if not inside.all():
+            outside = ~inside
+            values[outside], _ = self.model(pressure[outside], temperature[outside], valve_idx[outside], self.valves)
+        return values, np.array(MOTION_TYPES, dtype=object)[self.motion_code[valve_idx]]
+
+    # ------------------------
+    # Persistence
+    # ------------------------
+    @staticmethod
+    def cache_file(valves, model, pressure_nodes, temperature_nodes, temperature_breakpoints):
+        key = hashlib.sha256(
+            f"{SURROGATE_FORMAT}:{_catalog_digest(valves)}:{_model_digest(model)}:"
+            f"{pressure_nodes}:{temperature_nodes}:{list(temperature_breakpoints)}".encode()
+        ).hexdigest()
+        return cache_path("surrogates", f"{key}.npz")
+
+    def save(self, path):
+        tmp_file = f"{path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez_compressed(tmp_file, **{name: getattr(self, name) for name in self.ARRAYS})
+            os.replace(tmp_file, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path, valves, model):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in cls.ARRAYS}
+        if arrays["coefficients"].shape[0] != len(valves):
+            raise ValueError("Surrogate table does not match the catalog")
+        return cls(valves, model, arrays)
+
+def _load_or_build_surrogate(valves, model, pressure_nodes, temperature_nodes, temperature_breakpoints):
+    path = SurrogateTable.cache_file(valves, model, pressure_nodes, temperature_nodes, temperature_breakpoints)
+    try:
+        return SurrogateTable.load(path, valves, model)
+    except (OSError, KeyError, ValueError):
+        table = SurrogateTable.build(valves, model, pressure_nodes, temperature_nodes, temperature_breakpoints)
+        table.save(path)
+        return table
+
+def get_surrogate(valves=None, model=calculate_valve_torque_thrust_batch,
+                  pressure_nodes=SURROGATE_PRESSURE_NODES, temperature_nodes=SURROGATE_TEMPERATURE_NODES,
+                  temperature_breakpoints=SURROGATE_TEMPERATURE_BREAKPOINTS):
+    """Surrogate table of a valve catalog (VALVE_DATABASE by default).
+
+    Built once per process and catalog, and persisted under CACHE_DIR keyed
+    by the catalog contents, the model's source and the grid layout.
+    """
+    temperature_breakpoints = tuple(temperature_breakpoints)
+    if valves is None:
+        valves = VALVE_DATABASE
+    if not isinstance(valves, ValveCatalog):
+        valves = ValveCatalog.from_views(valves)
+    return valves.derived(
+        ("surrogate", model, pressure_nodes, temperature_nodes, temperature_breakpoints),
+        lambda catalog: _load_or_build_surrogate(catalog, model, pressure_nodes, temperature_nodes,
+                                                 temperature_breakpoints)
+    )
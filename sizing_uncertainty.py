@@ -0,0 +1,221 @@
+"""Monte Carlo uncertainty sizing.
+
+The deterministic sizing multiplies a single requirement by a fixed safety
+factor. This mode samples the operating pressure and temperature, the seal
+friction and seat material factors, the slope of the temperature derating
+and an overall model factor on the empirical correlations. It runs the
+vectorized torque/thrust kernels on every sample and reports requirement
+percentiles plus the probability that each candidate actuator is undersized
+(its capability falls below the sampled requirement).
+
+Samples are drawn and evaluated in chunks of MC_CHUNK_SIZE, so memory per
+tag is one float per sample whatever the number of inputs. Every (tag
+position, chunk, input) triple draws from its own stream derived from the
+seed. A run is therefore reproducible for a given seed and chunk size in any
+worker count or processing order. Changing the distribution of one input
+leaves the draws of all the others unchanged.
+"""
+import math
+
+import numpy as np
+
+from sizing_core import (
+    BALL_SEAT_FACTORS, BUTTERFLY_SEAT_FACTORS, VALVE_DATABASE, calculate_valve_torque_thrust,
+    calculate_valve_torque_thrust_batch, size_valve
+)
+from sizing_fluids import fluid_dynamic_terms
+
+# ========================
+# INPUT DISTRIBUTIONS
+# ========================
+MC_SAMPLES = 100_000
+MC_CHUNK_SIZE = 2**16
+MC_PERCENTILES = (5, 50, 95, 99)
+
+# Uncertain inputs, in stream order. Each takes a distribution spec:
+#   None                               fixed at the nominal value
+#   a number                           fixed at that value
+#   ("normal", sd)                     nominal + sd * N(0, 1)
+#   ("relative_normal", rsd)           nominal * (1 + rsd * N(0, 1))
+#   ("lognormal", sigma)               nominal * exp(sigma * N(0, 1)), median at nominal
+#   ("uniform", low, high)             absolute bounds
+#   ("triangular", low, mode, high)    absolute bounds
+# Nominal values: the duty point for pressure and temperature, the valve's
+# material coefficients for seal_friction and seat_factor, 1.0 for the
+# derating slope multiplier and the model factor.
+UNCERTAINTY_INPUTS = ("pressure", "temperature", "seal_friction", "seat_factor", "derating", "model")
+
+DEFAULT_UNCERTAINTY = {
+    "pressure": ("relative_normal", 0.05),
+    "temperature": ("normal", 5.0),
+    "seal_friction": ("relative_normal", 0.2),
+    "seat_factor": ("relative_normal", 0.1),
+    "derating": ("triangular", 0.8, 1.0, 1.3),
+    "model": ("lognormal", 0.1)
+}
+
+# Physically non-negative inputs; samples below zero are clipped to zero
+NONNEGATIVE_INPUTS = ("pressure", "seal_friction", "seat_factor", "derating", "model")
+
+# Number of parameters of each distribution kind
+DISTRIBUTION_PARAMETERS = {
+    "normal": 1,
+    "relative_normal": 1,
+    "lognormal": 1,
+    "uniform": 2,
+    "triangular": 3
+}
+
+def _check_spec(name, spec):
+    if spec is None or (isinstance(spec, (int, float)) and not isinstance(spec, bool) and math.isfinite(spec)):
+        return
+    if not isinstance(spec, tuple) or not spec or spec[0] not in DISTRIBUTION_PARAMETERS:
+        raise ValueError(f"Invalid distribution for {name}: {spec!r} "
+                         f"(expected None, a number or one of {', '.join(DISTRIBUTION_PARAMETERS)} with parameters)")
+    kind, *params = spec
+    if len(params) != DISTRIBUTION_PARAMETERS[kind]:
+        raise ValueError(f"{kind} distribution for {name} takes {DISTRIBUTION_PARAMETERS[kind]} parameter(s), "
+                         f"got {len(params)}")
+    if not all(isinstance(p, (int, float)) and not isinstance(p, bool) and math.isfinite(p) for p in params):
+        raise ValueError(f"Distribution parameters for {name} must be finite numbers: {params!r}")
+    if kind in ("normal", "relative_normal", "lognormal") and params[0] < 0:
+        raise ValueError(f"Spread of the {kind} distribution for {name} must not be negative")
+    if kind == "uniform" and not params[0] <= params[1]:
+        raise ValueError(f"Uniform distribution for {name} needs low <= high")
+    if kind == "triangular" and not (params[0] <= params[1] <= params[2] and params[0] < params[2]):
+        raise ValueError(f"Triangular distribution for {name} needs low <= mode <= high and low < high")
+
+def resolve_uncertainty(uncertainty=None):
+    """DEFAULT_UNCERTAINTY updated with the given specs (lists are accepted for tuples, as read from JSON).
+
+    Raises ValueError for unknown inputs and malformed distribution specs.
+    """
+    if uncertainty is not None and not isinstance(uncertainty, dict):
+        raise ValueError("Uncertainty must map input names to distribution specs")
+    specs = dict(DEFAULT_UNCERTAINTY)
+    for name, spec in (uncertainty or {}).items():
+        if name not in UNCERTAINTY_INPUTS:
+            raise ValueError(f"Unknown uncertain input: {name!r}")
+        spec = tuple(spec) if isinstance(spec, list) else spec
+        _check_spec(name, spec)
+        specs[name] = spec
+    return specs
+
+def sample_input(spec, nominal, size, rng):
+    """`size` draws of one input; fixed inputs come back as a plain float"""
+    if spec is None:
+        return float(nominal)
+    if isinstance(spec, (int, float)):
+        return float(spec)
+    kind, *params = spec
+    if kind == "normal":
+        return nominal + params[0] * rng.standard_normal(size)
+    if kind == "relative_normal":
+        return nominal * (1.0 + params[0] * rng.standard_normal(size))
+    if kind == "lognormal":
+        return nominal * np.exp(params[0] * rng.standard_normal(size))
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1], size)
+    if kind == "triangular":
+        return rng.triangular(params[0], params[1], params[2], size)
+    raise ValueError(f"Unknown distribution: {kind!r}")
+
+def _stream(seed, position, chunk, input_index):
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(position, chunk, input_index)))
+
+def _nominal_inputs(valve, pressure_bar, temperature_c):
+    if valve.type in ("Ball", "Plug"):
+        seat_factor = BALL_SEAT_FACTORS.get(valve.seat_material, 1.0)
+    else:
+        seat_factor = BUTTERFLY_SEAT_FACTORS.get(valve.seat_material, 1.0)
+    return {
+        "pressure": pressure_bar,
+        "temperature": temperature_c,
+        "seal_friction": valve.get_seal_friction(),
+        "seat_factor": seat_factor,
+        "derating": 1.0,
+        "model": 1.0
+    }
+
+# ========================
+# SAMPLING
+# ========================
+def sample_requirements(valve_index, pressure_bar, temperature_c, uncertainty=None, samples=MC_SAMPLES, seed=0,
+                        position=0, valves=None, chunk_size=MC_CHUNK_SIZE, fluid=None):
+    """Sampled torque/thrust requirements (without safety factor) of one duty point.
+
+    position keys the random streams (e.g. the tag's row in a project), so
+    every tag of a run draws independently from the same seed. With a
+    process fluid, its dynamic term is evaluated at every sampled state.
+    Returns (requirements array of length samples, value type).
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    specs = resolve_uncertainty(uncertainty)
+    valve = valves[valve_index]
+    nominal = _nominal_inputs(valve, pressure_bar, temperature_c)
+    value_type = calculate_valve_torque_thrust(valve, pressure_bar, temperature_c)[1]
+
+    requirements = np.empty(samples)
+    for chunk, start in enumerate(range(0, samples, chunk_size)):
+        size = min(chunk_size, samples - start)
+        drawn = {}
+        for input_index, name in enumerate(UNCERTAINTY_INPUTS):
+            spec = specs[name]
+            rng = None if spec is None or isinstance(spec, (int, float)) else _stream(seed, position, chunk, input_index)
+            value = sample_input(spec, nominal[name], size, rng)
+            if name in NONNEGATIVE_INPUTS:
+                value = np.maximum(value, 0.0)
+            drawn[name] = value
+        values, _ = calculate_valve_torque_thrust_batch(
+            drawn["pressure"], drawn["temperature"], valve_index, valves,
+            seal_friction=drawn["seal_friction"], seat_factor=drawn["seat_factor"], derating=drawn["derating"])
+        if fluid:
+            values = values + fluid_dynamic_terms(drawn["pressure"], drawn["temperature"], valve_index, fluid,
+                                                  valves)[0]
+        requirements[start:start + size] = values * drawn["model"]
+    return requirements, value_type
+
+def undersize_probabilities(sorted_requirements, capabilities):
+    """Share of the (sorted) sampled requirements that exceed each capability"""
+    exceeded = np.searchsorted(sorted_requirements, np.asarray(capabilities, dtype=float), side="right")
+    return 1.0 - exceeded / len(sorted_requirements)
+
+def required_for_probability(sorted_requirements, probability):
+    """Smallest capability whose undersize probability is at most `probability`"""
+    return float(np.quantile(sorted_requirements, 1.0 - probability, method="inverted_cdf"))
+
+def summarize_requirements(sorted_requirements, percentiles=MC_PERCENTILES):
+    """Mean, standard deviation and percentiles (dict keyed by percentile) of sampled requirements"""
+    return {
+        "mean": float(sorted_requirements.mean()),
+        "std": float(sorted_requirements.std()),
+        "percentiles": dict(zip(percentiles, np.percentile(sorted_requirements, percentiles).tolist()))
+    }
+
+# ========================
+# UNCERTAINTY SIZING
+# ========================
+def uncertainty_sizing(valve_index, pressure_bar, temperature_c, safety_factor="Standard", supply_type="Any", tag="",
+                       uncertainty=None, samples=MC_SAMPLES, seed=0, position=0, valves=None, actuators=None,
+                       top_k=None, percentiles=MC_PERCENTILES, fluid=None):
+    """size_valve plus a Monte Carlo view of the requirement.
+
+    The result gains "uncertainty" (samples, seed and summarize_requirements
+    output). Each actuator entry gains "p_undersized", the probability that
+    the sampled requirement exceeds its capability. The candidates
+    themselves are still those that meet the safety-factored nominal
+    requirement.
+    """
+    if valves is None:
+        valves = VALVE_DATABASE
+    result = size_valve(valves[valve_index], pressure_bar, temperature_c, safety_factor, supply_type, tag,
+                        actuators, top_k, fluid)
+    requirements, _ = sample_requirements(valve_index, pressure_bar, temperature_c, uncertainty, samples, seed,
+                                          position, valves, fluid=fluid)
+    requirements.sort()
+    result["uncertainty"] = dict(summarize_requirements(requirements, percentiles), samples=samples, seed=seed)
+    probabilities = undersize_probabilities(requirements, [entry["capability"] for entry in result["actuators"]])
+    result["actuators"] = [dict(entry, p_undersized=float(probability))
+                           for entry, probability in zip(result["actuators"], probabilities.tolist())]
+    return result
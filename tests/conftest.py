@@ -0,0 +1,56 @@
+"""Shared fixtures: a seeded synthetic actuator catalog and duty points over the built-in valves"""
+import numpy as np
+import pytest
+
+from sizing_core import SAFETY_FACTORS, VALVE_DATABASE, ActuatorCatalog
+
+SUPPLY_TYPES = ("Pneumatic", "Electric", "Hydraulic")
+
+def random_actuator_catalog(count, seed=0):
+    """Catalog of `count` rotary and linear actuators with many ties in capability, limits and price"""
+    rng = np.random.default_rng(seed)
+    rotary = rng.random(count) < 0.5
+    capability = rng.integers(1, 400, count) * 50.0
+    records = []
+    for row in range(count):
+        records.append((
+            f"A-{row}", f"Maker {row % 7}",
+            capability[row] if rotary[row] else 0.0,
+            0.0 if rotary[row] else capability[row] * 10,
+            float(rng.choice([100, 150, 200])),
+            float(rng.choice([-50, -40, -30, -20])),
+            float(rng.choice([100, 120, 150, 200, 250, 400])),
+            float(rng.integers(1, 30)) / 10,
+            SUPPLY_TYPES[rng.integers(len(SUPPLY_TYPES))],
+            float(rng.integers(10, 150)),
+            # Price grows with capability, with enough spread that the cheapest feasible actuator varies
+            float(round(capability[row] * rng.uniform(0.5, 1.5), -2))
+        ))
+    return ActuatorCatalog.from_records(records)
+
+@pytest.fixture(scope="session")
+def actuators():
+    return random_actuator_catalog(3000)
+
+@pytest.fixture(scope="session")
+def duty_points():
+    """(pressures, temperatures, valve indices, safety factors, supplies) of 400 duty points"""
+    rng = np.random.default_rng(1)
+    count = 400
+    supplies = ("Any",) + SUPPLY_TYPES
+    return (
+        rng.uniform(0.5, 120.0, count).round(2),
+        rng.uniform(-40.0, 260.0, count).round(1),
+        rng.integers(0, len(VALVE_DATABASE), count),
+        rng.choice(list(SAFETY_FACTORS.values()), count),
+        [supplies[i] for i in rng.integers(len(supplies), size=count)]
+    )
+
+@pytest.fixture(scope="session")
+def tag_records(duty_points):
+    pressures, temperatures, valve_indices, _, supplies = duty_points
+    classes = list(SAFETY_FACTORS)
+    return [{"tag": f"T{i}", "valve": str(valve_indices[i]), "pressure": str(pressures[i]),
+             "temperature": str(temperatures[i]), "safety_factor": classes[i % len(classes)],
+             "supply_type": supplies[i]}
+            for i in range(len(pressures))]
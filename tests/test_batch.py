@@ -0,0 +1,117 @@
+"""Batch kernels and actuator selection against the scalar paths and a brute-force scan"""
+import tempfile
+
+import numpy as np
+import pytest
+
+from sizing_batch import (
+    batch_cli, report_results_from_spool, size_tag_records, size_tag_records_parallel, spool_report_selections
+)
+from sizing_core import (
+    VALVE_DATABASE, calculate_valve_torque_thrust, calculate_valve_torque_thrust_batch, find_suitable_actuators,
+    get_actuator_index, select_actuators_batch
+)
+
+def brute_force_selection(catalog, required, value_type, valve, safety_factor, supply_type):
+    """(rows, margins) the way the original linear scan found them: filter every actuator, stable sort by capability"""
+    columns = catalog.columns
+    capability = columns["torque"] if value_type == "Torque (Nm)" else columns["thrust"]
+    threshold = required * safety_factor
+    rows = [row for row in range(len(catalog))
+            if capability[row] != 0 and capability[row] >= threshold
+            and columns["max_pressure"][row] >= valve.max_pressure
+            and columns["min_temp"][row] <= valve.min_temp
+            and columns["max_temp"][row] >= valve.max_temp
+            and (supply_type == "Any" or catalog.labels("supply")[row] == supply_type)]
+    rows = np.array(sorted(rows, key=lambda row: capability[row]), dtype=np.intp)
+    with np.errstate(divide="ignore"):
+        return rows, (capability[rows] / threshold - 1) * 100
+
+def test_batch_kernels_match_scalar_bit_for_bit(duty_points):
+    pressures, temperatures, valve_indices, _, _ = duty_points
+    values, labels = calculate_valve_torque_thrust_batch(pressures, temperatures, valve_indices)
+    for i in range(len(pressures)):
+        value, label = calculate_valve_torque_thrust(VALVE_DATABASE[int(valve_indices[i])], pressures[i],
+                                                     temperatures[i])
+        assert values[i] == value
+        assert labels[i] == label
+
+def test_batch_kernels_broadcast_a_grid():
+    pressures = np.linspace(0.0, 100.0, 11)
+    temperatures = np.linspace(-50.0, 300.0, 8)
+    for valve_index, valve in enumerate(VALVE_DATABASE):
+        values, _ = calculate_valve_torque_thrust_batch(pressures[None, :], temperatures[:, None], valve_index)
+        expected = [[calculate_valve_torque_thrust(valve, p, t)[0] for p in pressures] for t in temperatures]
+        np.testing.assert_array_equal(values, expected)
+
+def test_select_actuators_batch_matches_brute_force(actuators, duty_points):
+    pressures, temperatures, valve_indices, safety_factors, supplies = duty_points
+    required, labels = calculate_valve_torque_thrust_batch(pressures, temperatures, valve_indices)
+    valves = [VALVE_DATABASE[int(i)] for i in valve_indices]
+    selections = select_actuators_batch(
+        required, labels, [v.max_pressure for v in valves], [v.min_temp for v in valves],
+        [v.max_temp for v in valves], safety_factors, supplies, actuators, chunk_size=37)
+    for i, (rows, margins) in enumerate(selections):
+        expected_rows, expected_margins = brute_force_selection(actuators, required[i], labels[i], valves[i],
+                                                                safety_factors[i], supplies[i])
+        np.testing.assert_array_equal(rows, expected_rows)
+        np.testing.assert_array_equal(margins, expected_margins)
+
+@pytest.mark.parametrize("top_k", [None, 1, 5, 50])
+def test_index_query_matches_brute_force(actuators, duty_points, top_k):
+    pressures, temperatures, valve_indices, safety_factors, supplies = duty_points
+    index = get_actuator_index(actuators)
+    for i in range(0, len(pressures), 7):
+        valve = VALVE_DATABASE[int(valve_indices[i])]
+        required, label = calculate_valve_torque_thrust(valve, pressures[i], temperatures[i])
+        entries = find_suitable_actuators(required, label, valve, safety_factors[i], supplies[i], index, top_k=top_k)
+        expected_rows, expected_margins = brute_force_selection(actuators, required, label, valve, safety_factors[i],
+                                                                supplies[i])
+        assert [entry["actuator"]._row for entry in entries] == expected_rows[:top_k].tolist()
+        assert [entry["margin"] for entry in entries] == expected_margins[:top_k].tolist()
+
+def test_parallel_sizing_matches_serial(actuators, tag_records):
+    serial = list(size_tag_records(tag_records, actuators=actuators, chunk_size=64))
+    pooled = list(size_tag_records_parallel(tag_records, workers=2, actuators=actuators, chunk_size=64))
+    assert repr(pooled) == repr(serial)
+
+@pytest.mark.parametrize("arguments", [["-j", "-1"], ["--chunk-size", "0"], ["--chunk-size", "-5"],
+                                       ["--report", "out.pdf", "--tags-per-volume", "0"]])
+def test_batch_cli_rejects_bad_counts(arguments, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        batch_cli(["tags.csv", *arguments])
+    assert exit_info.value.code == 2
+    assert "must be" in capsys.readouterr().err
+
+@pytest.mark.parametrize("sizer", [size_tag_records, size_tag_records_parallel])
+def test_sizing_rejects_empty_chunks(tag_records, sizer):
+    with pytest.raises(ValueError):
+        list(sizer(tag_records, chunk_size=0))
+
+def spooled_report(results, actuators):
+    with tempfile.TemporaryFile() as spool:
+        rows = list(spool_report_selections(results, spool))
+        return rows, list(report_results_from_spool(spool, actuators=actuators))
+
+@pytest.mark.parametrize("ranking", ["capability", "pareto", "weighted"])
+def test_report_lists_the_main_pass_selection(actuators, tag_records, ranking):
+    records = tag_records[:80] + [{"tag": "BAD", "valve": "no such valve", "pressure": "1", "temperature": "1"}]
+    options = {"ranking": ranking, "monte_carlo": {"samples": 500, "seed": 2, "uncertainty": None},
+               "report": {"top_k": 4}}
+    rows, reports = spooled_report(size_tag_records(records, actuators=actuators, chunk_size=16, **options),
+                                   actuators)
+    pooled_rows, pooled_reports = spooled_report(
+        size_tag_records_parallel(records, workers=2, actuators=actuators, chunk_size=16, **options), actuators)
+    assert all("report" not in row for row in rows)
+    assert repr(pooled_rows) == repr(rows)
+    valid = [row for row in rows if not row["error"]]
+    assert len(reports) == len(valid) == len(pooled_reports)
+    for report, pooled, row in zip(reports, pooled_reports, valid):
+        assert [entry["actuator"]._row for entry in report["actuators"]] == \
+            [entry["actuator"]._row for entry in pooled["actuators"]]
+        assert len(report["actuators"]) <= 4
+        if report["actuators"]:
+            best = report["actuators"][0]
+            assert f"{best['actuator'].manufacturer} {best['actuator'].model}" == row["recommended_actuator"]
+            assert best["margin"] == row["recommended_margin"]
+        assert "Requirement p95:" in dict(report["checks"])
@@ -0,0 +1,72 @@
+"""Stroke-time simulation against a time-domain ODE solution"""
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from sizing_core import ACTUATOR_DATABASE, VALVE_DATABASE
+from sizing_dynamics import (
+    ACTUATOR_OUTPUT_CURVES, CURVE_NAMES, STROKE_ANGLE, catalog_actuator_parameters, selection_stroke_times,
+    simulate_strokes, stroke_loads
+)
+
+# Longest stroke simulated (s); every pair that does not stall finishes well within it
+STALL_TIME = 30.0
+
+def ode_stroke_time(loads, actuator, pair, direction):
+    """Stroke time of one pair from solve_ivp on I x'' = output(x, x') - load(x); inf when it stalls"""
+    travel = loads["travel"]
+    stroke = loads["stroke"][0]
+    curve = actuator["rating"][pair] * ACTUATOR_OUTPUT_CURVES[CURVE_NAMES[actuator["curve"][pair]]](
+        travel * STROKE_ANGLE)
+    load = loads["load"][0]
+    if direction == "close":
+        curve, load = curve[::-1], load[::-1]
+    inertia = actuator["inertia"][pair]
+    free_speed = actuator["free_speed"][pair]
+
+    def motion(t, y):
+        s = min(max(y[0] / stroke, 0.0), 1.0)
+        force = np.interp(s, travel, curve) * (1.0 - y[1] / free_speed) - np.interp(s, travel, load)
+        # At rest, a load larger than the output holds the valve in place instead of driving it backwards
+        if y[1] <= 0 and force < 0:
+            force = 0.0
+        return [y[1], force / inertia]
+
+    if curve[0] <= load[0]:
+        return np.inf
+
+    def end_of_stroke(t, y):
+        return y[0] - stroke
+    end_of_stroke.terminal = True
+
+    def stopped(t, y):
+        return y[1] - 1e-6 * stroke
+    stopped.terminal = True
+    stopped.direction = -1
+    solution = solve_ivp(motion, (0.0, STALL_TIME), [0.0, 0.0], method="LSODA", events=(end_of_stroke, stopped),
+                         max_step=0.01, rtol=1e-8, atol=1e-12)
+    return solution.t_events[0][0] if len(solution.t_events[0]) else np.inf
+
+@pytest.mark.parametrize("direction", ["open", "close"])
+@pytest.mark.parametrize("valve_index", [0, 3, 4, 5])
+def test_stroke_times_match_ode_solution(valve_index, direction):
+    loads = stroke_loads(10.0, 50.0, valve_index)
+    rotary = bool(loads["rotary"][0])
+    columns = ACTUATOR_DATABASE.columns
+    rows = np.flatnonzero(columns["torque"] > 0 if rotary else columns["thrust"] > 0)
+    actuator = catalog_actuator_parameters(rows, rotary)
+    results = simulate_strokes(loads, np.zeros(len(rows), dtype=np.intp), actuator, direction)
+    expected = [ode_stroke_time(loads, actuator, pair, direction) for pair in range(len(rows))]
+    stalled = np.isinf(expected)
+    np.testing.assert_array_equal(results["stalled"], stalled)
+    np.testing.assert_allclose(results["stroke_time"][~stalled], np.asarray(expected)[~stalled], rtol=0.006)
+
+def test_simulation_is_independent_of_block_size():
+    valve_indices = np.arange(len(VALVE_DATABASE))
+    loads = stroke_loads(np.linspace(5.0, 40.0, len(valve_indices)), 60.0, valve_indices)
+    selections = [(np.flatnonzero(ACTUATOR_DATABASE.columns["torque" if rotary else "thrust"] > 0),)
+                  for rotary in loads["rotary"]]
+    together = selection_stroke_times(loads, selections)
+    in_blocks = selection_stroke_times(loads, selections, max_pairs=3)
+    for one, other in zip(together, in_blocks):
+        np.testing.assert_array_equal(one, other)
@@ -0,0 +1,51 @@
+"""Fluid property tables near the saturation line, built from a synthetic property function"""
+import math
+
+import numpy as np
+import pytest
+
+from sizing_fluids import FluidPropertyTable
+
+CRITICAL_TEMPERATURE_K = 647.1
+CRITICAL_PRESSURE_PA = 220.6e5
+
+def saturation_pressure(temperature_k):
+    """Antoine equation for water (Pa)"""
+    return 10**(8.07131 - 1730.63 / (233.426 + temperature_k - 273.15)) * 133.322
+
+def water_props(output, *args):
+    """PropsSI stand-in: incompressible liquid, ideal-gas vapour"""
+    if len(args) == 1:
+        return {"Tmin": 273.16, "Tmax": 2000.0, "pmax": 1e9, "Tcrit": CRITICAL_TEMPERATURE_K,
+                "pcrit": CRITICAL_PRESSURE_PA}[output]
+    _, temperature, name2, value2, _ = args
+    if name2 == "Q":
+        pressure = saturation_pressure(temperature)
+        liquid = value2 == 0
+    else:
+        pressure = value2
+        liquid = temperature < CRITICAL_TEMPERATURE_K and pressure > saturation_pressure(temperature)
+    if output == "P":
+        return pressure
+    if output == "D":
+        return 1000.0 - 0.5 * (temperature - 273.0) if liquid else pressure / (461.5 * temperature)
+    return 3e-4 if liquid else 1.2e-5
+
+@pytest.fixture(scope="module")
+def water():
+    return FluidPropertyTable.build("Water", props=water_props)
+
+def test_liquid_just_above_saturation(water):
+    properties = water.evaluate(0.82, 93.7)
+    assert properties["liquid"]
+    assert properties["density"] == pytest.approx(1000.0 - 0.5 * (93.7 + 0.15), rel=1e-3)
+
+@pytest.mark.parametrize("ratio", [0.995, 1.005])
+def test_phase_follows_the_saturation_line(water, ratio):
+    temperatures = np.linspace(40.0, 360.0, 3001)
+    pressures = np.array([saturation_pressure(t + 273.15) for t in temperatures]) / 1e5 * ratio
+    properties = water.evaluate(pressures, temperatures)
+    np.testing.assert_array_equal(properties["liquid"], ratio > 1)
+    saturation = np.array([saturation_pressure(t + 273.15) for t in temperatures]) / 1e5
+    assert np.abs(properties["vapour_pressure"] / saturation - 1).max() < 0.005
+    assert math.isfinite(properties["density"].sum())
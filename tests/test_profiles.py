@@ -0,0 +1,39 @@
+"""Stroke torque profiles and curve-based selection against per-point and brute-force checks"""
+import numpy as np
+import pytest
+
+from sizing_core import VALVE_DATABASE, calculate_valve_torque_thrust, select_actuators_batch
+from sizing_profiles import (
+    ACTUATOR_OUTPUT_CURVES, CURVE_NAMES, actuator_curve_codes, select_actuators_for_profiles, torque_profiles
+)
+
+def test_profiles_match_one_point_at_a_time(duty_points):
+    pressures, temperatures, valve_indices, _, _ = duty_points
+    profiles = torque_profiles(pressures, temperatures, valve_indices)
+    for i in range(0, len(pressures), 9):
+        one = torque_profiles(pressures[i], temperatures[i], valve_indices[i])
+        np.testing.assert_array_equal(one["torque"][0], profiles["torque"][i])
+        if profiles["rotary"][i]:
+            # The profile starts at the static (breakaway) torque, up to the rounding of its parts
+            expected, _ = calculate_valve_torque_thrust(VALVE_DATABASE[int(valve_indices[i])], pressures[i],
+                                                        temperatures[i])
+            assert profiles["torque"][i, 0] == pytest.approx(expected, rel=1e-12)
+
+def test_profile_selection_matches_brute_force(actuators, duty_points):
+    pressures, temperatures, valve_indices, safety_factors, supplies = duty_points
+    profiles = torque_profiles(pressures, temperatures, valve_indices)
+    selections = select_actuators_for_profiles(profiles, valve_indices, safety_factors, supplies,
+                                               actuators=actuators)
+    codes = actuator_curve_codes(actuators)
+    curves = np.stack([ACTUATOR_OUTPUT_CURVES[name](profiles["angles"]) for name in CURVE_NAMES])
+    torque = actuators.columns["torque"]
+    for i in np.flatnonzero(profiles["rotary"]):
+        valve = VALVE_DATABASE[int(valve_indices[i])]
+        # Every actuator that passes the valve limits and supply, held to its output curve at every angle
+        candidates, _ = select_actuators_batch(0.0, "Torque (Nm)", valve.max_pressure, valve.min_temp,
+                                               valve.max_temp, 1.0, supplies[i], actuators)[0]
+        expected = [row for row in candidates.tolist()
+                    if (torque[row] * curves[codes[row]] >= safety_factors[i] * profiles["torque"][i]).all()]
+        assert sorted(selections[i][0].tolist()) == sorted(expected)
+    for i in np.flatnonzero(~profiles["rotary"]):
+        assert len(selections[i][0]) == 0
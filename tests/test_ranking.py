@@ -0,0 +1,91 @@
+"""Pareto fronts, top-k rankings and the operating envelope against brute force"""
+import numpy as np
+import pytest
+
+from sizing_core import (
+    VALVE_DATABASE, calculate_valve_torque_thrust, find_suitable_actuators, get_actuator_index, operating_envelope,
+    pareto_front, rank_candidates, select_actuators_batch, top_positions
+)
+
+def brute_force_front(values):
+    return np.array([not ((values <= point).all(axis=1) & (values < point).any(axis=1)).any() for point in values])
+
+@pytest.mark.parametrize("objectives", [1, 2, 3, 4, 5])
+def test_pareto_front_matches_brute_force(objectives):
+    rng = np.random.default_rng(objectives)
+    for count in (0, 1, 2, 17, 600):
+        # Few distinct levels, so ties and duplicate points are common
+        values = rng.integers(0, 12, (count, objectives)).astype(float)
+        np.testing.assert_array_equal(pareto_front(values), brute_force_front(values).astype(bool))
+
+def test_top_positions_match_stable_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 20, 500).astype(float)
+    subset = np.flatnonzero(rng.random(500) < 0.4)
+    for k in (1, 3, 50, 499, 500, 600):
+        np.testing.assert_array_equal(top_positions(scores, k), np.argsort(scores, kind="stable")[:k])
+        np.testing.assert_array_equal(top_positions(scores, k, subset),
+                                      subset[np.argsort(scores[subset], kind="stable")][:k])
+
+def _candidates(actuators, required, safety_factor=1.25):
+    valve = VALVE_DATABASE[0]
+    return select_actuators_batch(required, "Torque (Nm)", valve.max_pressure, valve.min_temp, valve.max_temp,
+                                  safety_factor, None, actuators)[0]
+
+@pytest.mark.parametrize("mode", ["pareto", "weighted"])
+@pytest.mark.parametrize("weights", [None, {"price": 3.0, "margin": 1.0}])
+def test_rank_candidates_top_k_is_a_prefix_of_the_full_ranking(actuators, mode, weights):
+    catalog = get_actuator_index(actuators).catalog
+    rows, margins = _candidates(actuators, 500.0)
+    order, scores, on_front = rank_candidates(catalog, rows, margins, mode, weights=weights)
+    if mode == "pareto":
+        expected = np.flatnonzero(on_front)
+        expected = expected[np.argsort(scores[expected], kind="stable")]
+    else:
+        expected = np.argsort(scores, kind="stable")
+    np.testing.assert_array_equal(order, expected)
+    for k in (1, 4, 25):
+        top, top_scores, top_front = rank_candidates(catalog, rows, margins, mode, weights=weights, top_k=k)
+        np.testing.assert_array_equal(top, expected[:k])
+        np.testing.assert_array_equal(top_scores, scores)
+        np.testing.assert_array_equal(top_front[top], on_front[top])
+
+@pytest.mark.parametrize("ranking", ["capability", "pareto", "weighted"])
+def test_find_suitable_actuators_top_k(actuators, ranking):
+    valve = VALVE_DATABASE[2]
+    required, label = calculate_valve_torque_thrust(valve, 40.0, 80.0)
+    full = find_suitable_actuators(required, label, valve, 1.5, "Any", actuators, ranking=ranking)
+    for k in (1, 3, 10):
+        top = find_suitable_actuators(required, label, valve, 1.5, "Any", actuators, top_k=k, ranking=ranking)
+        assert [entry["actuator"]._row for entry in top] == [entry["actuator"]._row for entry in full[:k]]
+
+@pytest.mark.parametrize("ranking", ["capability", "pareto", "weighted"])
+def test_find_suitable_actuators_entry_schema(actuators, ranking):
+    valve = VALVE_DATABASE[2]
+    entries = find_suitable_actuators(300.0, "Torque (Nm)", valve, 1.5, "Any", actuators, ranking=ranking)
+    assert entries
+    for entry in entries:
+        assert set(entry) == {"actuator", "capability", "margin", "score", "pareto"}
+        assert (entry["score"] is None) == (ranking == "capability")
+
+def test_zero_requirement_gives_infinite_margins(actuators):
+    entries = find_suitable_actuators(0.0, "Torque (Nm)", VALVE_DATABASE[2], 1.5, "Any", actuators, top_k=5)
+    assert [entry["margin"] for entry in entries] == [np.inf] * 5
+
+def brute_force_cheapest(actuators, valve, requirement, supply_type=None):
+    """Catalog row of the cheapest actuator meeting a requirement, earliest in capability order on ties"""
+    rows, _ = select_actuators_batch(requirement, "Torque (Nm)" if valve.type in ("Ball", "Plug", "Butterfly")
+                                     else "Thrust (N)", valve.max_pressure, valve.min_temp, valve.max_temp, 1.0,
+                                     supply_type, actuators)[0]
+    if not len(rows):
+        return -1
+    prices = actuators.columns["price"][rows]
+    return int(rows[np.argmin(prices)])
+
+@pytest.mark.parametrize("valve_index", range(len(VALVE_DATABASE)))
+def test_operating_envelope_matches_brute_force(actuators, valve_index):
+    valve = VALVE_DATABASE[valve_index]
+    envelope = operating_envelope(valve_index, 1.25, actuators=actuators, pressure_points=9, temperature_points=7)
+    for t, row in enumerate(envelope["required"]):
+        for p, required in enumerate(row):
+            assert envelope["actuator_rows"][t, p] == brute_force_cheapest(actuators, valve, required * 1.25)
@@ -0,0 +1,50 @@
+"""HTTP service option validation: bad requests are answered with 400 before reaching a worker"""
+import asyncio
+import json
+
+import pytest
+
+from sizing_service import ServiceError, SizingService, selection_options, service_cli
+
+TAG = {"tag": "V-1", "valve": "0", "pressure": "10", "temperature": "50"}
+
+@pytest.fixture
+def service():
+    service = SizingService(workers=0)
+    yield service
+    service.close()
+
+@pytest.mark.parametrize("options", [
+    {"candidates": 0},
+    {"candidates": 2.5},
+    {"candidates": float("inf")},
+    {"monte_carlo": -10},
+    {"max_stroke_time": 0},
+    {"max_stroke_time": 5, "stroke_direction": "sideways"},
+    {"monte_carlo": 100, "seed": -1},
+    {"monte_carlo": 100, "uncertainty": {"pressure": ["normal", -1.0]}},
+    {"bogus": 1}
+])
+def test_selection_options_reject_bad_values(options):
+    with pytest.raises(ServiceError) as error:
+        selection_options(options)
+    assert error.value.status == 400
+
+@pytest.mark.parametrize("top_k", [0, -3, 1.9, [2], "5", float("nan")])
+def test_report_rejects_bad_top_k(service, top_k):
+    body = json.dumps({"tags": [TAG], "top_k": top_k}).encode()
+    with pytest.raises(ServiceError) as error:
+        asyncio.run(service.report(body))
+    assert error.value.status == 400
+
+def test_report_accepts_an_integral_top_k(service):
+    status, content_type, pdf = asyncio.run(service.report(json.dumps({"tags": [TAG], "top_k": 3.0}).encode()))
+    assert status == 200 and content_type == "application/pdf"
+    assert pdf.startswith(b"%PDF")
+
+@pytest.mark.parametrize("arguments", [["-j", "-1"], ["--chunk-size", "0"]])
+def test_service_cli_rejects_bad_counts(arguments, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        service_cli(arguments)
+    assert exit_info.value.code == 2
+    assert "must be" in capsys.readouterr().err
@@ -0,0 +1,33 @@
+"""Surrogate tables: the stored error estimate against dense random sampling of the envelope"""
+import numpy as np
+import pytest
+
+import sizing_surrogate
+from sizing_core import VALVE_DATABASE, calculate_valve_torque_thrust_batch
+from sizing_surrogate import SurrogateTable
+
+def curved_model(pressures, temperatures, valve_indices, valves):
+    """Model with real curvature in both directions, so the estimate is above rounding level"""
+    values, labels = calculate_valve_torque_thrust_batch(pressures, temperatures, valve_indices, valves)
+    return values * (1.0 + 0.3 * np.sin(0.2 * pressures) * np.exp(-temperatures / 150.0)), labels
+
+def max_random_error(table, model, valve_index, count=100_000, seed=0):
+    valve = VALVE_DATABASE[valve_index]
+    rng = np.random.default_rng(seed)
+    pressures = rng.uniform(valve.min_pressure, valve.max_pressure, count)
+    temperatures = rng.uniform(valve.min_temp, valve.max_temp, count)
+    approx, _ = table.evaluate(pressures, temperatures, valve_index)
+    exact, _ = model(pressures, temperatures, valve_index, VALVE_DATABASE)
+    return np.abs(approx - exact).max()
+
+@pytest.mark.parametrize("model", [calculate_valve_torque_thrust_batch, curved_model])
+def test_random_points_stay_within_the_error_estimate(model):
+    table = SurrogateTable.build(VALVE_DATABASE, model)
+    for valve_index in range(len(VALVE_DATABASE)):
+        assert max_random_error(table, model, valve_index) <= table.error_estimate[valve_index]
+
+def test_error_estimate_is_independent_of_block_size(monkeypatch):
+    whole = SurrogateTable.build(VALVE_DATABASE, curved_model)
+    monkeypatch.setattr(sizing_surrogate, "SURROGATE_ERROR_BLOCK_POINTS", 1)
+    in_blocks = SurrogateTable.build(VALVE_DATABASE, curved_model)
+    np.testing.assert_array_equal(in_blocks.error_estimate, whole.error_estimate)
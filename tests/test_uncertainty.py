@@ -0,0 +1,58 @@
+"""Monte Carlo sizing: reproducible streams and agreement with the deterministic path"""
+import numpy as np
+import pytest
+
+from sizing_batch import size_tag_records, size_tag_records_parallel
+from sizing_core import VALVE_DATABASE, calculate_valve_torque_thrust
+from sizing_uncertainty import UNCERTAINTY_INPUTS, resolve_uncertainty, sample_requirements
+
+MONTE_CARLO = {"samples": 3000, "seed": 11, "uncertainty": None}
+
+def test_pooled_monte_carlo_matches_serial(actuators, tag_records):
+    records = tag_records[:120]
+    serial = list(size_tag_records(records, actuators=actuators, chunk_size=32, monte_carlo=MONTE_CARLO))
+    pooled = list(size_tag_records_parallel(records, workers=2, actuators=actuators, chunk_size=32,
+                                            monte_carlo=MONTE_CARLO))
+    assert repr(pooled) == repr(serial)
+
+def test_monte_carlo_does_not_depend_on_batch_chunking(actuators, tag_records):
+    records = tag_records[:120]
+    whole = list(size_tag_records(records, actuators=actuators, chunk_size=1000, monte_carlo=MONTE_CARLO))
+    chunked = list(size_tag_records(records, actuators=actuators, chunk_size=7, monte_carlo=MONTE_CARLO))
+    assert repr(chunked) == repr(whole)
+
+def test_fixed_inputs_reproduce_the_deterministic_requirement():
+    fixed = dict.fromkeys(UNCERTAINTY_INPUTS)
+    for valve_index, valve in enumerate(VALVE_DATABASE):
+        requirements, value_type = sample_requirements(valve_index, 25.0, 90.0, fixed, samples=10)
+        expected, expected_type = calculate_valve_torque_thrust(valve, 25.0, 90.0)
+        np.testing.assert_array_equal(requirements, np.full(10, expected))
+        assert value_type == expected_type
+
+def test_changing_one_input_leaves_the_other_streams_alone():
+    base, _ = sample_requirements(0, 25.0, 90.0, {"pressure": None}, samples=500, seed=3, chunk_size=128)
+    changed, _ = sample_requirements(0, 25.0, 90.0, {"pressure": None, "temperature": ("normal", 10.0)},
+                                     samples=500, seed=3, chunk_size=128)
+    # Only the temperature draws differ, so the requirements differ but stay correlated
+    assert not np.array_equal(base, changed)
+    assert np.corrcoef(base, changed)[0, 1] > 0.9
+
+@pytest.mark.parametrize("uncertainty", [
+    {"bogus": 1.0},
+    {"pressure": ("weird", 1.0)},
+    {"pressure": ("normal",)},
+    {"pressure": ("normal", -1.0)},
+    {"pressure": ("uniform", 2.0, 1.0)},
+    {"derating": ("triangular", 1.0, 1.0, 1.0)},
+    {"model": ("lognormal", float("nan"))},
+    ["pressure"]
+])
+def test_resolve_uncertainty_rejects_bad_specs(uncertainty):
+    with pytest.raises(ValueError):
+        resolve_uncertainty(uncertainty)
+
+def test_resolve_uncertainty_accepts_json_lists():
+    specs = resolve_uncertainty({"pressure": ["uniform", 1.0, 2.0], "temperature": 40.0, "model": None})
+    assert specs["pressure"] == ("uniform", 1.0, 2.0)
+    assert specs["temperature"] == 40.0
+    assert specs["model"] is None